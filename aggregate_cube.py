@@ -0,0 +1,88 @@
+"""
+Churn Intelligence System - Dashboard Aggregate Cube
+Pre-aggregates the user table by plan, risk tier, onboarding step and
+signup month. The KPI cards, risk distribution and onboarding
+funnel read from the cube, whose size depends on the number of
+distinct dimension values rather than on the number of users.
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from churn_scoring import evaluate
+
+# Tier recorded for churned users, who are not scored
+CHURNED_TIER = 'CHURNED'
+
+# Tiers counted as "at risk" on the KPI cards
+AT_RISK_TIERS = ('AMBER', 'RED')
+
+DIMENSIONS = ['plan_type', 'risk_tier', 'onboarding_step_reached', 'signup_month']
+MEASURES = ['users', 'churned', 'revenue']
+
+# Columns a cube is built from
+CUBE_COLUMNS = [
+    'user_id', 'plan_type', 'monthly_revenue', 'churned', 'signup_date',
+    'onboarding_step_reached', 'total_logins_30d', 'features_used_count',
+    'used_collaboration', 'days_since_last_login',
+]
+
+# =============================================================================
+# BUILD
+# =============================================================================
+
+def _month(dates):
+    """Arrow or datetime64 dates truncated to datetime64[M]; missing -> NaT"""
+    # Through Arrow: pd.to_datetime falls back to Python objects for date32
+    days = pa.array(dates).cast(pa.date32()).to_numpy(zero_copy_only=False)
+    return days.astype('datetime64[M]')
+
+
+def build_cube(df):
+    """Aggregate a user frame into cube cells: one row per dimension combination"""
+    churned = df['churned'].to_numpy(dtype=bool)
+    tier = np.where(churned, CHURNED_TIER, evaluate(df)['risk_tier'])
+    keys = pd.DataFrame({
+        'plan_type': df['plan_type'].astype(str).to_numpy(),
+        'risk_tier': tier,
+        'onboarding_step_reached': df['onboarding_step_reached'].to_numpy(),
+        'signup_month': _month(df['signup_date']),
+        'users': 1,
+        'churned': churned.astype(np.int64),
+        'revenue': df['monthly_revenue'].to_numpy().astype(np.int64),
+    })
+    cube = keys.groupby(DIMENSIONS, dropna=False, sort=True)[MEASURES].sum()
+    return cube.reset_index()
+
+# =============================================================================
+# WIDGET QUERIES
+# =============================================================================
+
+def kpis(cube):
+    """Headline numbers for the KPI cards and sidebar"""
+    total = int(cube['users'].sum())
+    churned = int(cube['churned'].sum())
+    at_risk = cube[cube['risk_tier'].isin(AT_RISK_TIERS)]
+    active = total - churned
+    return {
+        'total_users': total,
+        'active_users': active,
+        'churned_users': churned,
+        'at_risk_users': int(at_risk['users'].sum()),
+        'at_risk_pct': int(at_risk['users'].sum()) / active * 100 if active > 0 else 0,
+        'mrr_at_risk': int(at_risk['revenue'].sum()),
+        'churn_rate': churned / total * 100 if total > 0 else 0,
+    }
+
+
+def tier_counts(cube):
+    """Active users per risk tier, largest first"""
+    scored = cube[cube['risk_tier'] != CHURNED_TIER]
+    counts = scored.groupby('risk_tier')['users'].sum().sort_values(ascending=False)
+    return counts[counts > 0]
+
+
+def onboarding_funnel(cube):
+    """Users and churned users per onboarding step"""
+    return cube.groupby('onboarding_step_reached')[['users', 'churned']].sum()
@@ -3,13 +3,25 @@ Churn Intelligence System - Premium Dashboard
 Enhanced UI with professional design
 """
 
+import os
+
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import numpy as np
 
+from aggregate_cube import build_cube, kpis, onboarding_funnel, tier_counts
+from churn_scoring import TIERS, score_users, signal_breakdown
+from data_store import load_users
+from intervention_log import (
+    LOG_PATH, conversion_funnel, daily_conversions, latest_day, log_version, open_log, recent_events,
+)
+from nudge_engine import NUDGE_TYPES
+from result_cache import cached_frame, dataset_fingerprint, rules_version
+from risk_table import PAGE_SIZE, build_risk_table, query_page
+from score_history import list_runs, open_history, tier_transitions, transition_summary, user_history
+from sql_engine import run_queries
+from user_index import build_user_index, find_user, search_emails
+
 # =============================================================================
 # CONFIGURATION & THEME
 # =============================================================================
@@ -221,74 +233,133 @@ st.markdown("""
 # DATA LOADING
 # =============================================================================
 
-@st.cache_data
-def load_data():
-    """Load and process the churn dataset"""
+# Columns the dashboard pages read; everything else stays on disk
+APP_COLUMNS = (
+    'user_id', 'email', 'signup_date', 'plan_type', 'monthly_revenue', 'churned', 'churn_date',
+    'total_logins_30d', 'onboarding_step_reached', 'features_used_count',
+    'used_collaboration', 'days_since_last_login'
+)
+
+# Queries from sql/ behind the analytics charts; the dashboard reads the cube
+SQL_QUERIES = ('feature_depth', 'monthly_churn')
+
+# Built Plotly figures kept in memory, across all pages and filter states
+FIGURE_CACHE_ENTRIES = 64
+
+# Tier transition windows offered on the dashboard, in days
+TRANSITION_WINDOWS = {'Last 7 days': 7, 'Last 30 days': 30, 'Last 90 days': 90}
+
+# The cached loaders below are keyed on version tokens: data_version (the
+# dataset fingerprint) and version (data_version plus the rule table).
+# Frames are passed as _-prefixed arguments, which Streamlit does not hash,
+# so a rerun checks a few strings instead of hashing millions of rows.
+# The user and score tables are shared across reruns rather than copied,
+# and only the current version of each is kept.
+
+@st.cache_resource(max_entries=1)
+def load_data(data_version, columns=None):
+    """Load the churn dataset from its typed Parquet copy, through the disk cache"""
+    key = [data_version, list(columns or [])]
+    return cached_frame('users', key, lambda: load_users(columns))
+
+@st.cache_resource(max_entries=1)
+def calculate_risk_scores(version, _df):
+    """Calculate churn risk scores for all users"""
+    # Keyed by the dataset and rule table, so restarts skip rescoring
+    key = [*version, list(_df.columns)]
+    return cached_frame('scores', key, lambda: score_users(_df))
+
+@st.cache_data(max_entries=1)
+def load_cube(version, _df):
+    """Aggregate the dataset once for the dashboard widgets"""
+    return build_cube(_df)
+
+@st.cache_data(max_entries=1)
+def load_user_counts(data_version):
+    """Total and active users for the sidebar, from the churned column alone"""
+    churned = load_users(['churned'])['churned'].to_numpy(dtype=bool)
+    return {'total_users': len(churned), 'active_users': int(len(churned) - churned.sum())}
+
+@st.cache_data(max_entries=1)
+def load_sql_results(data_version, names):
+    """Run the named queries from sql/ over the dataset with the embedded engine"""
+    return run_queries(names=list(names))
+
+@st.cache_resource(max_entries=1)
+def load_risk_table(version, _scores_df):
+    """Build the at-risk table's filter cells and rankings once per scores table"""
+    return build_risk_table(_scores_df)
+
+@st.cache_resource(max_entries=1)
+def load_score_history(runs):
+    """Memory-map the stored scoring runs once per set of run dates"""
+    return open_history()
+
+@st.cache_data(max_entries=len(TRANSITION_WINDOWS))
+def load_transition_summary(runs, days, _history):
+    """Tier changes in the last `days` days: (summary, entering amber, total), once per set of runs"""
+    transitions = tier_transitions(_history, days)
+    entering_amber = int(((transitions['old_tier'] == 'GREEN') & (transitions['new_tier'] == 'AMBER')).sum())
+    return transition_summary(transitions), entering_amber, len(transitions)
+
+@st.cache_resource
+def load_intervention_log(path):
+    """Read-only connection to the intervention log, shared across reruns"""
+    return open_log(path, readonly=True)
+
+@st.cache_data(max_entries=1)
+def load_tracker_data(version, start, _conn):
+    """Funnel, daily conversions and latest events since `start`, once per log version"""
+    return conversion_funnel(_conn, start), daily_conversions(_conn, start), recent_events(_conn, 100)
+
+@st.cache_resource(max_entries=1)
+def load_user_index(version, _scores_df):
+    """Build the user_id/email lookup index once per scores table"""
+    return build_user_index(_scores_df['user_id'], _scores_df['email'])
+
+def load_data_version():
+    """Fingerprint of the dataset, or stop the page if the dataset is missing"""
     try:
-        df = pd.read_csv('data/churn_intelligence_dataset.csv')
-        df['signup_date'] = pd.to_datetime(df['signup_date'])
-        if 'churn_date' in df.columns:
-            df['churn_date'] = pd.to_datetime(df['churn_date'], errors='coerce')
-        df['last_login_date'] = pd.to_datetime(df['last_login_date'])
-        return df
+        return dataset_fingerprint()
     except FileNotFoundError:
         st.error("📁 Dataset not found. Please ensure data/churn_intelligence_dataset.csv exists.")
-        return None
-
-@st.cache_data
-def calculate_risk_scores(df):
-    """Calculate churn risk scores for all users"""
-    if df is None:
-        return None
-
-    scores = []
-    for _, user in df.iterrows():
-        if user.get('churned', 'no') == 'yes':
-            continue
-
-        login_score = 25 if user.get('total_logins_30d', 0) < 2 else 0
-        onboarding_score = 20 if user.get('onboarding_step_reached', 1) <= 3 else 0
-        feature_score = 20 if user.get('features_used_count', 0) <= 2 else 0
-        collab_score = 20 if user.get('used_collaboration', 'no') == 'no' else 0
-        inactive_score = 15 if user.get('days_since_last_login', 0) >= 7 else 0
-
-        total_score = login_score + onboarding_score + feature_score + collab_score + inactive_score
-
-        if total_score <= 30:
-            tier = 'GREEN'
-        elif total_score <= 60:
-            tier = 'AMBER'
-        else:
-            tier = 'RED'
-
-        scores_list = [
-            ('Low Login Frequency', login_score),
-            ('Onboarding Stalled', onboarding_score),
-            ('Low Feature Adoption', feature_score),
-            ('No Collaboration', collab_score),
-            ('Inactive 7+ Days', inactive_score)
-        ]
-        primary_factor = max(scores_list, key=lambda x: x[1])[0] if total_score > 0 else 'Healthy'
-
-        scores.append({
-            'user_id': user['user_id'],
-            'email': user['email'],
-            'plan_type': user['plan_type'],
-            'monthly_revenue': user['monthly_revenue'],
-            'risk_score': total_score,
-            'risk_tier': tier,
-            'primary_risk_factor': primary_factor,
-            'recommended_action': 'Human Outreach (24hr)' if tier == 'RED' else (
-                'Send Nudge (48hr)' if tier == 'AMBER' else 'Monitor Monthly'
-            ),
-            'total_logins_30d': user.get('total_logins_30d', 0),
-            'onboarding_step_reached': user.get('onboarding_step_reached', 1),
-            'features_used_count': user.get('features_used_count', 0),
-            'used_collaboration': user.get('used_collaboration', 'no'),
-            'days_since_last_login': user.get('days_since_last_login', 0)
-        })
+        st.stop()
 
-    return pd.DataFrame(scores)
+# Everything a page can ask for. Each loader gets `need` to fetch the
+# datasets it builds on, so a rerun only loads what its page uses.
+DATASETS = {
+    'data_version': lambda need: load_data_version(),
+    'version': lambda need: (need('data_version'), rules_version()),
+    'users': lambda need: load_data(need('data_version'), APP_COLUMNS),
+    'scores': lambda need: calculate_risk_scores(need('version'), need('users')),
+    'cube': lambda need: load_cube(need('version'), need('users')),
+    'user_counts': lambda need: load_user_counts(need('data_version')),
+    'sql': lambda need: load_sql_results(need('data_version'), SQL_QUERIES),
+    'runs': lambda need: tuple(str(run) for run in list_runs()),
+    'history': lambda need: load_score_history(need('runs')),
+    'log': lambda need: load_intervention_log(LOG_PATH) if os.path.exists(LOG_PATH) else None,
+}
+
+def dataset_loader():
+    """need(name): a dataset from DATASETS, loaded on first use in this rerun"""
+    loaded = {}
+
+    def need(name):
+        if name not in loaded:
+            loaded[name] = DATASETS[name](need)
+        return loaded[name]
+    return need
+
+# The *_figure builders import plotly themselves, so it loads with the first
+# chart rather than before the sidebar and header are shown
+@st.cache_resource(max_entries=FIGURE_CACHE_ENTRIES)
+def cached_figure(name, version, state, _build):
+    """Plotly figure from `_build`, built once per (name, data version, filter state)"""
+    return _build()
+
+def render_figure(name, version, build, state=None):
+    """Show a figure; reruns with the same data and filters reuse the built one"""
+    st.plotly_chart(cached_figure(name, version, state, build), use_container_width=True)
 
 # =============================================================================
 # COMPONENTS
@@ -303,13 +374,14 @@ def render_header():
     </div>
     """, unsafe_allow_html=True)
 
-def render_kpi_cards(df, scores_df):
+def render_kpi_cards(cube):
     """Render enhanced KPI cards"""
-    active_users = len(df[df['churned'] == 'no'])
-    at_risk_count = len(scores_df[scores_df['risk_tier'].isin(['AMBER', 'RED'])])
-    at_risk_pct = (at_risk_count / active_users * 100) if active_users > 0 else 0
-    mrr_at_risk = scores_df[scores_df['risk_tier'].isin(['AMBER', 'RED'])]['monthly_revenue'].sum()
-    churn_rate = (len(df[df['churned'] == 'yes']) / len(df) * 100)
+    stats = kpis(cube)
+    active_users = stats['active_users']
+    at_risk_count = stats['at_risk_users']
+    at_risk_pct = stats['at_risk_pct']
+    mrr_at_risk = stats['mrr_at_risk']
+    churn_rate = stats['churn_rate']
 
     col1, col2, col3, col4 = st.columns(4)
 
@@ -349,17 +421,19 @@ def render_kpi_cards(df, scores_df):
         </div>
         """, unsafe_allow_html=True)
 
-def render_risk_distribution(scores_df):
-    """Render enhanced risk distribution chart"""
-    tier_counts = scores_df['risk_tier'].value_counts().reset_index()
-    tier_counts.columns = ['Risk Tier', 'Count']
+def risk_distribution_figure(cube):
+    """Enhanced risk distribution chart"""
+    import plotly.graph_objects as go
+
+    tier_counts_df = tier_counts(cube).reset_index()
+    tier_counts_df.columns = ['Risk Tier', 'Count']
 
     colors = {'GREEN': '#10B981', 'AMBER': '#F59E0B', 'RED': '#EF4444'}
 
     fig = go.Figure(data=[go.Pie(
-        labels=tier_counts['Risk Tier'],
-        values=tier_counts['Count'],
-        marker=dict(colors=[colors[t] for t in tier_counts['Risk Tier']]),
+        labels=tier_counts_df['Risk Tier'],
+        values=tier_counts_df['Count'],
+        marker=dict(colors=[colors[t] for t in tier_counts_df['Risk Tier']]),
         textinfo='percent+label',
         textfont_size=14,
         hole=0.7,
@@ -386,14 +460,29 @@ def render_risk_distribution(scores_df):
         plot_bgcolor='rgba(0,0,0,0)'
     )
 
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
+
+def render_tier_transitions(history, runs):
+    """Render tier changes across recent scoring runs"""
+    st.markdown('<div class="section-header">🔄 Tier Transitions</div>', unsafe_allow_html=True)
+
+    window = st.selectbox("Window", list(TRANSITION_WINDOWS))
+    summary, entering_amber, changes = load_transition_summary(runs, TRANSITION_WINDOWS[window], history)
+
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        st.metric("Entering the Amber Zone", f"{entering_amber:,}")
+        st.metric("Tier Changes", f"{changes:,}")
+    with col2:
+        st.dataframe(summary, use_container_width=True, hide_index=True)
+    st.caption(f"{len(history):,} scoring runs stored · latest {history[-1][0]}")
+
+def onboarding_funnel_figure(cube):
+    """Enhanced onboarding funnel"""
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
 
-def render_onboarding_funnel(df):
-    """Render enhanced onboarding funnel"""
-    funnel_data = df.groupby('onboarding_step_reached').agg({
-        'user_id': 'count',
-        'churned': lambda x: (x == 'yes').sum()
-    }).reset_index()
+    funnel_data = onboarding_funnel(cube).reset_index()
     funnel_data.columns = ['Step', 'Total Users', 'Churned']
     funnel_data['Churn Rate'] = (funnel_data['Churned'] / funnel_data['Total Users'] * 100).round(1)
 
@@ -474,13 +563,20 @@ def render_onboarding_funnel(df):
         plot_bgcolor='rgba(255,255,255,0.5)'
     )
 
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
-def render_at_risk_users_table(scores_df):
+def render_at_risk_users_table(scores_df, version):
     """Render enhanced at-risk users table"""
     st.markdown('<div class="section-header">🚨 At-Risk Users Requiring Attention</div>', unsafe_allow_html=True)
 
-    col1, col2, col3 = st.columns(3)
+    table = load_risk_table(version, scores_df)
+    sort_columns = {
+        'Risk Score ↓': 'risk_score',
+        'Revenue ↓': 'monthly_revenue',
+        'Inactivity ↓': 'days_since_last_login',
+    }
+
+    col1, col2, col3, col4 = st.columns([3, 3, 3, 1])
 
     with col1:
         tier_filter = st.multiselect(
@@ -493,31 +589,33 @@ def render_at_risk_users_table(scores_df):
     with col2:
         plan_filter = st.multiselect(
             'Plan Type',
-            options=scores_df['plan_type'].unique().tolist(),
-            default=scores_df['plan_type'].unique().tolist(),
+            options=table['plan_labels'],
+            default=table['plan_labels'],
             label_visibility='collapsed'
         )
 
     with col3:
         sort_by = st.selectbox(
             'Sort By',
-            options=['Risk Score ↓', 'Revenue ↓', 'Inactivity ↓'],
+            options=list(sort_columns),
             label_visibility='collapsed'
         )
 
-    filtered_df = scores_df[
-        (scores_df['risk_tier'].isin(tier_filter)) &
-        (scores_df['plan_type'].isin(plan_filter))
-    ].copy()
+    with col4:
+        # Keyed on the filters so a new filter starts again from page 1
+        page = st.number_input(
+            'Page',
+            min_value=1,
+            value=1,
+            step=1,
+            key=f"risk_page_{sorted(tier_filter)}_{sorted(plan_filter)}_{sort_by}",
+            label_visibility='collapsed'
+        )
 
-    if sort_by == 'Risk Score ↓':
-        filtered_df = filtered_df.sort_values('risk_score', ascending=False)
-    elif sort_by == 'Revenue ↓':
-        filtered_df = filtered_df.sort_values('monthly_revenue', ascending=False)
-    else:
-        filtered_df = filtered_df.sort_values('days_since_last_login', ascending=False)
+    result = query_page(table, tier_filter, plan_filter, sort_columns[sort_by], int(page), PAGE_SIZE)
 
-    display_df = filtered_df.head(20).copy()
+    # Only the visible page is copied and formatted
+    display_df = scores_df.iloc[result['rows']].copy()
 
     # Format for display with HTML styling
     def format_tier(tier):
@@ -541,7 +639,12 @@ def render_at_risk_users_table(scores_df):
         unsafe_allow_html=True
     )
 
-def render_user_lookup(scores_df):
+    first = (result['page'] - 1) * PAGE_SIZE + 1 if result['total'] else 0
+    last = min(result['page'] * PAGE_SIZE, result['total'])
+    st.caption(f"Showing {first:,}–{last:,} of {result['total']:,} users · "
+               f"page {result['page']:,} of {result['pages']:,}")
+
+def render_user_lookup(scores_df, history, runs, version):
     """Render enhanced user lookup"""
     st.markdown('<div class="section-header">🔍 User Intelligence Lookup</div>', unsafe_allow_html=True)
 
@@ -568,13 +671,11 @@ def render_user_lookup(scores_df):
         return
 
     if search_button and search_user:
-        result = scores_df[
-            (scores_df['user_id'].astype(str).str.contains(search_user, case=False)) |
-            (scores_df['email'].str.contains(search_user, case=False))
-        ]
+        index = load_user_index(version, scores_df)
+        row = find_user(index, search_user)
 
-        if not result.empty:
-            user = result.iloc[0]
+        if row is not None:
+            user = scores_df.iloc[row]
 
             # User profile header
             tier_colors = {'GREEN': '#10b981', 'AMBER': '#f59e0b', 'RED': '#ef4444'}
@@ -609,38 +710,20 @@ def render_user_lookup(scores_df):
             with kpi4:
                 st.metric("Risk Score", f"{user['risk_score']}/100")
 
+            if history:
+                st.markdown("---")
+                st.markdown('<div class="section-header">📈 Score History</div>', unsafe_allow_html=True)
+
+                user_id = int(user['user_id'])
+                render_figure('score_history', runs,
+                              lambda: score_history_figure(user_history(history, user_id)), state=user_id)
+
             st.markdown("---")
 
             # Risk breakdown section
             st.markdown('<div class="section-header">📊 Risk Signal Breakdown</div>', unsafe_allow_html=True)
 
-            signal_data = {
-                'Signal': ['Login Frequency', 'Onboarding Progress', 'Feature Usage',
-                          'Collaboration', 'Inactivity'],
-                'Score': [
-                    25 if user['total_logins_30d'] < 2 else 0,
-                    20 if user['onboarding_step_reached'] <= 3 else 0,
-                    20 if user['features_used_count'] <= 2 else 0,
-                    20 if user['used_collaboration'] == 'no' else 0,
-                    15 if user['days_since_last_login'] >= 7 else 0
-                ],
-                'Status': [
-                    '⚠️ Low (<2 logins)' if user['total_logins_30d'] < 2 else '✅ Healthy',
-                    f"⚠️ Step {user['onboarding_step_reached']}" if user['onboarding_step_reached'] <= 3 else '✅ Step 4+',
-                    f"⚠️ {user['features_used_count']} features" if user['features_used_count'] <= 2 else '✅ 3+ features',
-                    '⚠️ Not used' if user['used_collaboration'] == 'no' else '✅ Used',
-                    f"⚠️ {user['days_since_last_login']} days" if user['days_since_last_login'] >= 7 else '✅ Active'
-                ],
-                'Impact': [
-                    'HIGH' if user['total_logins_30d'] < 2 else 'NONE',
-                    'MEDIUM' if user['onboarding_step_reached'] <= 3 else 'NONE',
-                    'MEDIUM' if user['features_used_count'] <= 2 else 'NONE',
-                    'MEDIUM' if user['used_collaboration'] == 'no' else 'NONE',
-                    'LOW' if user['days_since_last_login'] >= 7 else 'NONE'
-                ]
-            }
-
-            signal_df = pd.DataFrame(signal_data)
+            signal_df = pd.DataFrame(signal_breakdown(user))
 
             def color_score_row(row):
                 score = row['Score']
@@ -682,28 +765,125 @@ def render_user_lookup(scores_df):
 
         else:
             st.warning(f"❌ No user found matching '{search_user}'")
+            suggestions = scores_df['email'].iloc[search_emails(index, search_user)]
+            if len(suggestions):
+                st.caption("Did you mean: " + ", ".join(suggestions))
+
+def score_history_figure(past):
+    """One user's risk score at each stored run, with the tier bounds"""
+    import plotly.express as px
+
+    fig = px.line(past, x='date', y='risk_score', hover_data=['risk_tier', 'primary_risk_factor'])
+    for (_, bound), color in zip(TIERS, ['#F59E0B', '#EF4444']):
+        fig.add_hline(y=bound, line_dash='dot', line_color=color)
+    fig.update_layout(
+        height=300,
+        margin=dict(t=20, b=40, l=60, r=20),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(255,255,255,0.5)',
+        yaxis=dict(range=[0, 100], gridcolor='#e2e8f0', title='Risk Score'),
+        xaxis=dict(gridcolor='#e2e8f0', title=None)
+    )
+    return fig
+
+def variant_funnel_figure(funnel):
+    """Funnel from sent to converted, one trace per nudge variant"""
+    import plotly.graph_objects as go
+
+    stages = ['sent', 'opened', 'responded', 'converted']
+    fig = go.Figure()
+    for row, color in zip(funnel.itertuples(), ['#667eea', '#F59E0B', '#10B981']):
+        fig.add_trace(go.Funnel(
+            name=row.variant,
+            y=[stage.title() for stage in stages],
+            x=[getattr(row, stage) for stage in stages],
+            textinfo='value+percent initial',
+            marker=dict(color=color)
+        ))
+    fig.update_layout(
+        title=dict(text='<b>Conversion Funnel by Variant</b>', font=dict(size=18, color='#1e293b')),
+        height=400,
+        margin=dict(t=80, b=20, l=20, r=20),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig
+
+def daily_conversion_figure(daily):
+    """Daily conversion rate per nudge variant"""
+    import plotly.express as px
+
+    daily = daily.assign(
+        **{'Conversion %': (daily['converted'] / daily['sent'].where(daily['sent'] > 0) * 100).round(1),
+           'Variant': daily['nudge_type'].map(lambda code: f"{code} · {NUDGE_TYPES.get(code, code)}")}
+    )
+    fig = px.line(daily, x='day', y='Conversion %', color='Variant',
+                  title='<b>Daily Conversion Rate</b>')
+    fig.update_layout(
+        height=400,
+        margin=dict(t=80, b=20, l=20, r=20),
+        xaxis_title=None,
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(255,255,255,0.5)'
+    )
+    return fig
+
+def render_intervention_tracker(conn):
+    """Render nudge delivery and conversion per variant from the intervention log"""
+    st.markdown('<div class="section-header">📋 Intervention Tracker</div>', unsafe_allow_html=True)
 
-def render_churn_trend(df):
-    """Render churn trend chart"""
-    if 'churn_date' not in df.columns:
+    latest = latest_day(conn) if conn is not None else None
+    if latest is None:
+        st.info("📌 No nudges logged yet. Run `python nudge_engine.py` to send nudges for recent tier transitions.")
         return
 
-    churned = df[df['churned'] == 'yes'].copy()
-    churned = churned.dropna(subset=['churn_date'])
-    churned['churn_month'] = pd.to_datetime(churned['churn_date']).dt.to_period('M')
+    windows = {'All time': None, 'Last 7 days': 7, 'Last 30 days': 30, 'Last 90 days': 90}
+    window = st.selectbox("Window", list(windows), key='tracker_window')
+    start = None if windows[window] is None else latest - windows[window] + 1
+    version = log_version(conn)
+    funnel, daily, events = load_tracker_data(version, start, conn)
+    funnel['variant'] = [f"{code} · {NUDGE_TYPES.get(code, code)}" for code in funnel['nudge_type']]
+
+    sent = int(funnel['sent'].sum())
+    best = funnel.loc[funnel['converted_rate'].idxmax()]
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Nudges Sent", f"{sent:,}")
+    with col2:
+        st.metric("Opened", f"{int(funnel['opened'].sum()):,}",
+                  f"{funnel['opened'].sum() / max(sent, 1) * 100:.1f}% open rate", delta_color='off')
+    with col3:
+        st.metric("Converted", f"{int(funnel['converted'].sum()):,}",
+                  f"{funnel['converted'].sum() / max(sent, 1) * 100:.1f}% conversion", delta_color='off')
+    with col4:
+        st.metric("Best Variant", best['variant'], f"{best['converted_rate']:.1f}% conversion", delta_color='off')
+
+    col1, col2 = st.columns(2)
+    with col1:
+        render_figure('variant_funnel', version, lambda: variant_funnel_figure(funnel), state=window)
+    with col2:
+        render_figure('daily_conversions', version, lambda: daily_conversion_figure(daily), state=window)
 
-    monthly_churn = churned.groupby('churn_month').agg({
-        'user_id': 'count',
-        'monthly_revenue': 'sum'
-    }).reset_index()
-    monthly_churn.columns = ['Month', 'Churned Users', 'MRR Lost']
-    monthly_churn['Month'] = monthly_churn['Month'].astype(str)
+    table = funnel[['variant', 'sent', 'opened_rate', 'responded_rate', 'converted_rate', 'dismissed_rate']].copy()
+    table.columns = ['Variant', 'Sent', 'Open %', 'Response %', 'Conversion %', 'Dismissal %']
+    st.dataframe(table, use_container_width=True, hide_index=True)
+
+    st.markdown("**Latest events**")
+    st.dataframe(events, use_container_width=True, hide_index=True)
+    st.caption(f"Intervention log: {LOG_PATH} · latest event {latest}")
+
+def churn_trend_figure(monthly_df):
+    """Churn trend chart"""
+    import plotly.graph_objects as go
+
+    monthly_churn_df = monthly_df[['churn_month', 'churned_users', 'total_mrr_lost']].copy()
+    monthly_churn_df.columns = ['Month', 'Churned Users', 'MRR Lost']
 
     fig = go.Figure()
 
     fig.add_trace(go.Scatter(
-        x=monthly_churn['Month'],
-        y=monthly_churn['Churned Users'],
+        x=monthly_churn_df['Month'],
+        y=monthly_churn_df['Churned Users'],
         mode='lines+markers',
         name='Churned Users',
         line=dict(color='#EF4444', width=4),
@@ -729,14 +909,41 @@ def render_churn_trend(df):
         yaxis=dict(gridcolor='#e2e8f0')
     )
 
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
+
+def feature_depth_figure(feature_depth_df):
+    """Churn rate by feature usage depth"""
+    import plotly.express as px
+
+    feature_churn = feature_depth_df[['feature_usage_band', 'churn_rate_pct']].copy()
+    feature_churn.columns = ['Feature Usage', 'Churn Rate %']
+
+    fig = px.bar(
+        feature_churn,
+        x='Feature Usage',
+        y='Churn Rate %',
+        color='Churn Rate %',
+        color_continuous_scale=['#10B981', '#F59E0B', '#EF4444'],
+        title='<b>Churn Rate by Feature Usage Depth</b>'
+    )
+
+    fig.update_layout(
+        height=400,
+        margin=dict(t=80, b=60, l=60, r=60),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(255,255,255,0.5)',
+        xaxis=dict(gridcolor='#e2e8f0'),
+        yaxis=dict(gridcolor='#e2e8f0')
+    )
+
+    return fig
 
 # =============================================================================
 # SIDEBAR
 # =============================================================================
 
-def render_sidebar(df):
-    """Render enhanced sidebar"""
+def render_sidebar():
+    """Render enhanced sidebar; returns the selected page and the quick stats container"""
     with st.sidebar:
         st.markdown("""
         <div style="text-align: center; padding: 2rem 0;">
@@ -760,7 +967,7 @@ def render_sidebar(df):
 
         page = st.radio(
             "",
-            ["📊 Dashboard", "🔍 User Lookup", "📋 Intervention Tracker", "📈 Analytics"],
+            list(PAGES),
             label_visibility='collapsed'
         )
 
@@ -773,12 +980,8 @@ def render_sidebar(df):
         </div>
         """, unsafe_allow_html=True)
 
-        metric1, metric2 = st.columns(2)
-        with metric1:
-            st.metric("Total", f"{len(df):,}", help_text="Total users")
-        with metric2:
-            active = len(df[df['churned'] == 'no'])
-            st.metric("Active", f"{active:,}", help_text="Active users")
+        # Filled in by render_quick_stats once the data has loaded
+        quick_stats = st.container()
 
         st.markdown("---")
 
@@ -804,91 +1007,71 @@ def render_sidebar(df):
         </div>
         """, unsafe_allow_html=True)
 
-    return page
+    return page, quick_stats
+
+def render_quick_stats(container, stats):
+    """Fill the sidebar's quick stats"""
+    with container:
+        metric1, metric2 = st.columns(2)
+        with metric1:
+            st.metric("Total", f"{stats['total_users']:,}", help="Total users")
+        with metric2:
+            active = stats['active_users']
+            st.metric("Active", f"{active:,}", help="Active users")
 
 # =============================================================================
-# MAIN APP
+# PAGES
 # =============================================================================
 
-def main():
-    # Load data
-    df = load_data()
-    if df is None:
-        st.stop()
-
-    scores_df = calculate_risk_scores(df)
-    if scores_df is None:
-        st.stop()
-
-    # Render sidebar
-    page = render_sidebar(df)
+def render_dashboard(cube, history, runs, scores, version):
+    """Render KPIs, risk and onboarding charts, tier changes and the at-risk table"""
+    render_kpi_cards(cube)
+    st.markdown("---")
+    col1, col2 = st.columns(2)
+    with col1:
+        render_figure('risk_distribution', version, lambda: risk_distribution_figure(cube))
+    with col2:
+        render_figure('onboarding_funnel', version, lambda: onboarding_funnel_figure(cube))
+    if history:
+        st.markdown("---")
+        render_tier_transitions(history, runs)
+    st.markdown("---")
+    render_at_risk_users_table(scores, version)
 
-    # Main content area
-    render_header()
+def render_analytics(sql, version):
+    """Render churn trend and feature depth charts"""
+    render_figure('churn_trend', version, lambda: churn_trend_figure(sql['monthly_churn']))
 
-    if page == "📊 Dashboard":
-        render_kpi_cards(df, scores_df)
-        st.markdown("---")
-        col1, col2 = st.columns(2)
-        with col1:
-            render_risk_distribution(scores_df)
-        with col2:
-            render_onboarding_funnel(df)
-        st.markdown("---")
-        render_at_risk_users_table(scores_df)
+    st.markdown("---")
 
-    elif page == "🔍 User Lookup":
-        render_user_lookup(scores_df)
+    st.markdown('<div class="section-header">📊 Feature Usage vs Churn Correlation</div>', unsafe_allow_html=True)
+    render_figure('feature_depth', version, lambda: feature_depth_figure(sql['feature_depth']))
 
-    elif page == "📋 Intervention Tracker":
-        st.markdown('<div class="section-header">📋 Intervention Tracker</div>', unsafe_allow_html=True)
-        st.info("📌 Intervention tracking feature coming soon! This will log all nudge deliveries and responses.")
-        st.markdown("""
-        <div class="info-box">
-            <div style="font-weight: 600; margin-bottom: 0.5rem;">🚀 Coming Soon</div>
-            <div>Full intervention tracking with:</div>
-            <ul style="margin-top: 0.5rem; margin-left: 1rem;">
-                <li>Nudge delivery logs</li>
-                <li>Open and response tracking</li>
-                <li>Conversion metrics</li>
-                <li>CS team activity history</li>
-            </ul>
-        </div>
-        """, unsafe_allow_html=True)
+# Sidebar label -> (render function, the datasets it takes in order).
+# Only the selected page's datasets are loaded on a rerun.
+PAGES = {
+    "📊 Dashboard": (render_dashboard, ('cube', 'history', 'runs', 'scores', 'version')),
+    "🔍 User Lookup": (render_user_lookup, ('scores', 'history', 'runs', 'version')),
+    "📋 Intervention Tracker": (render_intervention_tracker, ('log',)),
+    "📈 Analytics": (render_analytics, ('sql', 'version')),
+}
 
-    elif page == "📈 Analytics":
-        render_churn_trend(df)
+# =============================================================================
+# MAIN APP
+# =============================================================================
 
-        st.markdown("---")
+def main():
+    need = dataset_loader()
 
-        st.markdown('<div class="section-header">📊 Feature Usage vs Churn Correlation</div>', unsafe_allow_html=True)
-
-        feature_churn = df.groupby(pd.cut(
-            df['features_used_count'],
-            bins=[0, 2, 5, 10],
-            labels=['Low (1-2)', 'Medium (3-5)', 'High (6+)']
-        ))['churned'].apply(lambda x: (x == 'yes').mean() * 100).reset_index()
-        feature_churn.columns = ['Feature Usage', 'Churn Rate %']
-
-        fig = px.bar(
-            feature_churn,
-            x='Feature Usage',
-            y='Churn Rate %',
-            color='Churn Rate %',
-            color_continuous_scale=['#10B981', '#F59E0B', '#EF4444'],
-            title='<b>Churn Rate by Feature Usage Depth</b>'
-        )
+    # Sidebar and header need no data, so they paint before anything loads
+    page, quick_stats = render_sidebar()
 
-        fig.update_layout(
-            height=400,
-            margin=dict(t=80, b=60, l=60, r=60),
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(255,255,255,0.5)',
-            xaxis=dict(gridcolor='#e2e8f0'),
-            yaxis=dict(gridcolor='#e2e8f0')
-        )
+    # Main content area
+    render_header()
+    render_quick_stats(quick_stats, need('user_counts'))
 
-        st.plotly_chart(fig, use_container_width=True)
+    render_page, datasets = PAGES[page]
+    render_page(*(need(name) for name in datasets))
 
     # Footer
     st.markdown("""
@@ -0,0 +1,184 @@
+"""
+Scoring API Load Test
+Starts scoring_api.py on localhost over an N-user synthetic export, then
+drives each endpoint with a fixed number of concurrent aiohttp clients for
+a few seconds. Reports p50/p99 latency and requests per second. Single-user
+/score runs twice: against the default server (micro-batched) and against
+a second server started with --micro-batch 1.
+
+Checks: stored-user responses equal score_users on the same export, and
+/score/batch results equal the evaluator on the same inputs.
+
+Client and server share this machine's cores, so the absolute numbers are
+a floor for a dedicated host.
+
+Usage: python -m benchmarks.bench_api [--rows 1000000] [--concurrency 64] [--seconds 10]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+
+import aiohttp
+import numpy as np
+
+from benchmarks.common import write_synthetic_csv
+from churn_scoring import SIGNALS, evaluate, score_users
+from data_store import load_users
+from scoring_api import API_COLUMNS, MAX_BATCH_USERS
+
+BASE_PORT = 8765
+
+
+def start_server(csv_path, port, cache_dir, *extra):
+    """Run scoring_api.py in a subprocess; returns the process once it answers /health"""
+    process = subprocess.Popen(
+        [sys.executable, 'scoring_api.py', '--snapshot', csv_path, '--port', str(port), *extra],
+        env={**os.environ, 'PYTHONPATH': os.getcwd(), 'CHURN_CACHE_DIR': cache_dir},
+        stdout=subprocess.DEVNULL,
+    )
+    asyncio.run(_wait_healthy(port, process))
+    return process
+
+
+async def _wait_healthy(port, process):
+    async with aiohttp.ClientSession() as session:
+        while process.poll() is None:
+            try:
+                async with session.get(f'http://127.0.0.1:{port}/health') as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientConnectionError:
+                await asyncio.sleep(0.5)
+    raise RuntimeError("scoring_api.py exited during start-up")
+
+
+def random_user(rng):
+    return {rule['column']: (bool(rng.random() < 0.5) if rule['column'] == 'used_collaboration'
+                             else int(rng.integers(0, 30))) for rule in SIGNALS}
+
+
+async def load(session, request, concurrency, seconds):
+    """Run `request(session)` from `concurrency` clients for `seconds`; returns latencies"""
+    latencies = []
+    end = time.perf_counter() + seconds
+
+    async def client():
+        while time.perf_counter() < end:
+            start = time.perf_counter()
+            await request(session)
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return np.array(latencies)
+
+
+def scenarios(port, scored_ids, tier_pages, rng):
+    base = f'http://127.0.0.1:{port}'
+    batch = [random_user(rng) for _ in range(MAX_BATCH_USERS)]
+
+    async def get_user(session):
+        async with session.get(f'{base}/users/{random.choice(scored_ids)}') as response:
+            assert response.status == 200
+            await response.read()
+
+    async def get_tier(session):
+        async with session.get(f'{base}/tiers/RED?page={random.randint(1, tier_pages)}') as response:
+            assert response.status == 200
+            await response.read()
+
+    async def post_score(session):
+        async with session.post(f'{base}/score', json=random_user(rng)) as response:
+            assert response.status == 200
+            await response.read()
+
+    async def post_batch(session):
+        async with session.post(f'{base}/score/batch', json={'users': batch}) as response:
+            assert response.status == 200
+            await response.read()
+
+    return {
+        'GET /users/{id}': (get_user, 1),
+        'GET /tiers/RED?page=': (get_tier, 1),
+        'POST /score': (post_score, 1),
+        f'POST /score/batch ({MAX_BATCH_USERS:,})': (post_batch, MAX_BATCH_USERS),
+    }
+
+
+async def check_parity(port, scores, rng):
+    base = f'http://127.0.0.1:{port}'
+    async with aiohttp.ClientSession() as session:
+        for row in rng.choice(len(scores), 200, replace=False):
+            expected = scores.iloc[row]
+            async with session.get(f"{base}/users/{int(expected['user_id'])}") as response:
+                user = await response.json()
+            assert user['risk_score'] == expected['risk_score'], user
+            assert user['primary_risk_factor'] == expected['primary_risk_factor'], user
+
+        users = [random_user(rng) for _ in range(1000)]
+        async with session.post(f'{base}/score/batch', json={'users': users}) as response:
+            results = (await response.json())['results']
+        columns = {rule['column']: np.array([user[rule['column']] for user in users]) for rule in SIGNALS}
+        assert [r['risk_score'] for r in results] == evaluate(columns)['risk_score'].tolist()
+
+
+async def run_load(ports, scored_ids, tier_pages, concurrency, seconds, seed):
+    rng = np.random.default_rng(seed)
+    print(f"{'Endpoint':<30} | {'Server':<13} | {'p50':>9} | {'p99':>9} | {'Req/s':>8} | {'Users/s':>10}")
+    print("-" * 94)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        for server, port in ports.items():
+            for name, (request, users_per_request) in scenarios(port, scored_ids, tier_pages, rng).items():
+                if server != 'micro-batched' and name != 'POST /score':
+                    continue
+                clients = concurrency if users_per_request == 1 else 4
+                latencies = await load(session, request, clients, seconds)
+                rate = len(latencies) / seconds
+                print(f"{name:<30} | {server:<13} | {np.percentile(latencies, 50) * 1000:>6.2f} ms | "
+                      f"{np.percentile(latencies, 99) * 1000:>6.2f} ms | {rate:>8,.0f} | "
+                      f"{rate * users_per_request:>10,.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workdir', default='/tmp/churn_bench')
+    args = parser.parse_args()
+
+    os.makedirs(args.workdir, exist_ok=True)
+    csv_path = os.path.join(args.workdir, f'users_{args.rows}.csv')
+    if not os.path.exists(csv_path):
+        print(f"Writing {args.rows:,}-row synthetic CSV to {csv_path}...")
+        write_synthetic_csv(csv_path, args.rows)
+    cache_dir = os.path.join(args.workdir, 'api_cache')
+    parquet_path = os.path.splitext(csv_path)[0] + '.parquet'
+    scores = score_users(load_users(API_COLUMNS, csv_path, parquet_path))
+    scored_ids = scores['user_id'].tolist()
+    tier_pages = max(1, int((scores['risk_tier'] == 'RED').sum()) // 20)
+
+    servers = {}
+    try:
+        servers['micro-batched'] = start_server(csv_path, BASE_PORT, cache_dir)
+        servers['unbatched'] = start_server(csv_path, BASE_PORT + 1, cache_dir, '--micro-batch', '1')
+        ports = {'micro-batched': BASE_PORT, 'unbatched': BASE_PORT + 1}
+        asyncio.run(check_parity(BASE_PORT, scores, np.random.default_rng(args.seed)))
+        print(f"{args.rows:,} users ({len(scores):,} scored), {args.concurrency} clients, "
+              f"{args.seconds:.0f}s per endpoint, {os.cpu_count()} CPU(s)\n")
+        asyncio.run(run_load(ports, scored_ids, tier_pages, args.concurrency, args.seconds, args.seed))
+    finally:
+        for process in servers.values():
+            process.terminate()
+            process.wait()
+    print("\nStored-user responses match score_users; /score/batch matches the evaluator")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+"""
+Dashboard Rerun Benchmark
+Runs app.py headless with Streamlit's AppTest over an N-user synthetic
+export, with daily scoring runs and an intervention log, and times each
+script run as a user moves through the pages:
+- opening the page from the sidebar
+- a rerun with nothing changed (another widget, a reconnect)
+- the page's filters: at-risk table page, tier and tracker windows, a user search
+
+The whole tour runs PASSES times. The first pass loads the datasets and
+builds every figure; later passes report the median. The first script run
+also parses and scores the export on a cold disk cache and is reported on
+its own. Times include AppTest's own overhead of a few milliseconds.
+
+Checks: no run raises, and every later pass renders the same charts and
+metrics as the first, freshly built one.
+
+Usage: python -m benchmarks.bench_app_rerun [--rows 10000000] [--runs 8] [--events 1000000]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import time
+from contextlib import closing
+
+import numpy as np
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+from streamlit.testing.v1 import AppTest, local_script_runner
+
+from benchmarks.bench_intervention_log import event_batches
+from benchmarks.bench_score_history import simulate, tier_codes
+from benchmarks.common import write_synthetic_csv
+from intervention_log import append_events, open_log
+from score_history import record_run
+
+DASHBOARD, LOOKUP, TRACKER, ANALYTICS = "📊 Dashboard", "🔍 User Lookup", "📋 Intervention Tracker", "📈 Analytics"
+PASSES = 4
+LOOKUP_USER = 12345
+
+
+def labelled(widgets, label):
+    return next(widget for widget in widgets if widget.label == label)
+
+
+def open_page(page):
+    return lambda at, i: at.sidebar.radio[0].set_value(page)
+
+
+def search(at, i):
+    at.text_input[0].set_value(str(LOOKUP_USER))
+    return at.button[0].click()
+
+
+# (page, action, step) in tour order; `step(at, pass)` sets up the next run
+TOUR = [
+    (DASHBOARD, 'open', open_page(DASHBOARD)),
+    (DASHBOARD, 'rerun, no change', lambda at, i: at),
+    (DASHBOARD, 'at-risk table: next page', lambda at, i: labelled(at.number_input, 'Page').set_value(i + 2)),
+    (DASHBOARD, 'tier transitions: 30 days', lambda at, i: labelled(at.selectbox, 'Window').set_value('Last 30 days')),
+    (LOOKUP, 'open', open_page(LOOKUP)),
+    (LOOKUP, 'rerun, no change', lambda at, i: at),
+    (LOOKUP, f'search user {LOOKUP_USER}', search),
+    (TRACKER, 'open', open_page(TRACKER)),
+    (TRACKER, 'rerun, no change', lambda at, i: at),
+    (TRACKER, 'window: last 30 days', lambda at, i: labelled(at.selectbox, 'Window').set_value('Last 30 days')),
+    (ANALYTICS, 'open', open_page(ANALYTICS)),
+    (ANALYTICS, 'rerun, no change', lambda at, i: at),
+]
+
+
+def prepare(workdir, rows, runs, events, seed):
+    """Dataset link, scoring history and intervention log under workdir/data"""
+    data = os.path.join(workdir, 'data')
+    os.makedirs(data, exist_ok=True)
+    csv_path = os.path.join(os.path.dirname(os.path.abspath(workdir)), f'users_{rows}.csv')
+    if not os.path.exists(csv_path):
+        print(f"Writing {rows:,}-row synthetic CSV to {csv_path}...")
+        write_synthetic_csv(csv_path, rows)
+    link = os.path.join(data, 'churn_intelligence_dataset.csv')
+    if not os.path.islink(link) or os.readlink(link) != csv_path:
+        for name in os.listdir(data):
+            if name.startswith('churn_intelligence_dataset'):
+                os.remove(os.path.join(data, name))
+        os.symlink(csv_path, link)
+    if not os.path.exists(os.path.join(workdir, 'sql')):
+        os.symlink(os.path.abspath('sql'), os.path.join(workdir, 'sql'))
+
+    history = os.path.join(data, 'score_history')
+    shutil.rmtree(history, ignore_errors=True)
+    rng = np.random.default_rng(seed)
+    first = np.datetime64('2025-12-31') - runs + 1
+    for day, user_id, score, factor in simulate(rng, rows, runs):
+        record_run(first + day, {'user_id': user_id, 'risk_score': score,
+                                 'tier_code': tier_codes(score), 'factor_code': factor}, history)
+
+    log = os.path.join(data, 'interventions.db')
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(log + suffix):
+            os.remove(log + suffix)
+    with closing(open_log(log)) as conn:
+        for batch in event_batches(events, 100_000, rng):
+            append_events(conn, batch)
+
+
+def snapshot(at):
+    """Chart specs and metric values on the current page"""
+    charts = [chart.proto.figure.spec for chart in at.get('plotly_chart')]
+    return charts, [(metric.label, metric.value) for metric in at.metric]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--runs', type=int, default=8, help="Daily scoring runs in the history")
+    parser.add_argument('--events', type=int, default=1_000_000, help="Events in the intervention log")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workdir', default='/tmp/churn_bench/app')
+    args = parser.parse_args()
+
+    app_path = os.path.abspath('app.py')
+    sys.path.insert(0, os.path.dirname(app_path))
+    prepare(args.workdir, args.rows, args.runs, args.events, args.seed)
+    os.chdir(args.workdir)
+
+    # A server compiles the script once; AppTest recompiles it on every run
+    # unless its runners share one script cache
+    script_cache = ScriptCache()
+    local_script_runner.ScriptCache = lambda: script_cache
+
+    start = time.perf_counter()
+    at = AppTest.from_file(app_path, default_timeout=3600).run()
+    assert not at.exception, at.exception
+    print(f"{args.rows:,} users, {args.runs} scoring runs, {args.events:,} logged events")
+    print(f"First script run (load and score on a cold disk cache): {time.perf_counter() - start:.1f}s\n")
+
+    times = {step: [] for step in range(len(TOUR))}
+    rendered = {}
+    for i in range(PASSES):
+        for step, (page, action, setup) in enumerate(TOUR):
+            start = time.perf_counter()
+            setup(at, i).run()
+            times[step].append(time.perf_counter() - start)
+            assert not at.exception, (page, action, at.exception)
+            assert rendered.setdefault(step, snapshot(at)) == snapshot(at), (page, action)
+
+    print(f"{'Page':<24} | {'Action':<28} | {'First':>9} | {'Later':>9}")
+    print("-" * 80)
+    for step, (page, action, _) in enumerate(TOUR):
+        first, later = times[step][0] * 1000, np.median(times[step][1:]) * 1000
+        print(f"{page:<24} | {action:<28} | {first:>6.0f} ms | {later:>6.0f} ms")
+    print(f"\nLater passes render the same charts and metrics as the first; {os.cpu_count()} CPU(s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Email Autocomplete Benchmark
+Times ranked top-k email suggestions from the trigram/prefix index in
+user_index against a `str.contains` scan, at 1M and 10M synthetic emails.
+Emails are name-style (400 first x 8,000 last syllable names plus the user
+id). Queries are what a CSM types: local-part prefixes ("priya.sh"),
+fragments from the middle ("sharma48") and typos ("priya.shrama"). Also
+times adding new users to a built index.
+
+Usage: python -m benchmarks.bench_autocomplete [--users 1000000 10000000] [--queries 300]
+"""
+
+import argparse
+import itertools
+import time
+
+import numpy as np
+
+from benchmarks.bench_lookup import synthetic_accounts
+from benchmarks.common import timed
+from user_index import add_users, build_user_index, search_emails
+
+# Real tenants have thousands of distinct names; the 16 x 16 lookup pool would
+# put every name trigram in millions of posting lists
+SYLLABLES = ['ka', 'ri', 'an', 'ya', 'mo', 'li', 'sa', 'to', 'na', 'vi',
+             'el', 'ra', 'jo', 'mi', 'de', 'su', 'ha', 'ne', 'lu', 'za']
+FIRST_NAMES = [''.join(p) for p in itertools.product(SYLLABLES, repeat=2)]
+LAST_NAMES = [''.join(p) for p in itertools.product(SYLLABLES, repeat=3)]
+
+
+def typed_queries(emails, rng, count):
+    """Prefix, middle-fragment and one-typo queries cut from real emails"""
+    local = [e.split('@')[0] for e in emails]
+    prefix, middle, typo = [], [], []
+    for email in rng.choice(local, size=count):
+        cut = rng.integers(4, len(email))
+        prefix.append(email[:cut])
+        start = rng.integers(1, len(email) - 4)
+        middle.append(email[start:start + 6])
+        i = rng.integers(1, len(email) - 2)
+        typo.append(email[:i] + email[i + 1] + email[i] + email[i + 2:])
+    return {'prefix': prefix, 'middle': middle, 'typo': typo}
+
+
+def latencies_ms(index, queries):
+    times = []
+    for q in queries:
+        start = time.perf_counter()
+        search_emails(index, q)
+        times.append((time.perf_counter() - start) * 1e3)
+    return np.percentile(times, [50, 95, 99])
+
+
+def run(users, n_queries):
+    df = synthetic_accounts(users, first_names=FIRST_NAMES, last_names=LAST_NAMES)
+    rng = np.random.default_rng(3)
+    queries = typed_queries(df['email'].iloc[rng.choice(users, 1000)].tolist(), rng, n_queries)
+
+    index, build_s = timed(build_user_index, df['user_id'], df['email'])
+    emails = index['emails']
+
+    # Parity: a full local part (unique thanks to the id digits) ranks its user first,
+    # and prefix matches are ranked ahead of fuzzy ones
+    for row in rng.choice(users, 50):
+        assert search_emails(index, emails[row].split('@')[0])[0] == row
+    for q in queries['prefix'][:50]:
+        found = [emails[r].startswith(q) for r in search_emails(index, q)]
+        assert found[0] and found == sorted(found, reverse=True), q
+
+    _, scan_s = timed(lambda q: df['email'].str.contains(q, case=False).to_numpy().nonzero()[0][:10],
+                      queries['middle'][0])
+
+    new_ids = np.arange(users + 1, users + 1001)
+    new_emails = [f'new.user{i}@example.com' for i in new_ids]
+    _, add_s = timed(add_users, index, new_ids, new_emails)
+    assert search_emails(index, 'new.user' + str(users + 500))[0] == users + 499
+
+    print(f"\n{users:,} emails - index build {build_s:.1f}s, "
+          f"str.contains scan {scan_s * 1e3:,.0f} ms, add 1,000 users {add_s * 1e3:.0f} ms")
+    print(f"{'Query kind':<12} | {'p50':>8} | {'p95':>8} | {'p99':>8}")
+    print("-" * 46)
+    for kind, qs in queries.items():
+        p50, p95, p99 = latencies_ms(index, qs)
+        print(f"{kind:<12} | {p50:>5.2f} ms | {p95:>5.2f} ms | {p99:>5.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, nargs='+', default=[1_000_000, 10_000_000])
+    parser.add_argument('--queries', type=int, default=300)
+    args = parser.parse_args()
+    for users in args.users:
+        run(users, args.queries)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Dashboard Aggregate Cube Benchmark
+Times the dashboard widgets (KPI cards, risk distribution, onboarding
+funnel) computed from raw rows, as the app did on every rerun,
+against the same widgets read from the aggregate cube, at several user
+counts. Widget values are checked against the raw computation first.
+
+Usage: python -m benchmarks.bench_cube [--users 100000 1000000 10000000]
+"""
+
+import argparse
+import os
+
+import pyarrow as pa
+
+from aggregate_cube import CUBE_COLUMNS, build_cube, kpis, onboarding_funnel, tier_counts
+from benchmarks.common import timed, write_synthetic_arrow
+from churn_scoring import score_users
+from data_store import ARROW_TO_PANDAS
+
+
+def load_synthetic(path, users):
+    """The first `users` rows of the synthetic Arrow file, with the columns the app loads"""
+    with pa.memory_map(path) as source:
+        table = pa.ipc.open_file(source).read_all().select(CUBE_COLUMNS + ['email']).slice(0, users)
+        return table.to_pandas(types_mapper=ARROW_TO_PANDAS.get)
+
+
+def raw_widgets(df, scores_df):
+    """The widget numbers computed from raw rows, as the app used to"""
+    at_risk = scores_df[scores_df['risk_tier'].isin(['AMBER', 'RED'])]
+    return {
+        'active_users': int((~df['churned']).sum()),
+        'at_risk_users': len(at_risk),
+        'mrr_at_risk': int(at_risk['monthly_revenue'].sum()),
+        'churn_rate': df['churned'].sum() / len(df) * 100,
+        'tiers': scores_df['risk_tier'].value_counts().to_dict(),
+        'funnel': df.groupby('onboarding_step_reached').agg({'user_id': 'count', 'churned': 'sum'}).values.tolist(),
+    }
+
+
+def cube_widgets(cube):
+    """The same numbers read from the cube"""
+    stats = kpis(cube)
+    return {
+        'active_users': stats['active_users'],
+        'at_risk_users': stats['at_risk_users'],
+        'mrr_at_risk': stats['mrr_at_risk'],
+        'churn_rate': stats['churn_rate'],
+        'tiers': tier_counts(cube).to_dict(),
+        'funnel': onboarding_funnel(cube).values.tolist(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, nargs='+', default=[100_000, 1_000_000, 10_000_000])
+    parser.add_argument('--workdir', default='/tmp/churn_bench')
+    args = parser.parse_args()
+
+    os.makedirs(args.workdir, exist_ok=True)
+    largest = max(args.users)
+    path = os.path.join(args.workdir, f'users_{largest}.arrow')
+    if not os.path.exists(path):
+        print(f"Writing {largest:,} synthetic users to {path}...")
+        write_synthetic_arrow(path, largest)
+
+    print(f"{'Users':>12} | {'Raw widgets':>12} | {'Cube widgets':>12} | {'Cube cells':>10} | "
+          f"{'Build':>8}")
+    print("-" * 69)
+    for users in sorted(args.users):
+        df = load_synthetic(path, users)
+        scores_df = score_users(df)
+
+        raw, raw_s = timed(raw_widgets, df, scores_df)
+        cube, build_s = timed(build_cube, df)
+        from_cube, cube_s = timed(cube_widgets, cube, repeat=5)
+        assert from_cube == raw, f"{users:,} users: cube widgets differ from raw rows"
+
+        print(f"{users:>12,} | {raw_s * 1e3:>9,.0f} ms | {cube_s * 1e3:>9,.1f} ms | {len(cube):>10,} | "
+              f"{build_s:>7.2f}s")
+
+
+if __name__ == '__main__':
+    main()
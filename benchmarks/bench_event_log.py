@@ -0,0 +1,155 @@
+"""
+Event Log Benchmark
+Generates users with the vectorized generator and writes their login and
+feature event log (zstd Parquet). Reports events per second and bytes per
+event. The ingest step rebuilds the snapshot columns from the log in a
+fresh process. It compares the batched aggregate_snapshot with a pandas
+read + merge + groupby, and reports time and peak memory for each.
+
+Checks: both paths agree at the snapshot date and at an earlier replay
+date. The rebuilt columns also match the generator's snapshot, with the
+exceptions listed in generate_events.
+
+Usage: python -m benchmarks.bench_event_log [--users 1000000 10000000]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pyarrow.parquet as pq
+
+from benchmarks.common import timed
+from event_log import aggregate_snapshot, write_events
+from generate_realistic_data import END_DATE, generate_users_vectorized
+
+AS_OF = str(END_DATE.date())
+REPLAY_AS_OF = '2025-09-30'
+# After every generated churn date, so churned users' windows end at churn
+AFTER_ALL_CHURN = '2030-12-31'
+COLUMNS = ['total_logins_30d', 'last_login_date', 'days_since_last_login', 'features_used_count']
+
+CHILD_TEMPLATE = '''
+import json, time
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+from event_log import WINDOW_DAYS, aggregate_snapshot, reference_days
+
+def peak_rss_kb():
+    with open('/proc/self/status') as f:
+        return next(int(line.split()[1]) for line in f if line.startswith('VmHWM'))
+
+USERS, EVENTS, AS_OF, OUT = {users!r}, {events!r}, {as_of!r}, {output!r}
+users = pq.read_table(USERS, columns=['user_id', 'signup_date', 'churned', 'churn_date'])
+rss_before = peak_rss_kb()
+start = time.perf_counter()
+{body}
+elapsed = time.perf_counter() - start
+np.savez(OUT, **snapshot)
+print(json.dumps({{'seconds': elapsed, 'peak_rss_mb': (peak_rss_kb() - rss_before) / 1024}}))
+'''
+
+PATHS = {
+    'pandas read + groupby': '''
+ids = users['user_id'].to_numpy()
+ref = pd.DataFrame({'user_id': ids, 'ref': reference_days(users['churned'], users['churn_date'], AS_OF)})
+ev = pq.read_table(EVENTS).to_pandas(date_as_object=False).merge(ref, on='user_id')
+ev['day'] = ev['event_date'].to_numpy().astype('datetime64[D]').astype(np.int64)
+ev = ev[ev['day'] <= ev['ref']]
+logins = ev[ev['event_type'] == 'login']
+window = logins[logins['day'] > logins['ref'] - WINDOW_DAYS].groupby('user_id').size()
+last = logins.groupby('user_id')['day'].max()
+features = ev[ev['event_type'] == 'feature'].groupby('user_id')['feature'].nunique()
+signup = users['signup_date'].to_numpy().astype('datetime64[D]').astype(np.int64)
+last = last.reindex(ids).fillna(pd.Series(signup, index=ids)).to_numpy().astype(np.int64)
+snapshot = {
+    'total_logins_30d': window.reindex(ids, fill_value=0).to_numpy(),
+    'last_login_date': last.astype('datetime64[D]'),
+    'days_since_last_login': ref['ref'].to_numpy() - last,
+    'features_used_count': features.reindex(ids, fill_value=0).to_numpy(),
+}
+''',
+    'aggregate_snapshot (batched)': '''
+snapshot = aggregate_snapshot(EVENTS, users, AS_OF)
+''',
+}
+
+
+def run_child(body, users_path, events_path, as_of, output):
+    code = CHILD_TEMPLATE.format(users=users_path, events=events_path, as_of=as_of, output=output, body=body)
+    out = subprocess.run(
+        [sys.executable, '-c', code], capture_output=True, text=True, check=True,
+        env={**os.environ, 'PYTHONPATH': os.getcwd()},
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def load_snapshot(path):
+    with np.load(path) as data:
+        return {name: data[name] for name in COLUMNS}
+
+
+def check_snapshot(table, events_path):
+    """Rebuilt columns equal the generator's, up to the documented adjustments"""
+    df = table.to_pandas()
+    signup = df['signup_date'].to_numpy().astype('datetime64[D]')
+    last_login = np.maximum(df['last_login_date'].to_numpy().astype('datetime64[D]'), signup)
+    for as_of, rows in [(AS_OF, ~df['churned'].to_numpy()), (AFTER_ALL_CHURN, df['churned'].to_numpy())]:
+        snapshot = aggregate_snapshot(events_path, table, as_of)
+        assert (snapshot['features_used_count'][rows] == df['features_used_count'][rows]).all()
+        assert (snapshot['total_logins_30d'][rows] == np.maximum(df['total_logins_30d'][rows], 1)).all()
+        assert (snapshot['last_login_date'][rows] == last_login[rows]).all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, nargs='+', default=[1_000_000, 10_000_000])
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--pandas-max-events', type=int, default=100_000_000,
+                        help="skip the pandas path above this many events (it holds the whole log)")
+    parser.add_argument('--workdir', default='/tmp/churn_bench/events')
+    args = parser.parse_args()
+
+    os.makedirs(args.workdir, exist_ok=True)
+    for i, n in enumerate(args.users):
+        users_path = os.path.join(args.workdir, f'users_{n}.parquet')
+        events_path = os.path.join(args.workdir, f'events_{n}.parquet')
+        table = generate_users_vectorized(n, args.seed)
+        pq.write_table(table, users_path)
+        events, seconds = timed(write_events, table, events_path, AS_OF, args.seed)
+        size = os.path.getsize(events_path)
+        print(f"\n{n:,} users: {events:,} events ({events / n:.0f}/user) written in {seconds:.1f}s "
+              f"({events / seconds:,.0f} events/s), {size / 1024 ** 2:,.0f} MB ({size / events:.2f} B/event)")
+        if i == 0:
+            check_snapshot(table, events_path)
+            print("Rebuilt snapshot columns match the generated snapshot")
+        del table
+
+        print(f"{'Ingest path':<30} | {'As of':<10} | {'Time':>8} | {'Events/s':>12} | {'Peak RSS':>9}")
+        print("-" * 82)
+        for as_of in (AS_OF, REPLAY_AS_OF):
+            results = {}
+            for name, body in PATHS.items():
+                if 'pandas' in name and events > args.pandas_max_events:
+                    continue
+                output = os.path.join(args.workdir, f'snapshot_{len(results)}.npz')
+                r = run_child(body, users_path, events_path, as_of, output)
+                results[name] = load_snapshot(output)
+                os.remove(output)
+                print(f"{name:<30} | {as_of:<10} | {r['seconds']:>7.2f}s | "
+                      f"{events / r['seconds']:>12,.0f} | {r['peak_rss_mb']:>6,.0f} MB")
+            reference, *others = results.values()
+            for other in others:
+                for column in COLUMNS:
+                    assert np.array_equal(reference[column], other[column]), (as_of, column)
+        os.remove(users_path)
+        os.remove(events_path)
+    print("\nBatched aggregation matches pandas groupby at the snapshot and replay dates (where both ran)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Feature Store Benchmark
+Daily refresh of the login/activity signals for N users. The first step
+builds the feature store from the event log a week before the snapshot
+date. The store is then advanced one day at a time with each day's events,
+and each step is timed. This is compared with a full recomputation from
+the event history (aggregate_snapshot), which is what a daily job would
+otherwise run. Scores computed from the store's inputs are timed too.
+
+Checks: after the last day, the store's columns equal the full recomputation.
+
+Usage: python -m benchmarks.bench_feature_store [--users 10000000] [--days 7]
+"""
+
+import argparse
+import os
+import shutil
+
+import numpy as np
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from benchmarks.common import timed
+from churn_scoring import evaluate
+from event_log import aggregate_snapshot, write_events
+from feature_store import advance_day, build_feature_store, feature_columns, scoring_inputs
+from generate_realistic_data import END_DATE, generate_users_vectorized
+
+AS_OF = np.datetime64(END_DATE.date())
+
+
+def store_mb(path):
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path)) / 1024 ** 2
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=10_000_000)
+    parser.add_argument('--days', type=int, default=7, help="daily refreshes before the snapshot date")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workdir', default='/tmp/churn_bench/features')
+    args = parser.parse_args()
+
+    os.makedirs(args.workdir, exist_ok=True)
+    events_path = os.path.join(args.workdir, f'events_{args.users}.parquet')
+    store = os.path.join(args.workdir, 'store')
+    users = generate_users_vectorized(args.users, args.seed)
+    events = write_events(users, events_path, AS_OF, args.seed)
+    print(f"{args.users:,} users, {events:,} events\n")
+
+    start_day = AS_OF - args.days
+    shutil.rmtree(store, ignore_errors=True)
+    _, build_s = timed(build_feature_store, store, events_path, users, start_day)
+    recent = pq.read_table(events_path, filters=[('event_date', '>', start_day.astype(object))])
+
+    print(f"{'Step':<36} | {'Events':>11} | {'Time':>8}")
+    print("-" * 62)
+    print(f"{f'Build from full history ({start_day})':<36} | {events:>11,} | {build_s:>7.2f}s")
+    advance_s = []
+    for offset in range(1, args.days + 1):
+        day = start_day + offset
+        day_events = recent.filter(pc.equal(recent['event_date'], day.astype(object)))
+        _, seconds = timed(advance_day, store, day_events)
+        advance_s.append(seconds)
+        print(f"{f'Advance to {day}':<36} | {len(day_events):>11,} | {seconds:>7.3f}s")
+
+    full, full_s = timed(aggregate_snapshot, events_path, users, AS_OF)
+    print(f"{f'Full recomputation ({AS_OF})':<36} | {events:>11,} | {full_s:>7.2f}s")
+    scores, score_s = timed(lambda: evaluate(scoring_inputs(store, users)))
+    print(f"{'Score from store inputs':<36} | {'':>11} | {score_s:>7.2f}s")
+
+    order = np.argsort(users['user_id'].to_numpy())
+    rebuilt = feature_columns(store)
+    for column, values in full.items():
+        assert np.array_equal(values[order], rebuilt[column]), column
+    print(f"\nStore after {args.days} daily refreshes equals the full recomputation; "
+          f"median refresh {np.median(advance_s):.3f}s vs {full_s:.1f}s "
+          f"({full_s / np.median(advance_s):,.0f}x); store size {store_mb(store):,.0f} MB")
+    shutil.rmtree(store)
+    os.remove(events_path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Incremental Rescoring Benchmark
+Builds a score store for N users, changes ~2% of them (plus a few signups
+and deletions) and times refresh_store against a full rebuild. The
+refreshed store is checked against a full rescoring of the new snapshot.
+
+Usage: python -m benchmarks.bench_incremental [--users 10000000] [--change-rate 0.02]
+"""
+
+import argparse
+import shutil
+import tempfile
+
+import numpy as np
+
+from benchmarks.common import timed
+from score_store import build_store, read_scores, refresh_store, transition_counts
+
+
+def snapshot(n, rng):
+    """Compact snapshot with only the columns the score depends on"""
+    return {
+        'user_id': np.arange(1, n + 1, dtype=np.int64),
+        'churned': rng.random(n) < 0.25,
+        'total_logins_30d': rng.integers(0, 46, n, dtype=np.int16),
+        'onboarding_step_reached': rng.integers(1, 9, n, dtype=np.int8),
+        'features_used_count': rng.integers(1, 8, n, dtype=np.int8),
+        'used_collaboration': rng.random(n) < 0.45,
+        'days_since_last_login': rng.integers(0, 91, n, dtype=np.int16),
+    }
+
+
+def next_hour(users, change_rate, rng):
+    """Change a share of users' activity, add signups and remove a few users"""
+    n = len(users['user_id'])
+    users = {col: values.copy() for col, values in users.items()}
+
+    changed = rng.choice(n, size=int(n * change_rate), replace=False)
+    users['total_logins_30d'][changed] = rng.integers(0, 46, len(changed))
+    users['days_since_last_login'][changed] = rng.integers(0, 91, len(changed))
+
+    keep = np.ones(n, dtype=bool)
+    keep[rng.choice(n, size=n // 1000, replace=False)] = False
+    signups = snapshot(n // 1000, rng)
+    signups['user_id'] += n
+    return {col: np.concatenate([users[col][keep], signups[col]]) for col in users}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=10_000_000)
+    parser.add_argument('--change-rate', type=float, default=0.02)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    workdir = tempfile.mkdtemp(prefix='churn_scores_')
+    try:
+        before = snapshot(args.users, rng)
+        after = next_hour(before, args.change_rate, rng)
+
+        _, build_time = timed(build_store, f'{workdir}/incremental', before)
+        changes, refresh_time = timed(refresh_store, f'{workdir}/incremental', after)
+        _, rebuild_time = timed(build_store, f'{workdir}/full', after)
+
+        incremental = read_scores(f'{workdir}/incremental')
+        full = read_scores(f'{workdir}/full')
+        for col in full:
+            assert np.array_equal(incremental[col], full[col]), f"Mismatch in {col}"
+
+        print(f"Users: {args.users:,}, changed per hour: {args.change_rate:.0%}")
+        print(f"   Initial build:        {build_time:.2f}s")
+        print(f"   Full rebuild:         {rebuild_time:.2f}s")
+        print(f"   Incremental refresh:  {refresh_time:.3f}s "
+              f"({changes['rescored']:,} rescored, {changes['inserted']:,} inserted, "
+              f"{changes['deleted']:,} deleted)")
+        print("\n[OK] Refreshed store matches a full rescoring")
+        print("\nTier transitions:")
+        for transition, count in transition_counts(changes).items():
+            print(f"   {transition}: {count:,}")
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == '__main__':
+    main()
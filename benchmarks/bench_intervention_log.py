@@ -0,0 +1,158 @@
+"""
+Intervention Log Benchmark
+Appends N synthetic nudge events, spread over a year, to a fresh log in
+batches and reports the ingest rate per 10% of the run. Each nudge is sent,
+and some are then opened, responded to, converted or dismissed, at made-up
+rates per variant. The benchmark then times the queries:
+- conversion funnels from the precomputed table, all time and the last 30 days
+- the same funnel by scanning every event
+- one user's events
+- the latest events
+
+Checks: the precomputed funnel equals the counts generated and the scan.
+
+Usage: python -m benchmarks.bench_intervention_log [--events 100000000] [--batch-rows 100000]
+"""
+
+import argparse
+import os
+import time
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import timed
+from intervention_log import (
+    STATUSES, append_events, conversion_funnel, open_log, partitions, recent_events, user_events,
+)
+
+START = np.datetime64('2025-01-01T00:00:00', 's').astype(np.int64)
+DAYS = 365
+USERS = 10_000_000
+TYPES = np.array(['A', 'B', 'C'], dtype=object)
+
+# Synthetic per-variant rates: opened | sent, responded | opened,
+# converted | responded, dismissed | opened and not responded
+RATES = np.array([
+    [0.45, 0.50, 0.40, 0.30],
+    [0.35, 0.45, 0.35, 0.30],
+    [0.30, 0.35, 0.25, 0.30],
+])
+
+# Hours after sending for each later status
+DELAY_HOURS = [0, 6, 24, 72, 12]
+
+
+def event_batches(total, batch_rows, rng):
+    """Yield event batches: each nudge's sent event and any follow-ups"""
+    events_per_nudge = 1 + RATES[:, 0].mean() * (1 + RATES[:, 1].mean() * (1 + RATES[:, 2].mean()) + 0.15)
+    nudges = int(batch_rows / events_per_nudge)
+    span = DAYS * 86400 * nudges * events_per_nudge / total
+    produced, batch = 0, 0
+    while produced < total:
+        kind = rng.integers(0, len(TYPES), nudges)
+        rates = RATES[kind]
+        opened = rng.random(nudges) < rates[:, 0]
+        responded = opened & (rng.random(nudges) < rates[:, 1])
+        converted = responded & (rng.random(nudges) < rates[:, 2])
+        dismissed = opened & ~responded & (rng.random(nudges) < rates[:, 3])
+        user_id = rng.integers(1, USERS + 1, nudges)
+        sent_ts = START + (batch * span + rng.random(nudges) * span).astype(np.int64)
+
+        masks = [np.ones(nudges, dtype=bool), opened, responded, converted, dismissed]
+        rows = np.concatenate([np.flatnonzero(mask) for mask in masks])
+        status = np.concatenate([np.full(int(mask.sum()), code) for code, mask in enumerate(masks)])
+        delay = np.array(DELAY_HOURS)[status] * 3600
+        events = {
+            'user_id': user_id[rows],
+            'nudge_type': TYPES[kind[rows]],
+            'status': status,
+            'ts': sent_ts[rows] + delay,
+        }
+        take = min(len(rows), total - produced)
+        yield {col: values[:take] for col, values in events.items()}
+        produced += take
+        batch += 1
+
+
+def scan_funnel(conn):
+    """Events per nudge type and status, counted over every partition"""
+    union = " UNION ALL ".join(
+        f"SELECT nudge_type, status, COUNT(*) AS events FROM {table} GROUP BY nudge_type, status"
+        for table in partitions(conn)
+    )
+    counts = pd.read_sql_query(f"SELECT nudge_type, status, SUM(events) AS events FROM ({union}) "
+                               "GROUP BY nudge_type, status", conn)
+    return counts.pivot(index='nudge_type', columns='status', values='events').fillna(0).astype(np.int64)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--events', type=int, default=100_000_000)
+    parser.add_argument('--batch-rows', type=int, default=100_000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workdir', default='/tmp/churn_bench')
+    args = parser.parse_args()
+
+    os.makedirs(args.workdir, exist_ok=True)
+    path = os.path.join(args.workdir, 'interventions.db')
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    rng = np.random.default_rng(args.seed)
+    expected = np.zeros((len(TYPES), len(STATUSES)), dtype=np.int64)
+    sample_users = []
+
+    print(f"Appending {args.events:,} events in batches of {args.batch_rows:,}...")
+    print(f"{'Events':>13} | {'Events/s':>10}")
+    print("-" * 27)
+    with closing(open_log(path)) as conn:
+        ingested, mark = 0, args.events // 10
+        start = step_start = time.perf_counter()
+        step_events = 0
+        for events in event_batches(args.events, args.batch_rows, rng):
+            append_events(conn, events)
+            np.add.at(expected, (np.searchsorted(TYPES, events['nudge_type']), events['status']), 1)
+            sample_users.append(int(events['user_id'][0]))
+            ingested += len(events['status'])
+            step_events += len(events['status'])
+            if ingested >= mark or ingested == args.events:
+                now = time.perf_counter()
+                print(f"{ingested:>13,} | {step_events / (now - step_start):>10,.0f}")
+                step_start, step_events, mark = now, 0, mark + args.events // 10
+        ingest_s = time.perf_counter() - start
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        months = len(partitions(conn))
+    size_mb = os.path.getsize(path) / 1024 ** 2
+    print(f"Overall {args.events / ingest_s:,.0f} events/s; {size_mb:,.0f} MB in {months} monthly partitions\n")
+
+    with closing(open_log(path, readonly=True)) as conn:
+        funnel, funnel_s = timed(conversion_funnel, conn, repeat=5)
+        last_month = (START // 86400 + DAYS - 30).astype('datetime64[D]')
+        _, recent_funnel_s = timed(conversion_funnel, conn, last_month, repeat=5)
+        scanned, scan_s = timed(scan_funnel, conn)
+        latencies = []
+        for user in sample_users[:1000]:
+            _, seconds = timed(user_events, conn, user)
+            latencies.append(seconds * 1000)
+        _, recent_s = timed(recent_events, conn, 100, repeat=5)
+
+    assert np.array_equal(funnel[STATUSES].to_numpy(), expected), (funnel, expected)
+    assert np.array_equal(scanned.to_numpy(), expected)
+
+    print(f"{'Query':<42} | {'Time':>12}")
+    print("-" * 58)
+    print(f"{'Conversion funnel, all time (precomputed)':<42} | {funnel_s * 1000:>9.1f} ms")
+    print(f"{'Conversion funnel, last 30 days':<42} | {recent_funnel_s * 1000:>9.1f} ms")
+    print(f"{'Conversion funnel, scanning all events':<42} | {scan_s * 1000:>9.0f} ms")
+    print(f"{'User events (median of 1,000)':<42} | {np.median(latencies):>9.2f} ms")
+    print(f"{'Latest 100 events':<42} | {recent_s * 1000:>9.2f} ms")
+    print("\n" + funnel[['nudge_type', 'sent', 'opened_rate', 'responded_rate', 'converted_rate']]
+          .to_string(index=False))
+    print("\nPrecomputed funnel matches the generated counts and a full scan")
+    os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
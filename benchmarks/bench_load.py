@@ -0,0 +1,112 @@
+"""
+Dataset Load Benchmark
+Compares cold load time and resident memory for the original CSV path
+(read_csv + to_datetime) against the typed Parquet store, on a synthetic
+export (5M users by default). Each loader runs in a fresh process.
+
+Usage: python -m benchmarks.bench_load [--rows 5000000] [--workdir /tmp/churn_bench]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.common import timed, write_synthetic_csv
+from data_store import convert_csv_to_parquet
+
+LOADERS = {
+    'CSV (read_csv + to_datetime)': '''
+df = pd.read_csv(CSV)
+df['signup_date'] = pd.to_datetime(df['signup_date'])
+df['churn_date'] = pd.to_datetime(df['churn_date'], errors='coerce')
+df['last_login_date'] = pd.to_datetime(df['last_login_date'])
+''',
+    'Parquet (all columns)': '''
+df = load_users(csv_path=CSV, parquet_path=PARQUET)
+''',
+    'Parquet (dashboard columns)': '''
+df = load_users(APP_COLUMNS, csv_path=CSV, parquet_path=PARQUET)
+''',
+}
+
+CHILD_TEMPLATE = '''
+import json, time
+import pandas as pd
+from data_store import load_users
+
+def peak_rss_kb():
+    # VmHWM is reset on exec, unlike ru_maxrss which inherits the parent's peak
+    with open('/proc/self/status') as f:
+        return next(int(line.split()[1]) for line in f if line.startswith('VmHWM'))
+
+APP_COLUMNS = {app_columns!r}
+CSV, PARQUET = {csv!r}, {parquet!r}
+rss_before = peak_rss_kb()
+start = time.perf_counter()
+{body}
+elapsed = time.perf_counter() - start
+rss_after = peak_rss_kb()
+print(json.dumps({{
+    'seconds': elapsed,
+    'peak_rss_mb': (rss_after - rss_before) / 1024,
+    'frame_mb': df.memory_usage(deep=True).sum() / 1024 ** 2,
+}}))
+'''
+
+# Same list app.py passes to load_data; duplicated to avoid importing Streamlit
+APP_COLUMNS = (
+    'user_id', 'email', 'plan_type', 'monthly_revenue', 'churned', 'churn_date',
+    'total_logins_30d', 'onboarding_step_reached', 'features_used_count',
+    'used_collaboration', 'days_since_last_login'
+)
+
+
+def run_loader(body, csv_path, parquet_path):
+    """Run one loader in a fresh interpreter and return its measurements"""
+    code = CHILD_TEMPLATE.format(
+        app_columns=APP_COLUMNS, csv=csv_path, parquet=parquet_path, body=body
+    )
+    out = subprocess.run(
+        [sys.executable, '-c', code], capture_output=True, text=True, check=True,
+        env={**os.environ, 'PYTHONPATH': os.getcwd()},
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=5_000_000)
+    parser.add_argument('--workdir', default='/tmp/churn_bench')
+    args = parser.parse_args()
+
+    os.makedirs(args.workdir, exist_ok=True)
+    csv_path = os.path.join(args.workdir, f'users_{args.rows}.csv')
+    parquet_path = os.path.join(args.workdir, f'users_{args.rows}.parquet')
+
+    if not os.path.exists(csv_path):
+        print(f"Writing {args.rows:,}-row synthetic CSV to {csv_path}...")
+        write_synthetic_csv(csv_path, args.rows)
+
+    _, convert_time = timed(convert_csv_to_parquet, csv_path, parquet_path)
+    print(f"One-off CSV -> Parquet conversion: {convert_time:.2f}s "
+          f"({os.path.getsize(csv_path) / 1024 ** 2:,.0f} MB -> "
+          f"{os.path.getsize(parquet_path) / 1024 ** 2:,.0f} MB)")
+
+    print(f"\n{'Loader':<30} | {'Cold load':>10} | {'Peak RSS':>10} | {'Frame':>10}")
+    print("-" * 70)
+    results = {}
+    for name, body in LOADERS.items():
+        results[name] = r = run_loader(body, csv_path, parquet_path)
+        print(f"{name:<30} | {r['seconds']:>9.2f}s | {r['peak_rss_mb']:>7,.0f} MB | {r['frame_mb']:>7,.0f} MB")
+
+    baseline = results['CSV (read_csv + to_datetime)']
+    for name in list(LOADERS)[1:]:
+        r = results[name]
+        print(f"\n{name}: {baseline['seconds'] / r['seconds']:.1f}x faster, "
+              f"{baseline['peak_rss_mb'] / max(r['peak_rss_mb'], 1):.1f}x less peak RSS")
+
+
+if __name__ == '__main__':
+    main()
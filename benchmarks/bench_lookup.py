@@ -0,0 +1,93 @@
+"""
+User Lookup Benchmark
+Times the original `str.contains` scan used by the lookup page against
+exact hash lookups and prefix suggestions from user_index, on a synthetic
+table of N users. Index results are checked against exact-match scans.
+
+Usage: python -m benchmarks.bench_lookup [--users 10000000] [--queries 1000]
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import timed
+from user_index import build_user_index, find_user, suggest_emails
+
+FIRST_NAMES = ['aarav', 'priya', 'rahul', 'ananya', 'james', 'emma', 'liam', 'olivia',
+               'yuki', 'chen', 'fatima', 'omar', 'sofia', 'lucas', 'diya', 'kabir']
+LAST_NAMES = ['sharma', 'patel', 'smith', 'johnson', 'tanaka', 'sato', 'garcia', 'li',
+              'kumar', 'verma', 'chopra', 'reddy', 'miller', 'brown', 'wang', 'khan']
+
+
+def synthetic_accounts(n, seed=42, first_names=FIRST_NAMES, last_names=LAST_NAMES):
+    """Shuffled user ids and name-style emails, e.g. priya.sharma48213@example.com"""
+    rng = np.random.default_rng(seed)
+    first = pd.Series(np.array(first_names)[rng.integers(0, len(first_names), n)], dtype='string[pyarrow]')
+    last = pd.Series(np.array(last_names)[rng.integers(0, len(last_names), n)], dtype='string[pyarrow]')
+    user_ids = rng.permutation(np.arange(1, n + 1, dtype=np.int32))
+    emails = first + '.' + last + pd.Series(user_ids).astype('string[pyarrow]') + '@example.com'
+    return pd.DataFrame({'user_id': user_ids, 'email': emails})
+
+
+def scan_lookup(df, query):
+    """The original lookup: substring scan over user_id and email, first hit wins"""
+    result = df[
+        (df['user_id'].astype(str).str.contains(query, case=False)) |
+        (df['email'].str.contains(query, case=False))
+    ]
+    return result.index[0] if not result.empty else None
+
+
+def per_query_us(fn, queries):
+    start = time.perf_counter()
+    for q in queries:
+        fn(q)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=10_000_000)
+    parser.add_argument('--queries', type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"Building {args.users:,} synthetic accounts...")
+    df = synthetic_accounts(args.users)
+    rng = np.random.default_rng(7)
+    sample = rng.choice(args.users, size=args.queries, replace=False)
+    id_queries = [str(v) for v in df['user_id'].to_numpy()[sample]]
+    email_queries = [e.upper() for e in df['email'].iloc[sample]]
+    prefix_queries = [e[:8] for e in df['email'].iloc[sample]]
+
+    index, build_s = timed(build_user_index, df['user_id'], df['email'])
+
+    # Parity: every exact query resolves to its own row
+    for row, q_id, q_email in zip(sample, id_queries, email_queries):
+        assert find_user(index, q_id) == row, q_id
+        assert find_user(index, q_email) == row, q_email
+    for q in prefix_queries[:50]:
+        rows = suggest_emails(index, q)
+        assert len(rows) and all(e.startswith(q) for e in df['email'].iloc[rows]), q
+    assert find_user(index, 'nobody@example.com') is None
+
+    _, scan_s = timed(scan_lookup, df, email_queries[0].lower())
+
+    id_us = per_query_us(lambda q: find_user(index, q), id_queries)
+    email_us = per_query_us(lambda q: find_user(index, q), email_queries)
+    prefix_us = per_query_us(lambda q: suggest_emails(index, q), prefix_queries)
+
+    print(f"\n{'Lookup':<28} | {'Latency':>12}")
+    print("-" * 44)
+    print(f"{'str.contains scan':<28} | {scan_s * 1e3:>9,.0f} ms")
+    print(f"{'index: user_id':<28} | {id_us:>9,.1f} us")
+    print(f"{'index: email':<28} | {email_us:>9,.1f} us")
+    print(f"{'index: prefix (top 10)':<28} | {prefix_us:>9,.1f} us")
+    print(f"\nIndex build (once per dataset): {build_s:.1f}s for {args.users:,} users")
+    print(f"Scan vs email lookup: {scan_s * 1e6 / email_us:,.0f}x faster")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+DataFrame Memory Report
+Bytes per user for each column with the original CSV dtypes (int64, object
+strings, datetime64) versus the compact FRAME_DTYPES schema. The synthetic
+table is built in chunks so 10M users fit in a small machine; per-column
+footprints are additive across chunks.
+
+Usage: python -m benchmarks.bench_memory [--rows 10000000] [--min-ratio 4]
+"""
+
+import argparse
+import sys
+
+import pandas as pd
+
+from benchmarks.common import synthetic_users
+from data_store import apply_schema, memory_per_user
+
+CHUNK_ROWS = 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--min-ratio', type=float, default=4.0)
+    args = parser.parse_args()
+
+    before = after = None
+    for i, start in enumerate(range(0, args.rows, CHUNK_ROWS)):
+        legacy = synthetic_users(min(CHUNK_ROWS, args.rows - start), seed=i)
+        legacy['user_id'] += start
+        compact = apply_schema(legacy)
+
+        rows = len(legacy)
+        chunk_before = memory_per_user(legacy) * rows
+        chunk_after = memory_per_user(compact) * rows
+        before = chunk_before if before is None else before + chunk_before
+        after = chunk_after if after is None else after + chunk_after
+
+    report = pd.DataFrame({
+        'before_dtype': legacy.dtypes.astype(str),
+        'after_dtype': compact.dtypes.astype(str),
+        'before_B/user': before / args.rows,
+        'after_B/user': after / args.rows,
+    })
+    print(f"Memory report for {args.rows:,} users\n")
+    print(report.round(2).to_string())
+
+    total_before, total_after = before.sum(), after.sum()
+    ratio = total_before / total_after
+    print(f"\nTotal: {total_before / args.rows:.1f} -> {total_after / args.rows:.1f} bytes/user "
+          f"({total_before / 1024 ** 3:.2f} GB -> {total_after / 1024 ** 3:.2f} GB), {ratio:.1f}x smaller")
+
+    if ratio < args.min_ratio:
+        print(f"[FAIL] Below the {args.min_ratio:.0f}x target")
+        sys.exit(1)
+    print(f"[OK] Meets the {args.min_ratio:.0f}x target")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+"""
+Nudge Engine Benchmark
+Plans nudges from N tier transitions over a synthetic user table, then
+dispatches them through the worker pool to each sink:
+- the JSON-lines file sink
+- the SQLite sink
+- a simulated remote sink that takes LATENCY_MS per batch, at 1/8/32 workers
+
+A sustained run then submits nudges as fast as the producer can for a few
+seconds while the engine dispatches to the file sink. The priority queue
+is capped at CAPACITY, so the producer is held to the delivery rate.
+
+Checks:
+- nudge types match a row-by-row replay of the BRD trigger flow
+- exactly the non-power users whose tier worsened into Amber or Red are
+  planned, including users new to scoring (no previous tier)
+- power users are never nudged, and a second plan against the sent nudges is empty
+- a sink that always fails ends in the dead letters after MAX_ATTEMPTS
+- every nudge is delivered exactly once, in deadline/score order with one worker
+- the queue never holds more than CAPACITY nudges
+
+Usage: python -m benchmarks.bench_nudge_engine [--users 1000000] [--transitions 500000] [--seconds 10]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import shutil
+import time
+
+import numpy as np
+
+from benchmarks.common import synthetic_users, timed
+from churn_scoring import TIERS
+from nudge_engine import (
+    MAX_ATTEMPTS, SLA_HOURS, create_engine, dispatch, file_sink, plan_nudges, schedule, sqlite_sink, submit,
+)
+
+AS_OF = np.datetime64('2025-12-31')
+LATENCY_MS = 20
+CAPACITY = 50_000
+SUBMIT_CHUNK = 5_000
+
+# Share of transitions from users new to scoring (no previous tier)
+NEW_USER_RATE = 0.05
+
+# The failing-sink check logs every rejected batch
+logging.getLogger('nudge_engine').setLevel(logging.CRITICAL)
+
+
+def synthetic_transitions(users, n, rng):
+    tiers = np.array([name for name, _ in TIERS], dtype=object)
+    old, new = rng.integers(0, len(tiers), n), rng.integers(0, len(tiers), n)
+    new = np.where(old == new, (new + 1) % len(tiers), new)
+    old_tier = tiers[old]
+    old_tier[rng.random(n) < NEW_USER_RATE] = None
+    return {
+        'date': np.full(n, AS_OF) - rng.integers(0, 7, n),
+        'user_id': rng.choice(users['user_id'].to_numpy(), n, replace=False),
+        'old_tier': old_tier,
+        'new_tier': tiers[new],
+        'risk_score': rng.integers(0, 101, n),
+    }
+
+
+def brd_nudge_type(user):
+    """BRD §6.1 trigger flow, one user at a time"""
+    if user['onboarding_step_reached'] <= 3:
+        return 'A'
+    if user['features_used_count'] <= 2 and user['days_since_signup'] >= 14:
+        return 'B'
+    return 'C'
+
+
+def collect_sink():
+    delivered = []
+
+    async def sink(nudges):
+        delivered.extend(nudges)
+
+    sink.delivered = delivered
+    return sink
+
+
+def failing_sink():
+    async def sink(nudges):
+        raise ConnectionError("delivery service unavailable")
+    return sink
+
+
+def is_power_user(user):
+    return user['total_logins_30d'] >= 25 and user['features_used_count'] >= 6 and user['used_collaboration'] == 'yes'
+
+
+def remote_sink(latency):
+    async def sink(nudges):
+        await asyncio.sleep(latency)
+    return sink
+
+
+async def dispatch_all(nudges, sink, workers):
+    engine = create_engine(sink, workers=workers)
+    schedule(engine, nudges)
+    start = time.perf_counter()
+    stats = await dispatch(engine)
+    return stats, time.perf_counter() - start
+
+
+async def sustained(nudges, sink, seconds):
+    """Submit chunks as fast as possible for `seconds` while dispatching"""
+    engine = create_engine(sink, capacity=CAPACITY)
+    dispatcher = asyncio.create_task(dispatch(engine, until_idle=False))
+    chunks = [nudges.iloc[i:i + SUBMIT_CHUNK] for i in range(0, len(nudges), SUBMIT_CHUNK)]
+    start = time.perf_counter()
+    submitted = 0
+    while time.perf_counter() - start < seconds:
+        chunk = chunks[(submitted // SUBMIT_CHUNK) % len(chunks)]
+        await submit(engine, chunk)
+        submitted += len(chunk)
+    elapsed = time.perf_counter() - start
+    dispatched = engine['stats']['dispatched']
+    dispatcher.cancel()
+    return submitted, dispatched, elapsed, engine['stats']['peak_queued']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=1_000_000)
+    parser.add_argument('--transitions', type=int, default=500_000)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workdir', default='/tmp/churn_bench/nudges')
+    args = parser.parse_args()
+
+    shutil.rmtree(args.workdir, ignore_errors=True)
+    os.makedirs(args.workdir)
+    rng = np.random.default_rng(args.seed)
+    users = synthetic_users(args.users, args.seed)
+    transitions = synthetic_transitions(users, args.transitions, rng)
+    now = float(AS_OF.astype('datetime64[s]').astype(np.int64))
+
+    nudges, plan_s = timed(plan_nudges, transitions, users, now)
+    print(f"{args.users:,} users, {args.transitions:,} transitions -> {len(nudges):,} nudges "
+          f"planned in {plan_s:.2f}s\n")
+
+    by_id = users.set_index('user_id')
+    for row in nudges.sample(min(len(nudges), 10_000), random_state=args.seed).itertuples():
+        user = by_id.loc[row.user_id]
+        assert row.nudge_type == brd_nudge_type(user), row
+        assert not is_power_user(user), row
+
+    rank = {name: i for i, (name, _) in enumerate(TIERS)}
+    worsened = [new in SLA_HOURS and rank[new] > rank.get(old, -1)
+                for old, new in zip(transitions['old_tier'], transitions['new_tier'])]
+    candidates = by_id.loc[transitions['user_id'][worsened]]
+    expected = candidates.index[~candidates.apply(is_power_user, axis=1)]
+    assert sorted(nudges['user_id']) == sorted(expected)
+    assert nudges['trigger_reason'].str.startswith('Tier change NONE→').any()
+    history = nudges.assign(sent_at=now)
+    assert not len(plan_nudges(transitions, users, now + 3600, history=history))
+
+    print(f"{'Sink':<34} | {'Workers':>7} | {'Time':>8} | {'Nudges/s':>10}")
+    print("-" * 70)
+    ordered = collect_sink()
+    stats, seconds = asyncio.run(dispatch_all(nudges, ordered, 1))
+    assert [n['user_id'] for n in ordered.delivered] == nudges['user_id'].tolist()
+    print(f"{'In-memory list':<34} | {1:>7} | {seconds:>7.2f}s | {stats['dispatched'] / seconds:>10,.0f}")
+
+    runs = [
+        ('JSON-lines file', lambda: file_sink(os.path.join(args.workdir, 'nudges.jsonl')), [8]),
+        ('SQLite', lambda: sqlite_sink(os.path.join(args.workdir, 'nudges.sqlite')), [8]),
+        (f'Remote ({LATENCY_MS} ms per batch)', lambda: remote_sink(LATENCY_MS / 1000), [1, 8, 32]),
+    ]
+    for name, make_sink, worker_counts in runs:
+        for workers in worker_counts:
+            sink = make_sink()
+            stats, seconds = asyncio.run(dispatch_all(nudges, sink, workers))
+            assert stats['dispatched'] == len(nudges)
+            if hasattr(sink, 'history'):
+                delivered = sink.history()
+                assert len(delivered) == len(nudges) and delivered['user_id'].is_unique
+                sink.close()
+            print(f"{name:<34} | {workers:>7} | {seconds:>7.2f}s | {stats['dispatched'] / seconds:>10,.0f}")
+
+    stats, _ = asyncio.run(dispatch_all(nudges.iloc[:1000], failing_sink(), 8))
+    assert stats['failed'] == 1000 and stats['dispatched'] == 0
+    assert stats['retried'] == 1000 * (MAX_ATTEMPTS - 1)
+
+    sink = file_sink(os.path.join(args.workdir, 'sustained.jsonl'))
+    submitted, dispatched, elapsed, peak = asyncio.run(sustained(nudges, sink, args.seconds))
+    sink.close()
+    assert peak <= CAPACITY
+    print(f"\nSustained ({args.seconds:.0f}s, file sink): submitted {submitted / elapsed:,.0f}/s, "
+          f"delivered {dispatched / elapsed:,.0f}/s, peak queue {peak:,} (capacity {CAPACITY:,})")
+    print(f"Nudge types match the BRD flow; caps, delivery order and dead letters hold; {os.cpu_count()} CPU(s)")
+    shutil.rmtree(args.workdir)
+
+
+if __name__ == '__main__':
+    main()
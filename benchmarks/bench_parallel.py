@@ -0,0 +1,49 @@
+"""
+Parallel Batch Scoring Benchmark
+Scores a synthetic Arrow export with score_batch.score_parallel at several
+worker counts. Workers memory-map the same file, so only shard indices and
+the per-shard totals are pickled. Totals are checked against the
+single-process run before timings are reported.
+
+Usage: python -m benchmarks.bench_parallel [--users 20000000] [--workers 1 2 4 8]
+"""
+
+import argparse
+import os
+
+from benchmarks.common import timed, write_synthetic_arrow
+from score_batch import score_parallel, summarize
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=20_000_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--workdir', default='/tmp/churn_bench')
+    args = parser.parse_args()
+
+    os.makedirs(args.workdir, exist_ok=True)
+    path = os.path.join(args.workdir, f'users_{args.users}.arrow')
+    if not os.path.exists(path):
+        print(f"Writing {args.users:,} synthetic users to {path}...")
+        write_synthetic_arrow(path, args.users)
+
+    print(f"CPUs available: {os.cpu_count()}")
+    print(f"{'Workers':>8} | {'Time':>8} | {'Users/s':>12} | {'Speedup':>8} | {'Efficiency':>10}")
+    print("-" * 58)
+    baseline = None
+    expected = None
+    for workers in args.workers:
+        totals, seconds = timed(score_parallel, path, workers=workers)
+        summary = summarize(totals)
+        if expected is None:
+            expected = summary
+        assert summary == expected, f"{workers} workers: totals differ from the first run"
+        baseline = baseline or seconds
+        speedup = baseline / seconds
+        print(f"{workers:>8} | {seconds:>7.2f}s | {summary['users_read'] / seconds:>12,.0f} | "
+              f"{speedup:>7.2f}x | {speedup / workers:>9.0%}")
+
+
+if __name__ == '__main__':
+    main()
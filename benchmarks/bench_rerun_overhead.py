@@ -0,0 +1,95 @@
+"""
+Rerun Cache Overhead Benchmark
+Times what a dashboard rerun pays to get back an already-cached user table
+at 1M and 10M users, for each way app.py has keyed its cached loaders:
+- st.cache_data on the DataFrame: hash the frame, unpickle a copy
+- st.cache_resource on the DataFrame: hash the frame
+- st.cache_resource on the dataset version token, the frame passed as _df:
+  stat the dataset file and hash a short string
+
+Also reports the one-off cost of fingerprinting the dataset file.
+
+Checks: all three return the same table, and the token changes when the
+dataset file changes.
+
+Usage: python -m benchmarks.bench_rerun_overhead [--rows 1000000 10000000]
+"""
+
+import argparse
+import os
+import shutil
+
+import streamlit as st
+from streamlit.logger import set_log_level
+
+from benchmarks.common import timed, write_synthetic_csv
+from data_store import load_users
+from result_cache import dataset_fingerprint
+
+# Outside `streamlit run` every cache call logs a missing-runtime warning
+set_log_level('error')
+
+
+@st.cache_data
+def by_frame_data(df):
+    return df
+
+
+@st.cache_resource
+def by_frame_resource(df):
+    return df
+
+
+@st.cache_resource
+def by_version(version, _df):
+    return _df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 10_000_000])
+    parser.add_argument('--workdir', default='/tmp/churn_bench')
+    args = parser.parse_args()
+
+    print(f"{'Users':>12} | {'Cache key':<40} | {'Per rerun':>10}")
+    print("-" * 70)
+    for rows in args.rows:
+        csv_path = os.path.join(args.workdir, f'users_{rows}.csv')
+        if not os.path.exists(csv_path):
+            write_synthetic_csv(csv_path, rows)
+        parquet_path = os.path.splitext(csv_path)[0] + '.parquet'
+        df = load_users(csv_path=csv_path, parquet_path=parquet_path)
+
+        cache_dir = os.path.join(args.workdir, 'fingerprints')
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        version, digest_s = timed(dataset_fingerprint, csv_path, cache_dir)
+
+        def lookup_by_version():
+            return by_version(dataset_fingerprint(csv_path, cache_dir), df)
+
+        lookups = [
+            ('cache_data, keyed on the DataFrame', lambda: by_frame_data(df)),
+            ('cache_resource, keyed on the DataFrame', lambda: by_frame_resource(df)),
+            ('cache_resource, keyed on version token', lookup_by_version),
+        ]
+        for name, lookup in lookups:
+            lookup()
+            result, seconds = timed(lookup, repeat=5)
+            assert result.equals(df), name
+            print(f"{rows:>12,} | {name:<40} | {seconds * 1000:>7.2f} ms")
+        print(f"{rows:>12,} | {'  (first fingerprint of the CSV, once)':<40} | {digest_s * 1000:>7.0f} ms")
+        assert version == dataset_fingerprint(csv_path, cache_dir)
+        shutil.rmtree(cache_dir)
+
+    sample = os.path.join(args.workdir, 'fingerprint_sample.csv')
+    write_synthetic_csv(sample, 1000)
+    before = dataset_fingerprint(sample, args.workdir)
+    with open(sample, 'a') as f:
+        f.write('1001,user1001@example.com' + ',' * 13 + '\n')
+    assert dataset_fingerprint(sample, args.workdir) != before
+    os.remove(sample)
+    print("\nAll keys return the same table; the version token changes with the file")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Result Cache Benchmark
+Times what a restarted app process does before its first page renders:
+load the dashboard columns and score every user. Compared paths are the
+first start on a new export (CSV parse, Parquet conversion, scoring, cache
+write), a restart with only the in-memory cache (Parquet load + scoring)
+and a restart that memory-maps both results from the disk cache. Each runs
+in a fresh process; the cached scores are checked against fresh scoring.
+
+Usage: python -m benchmarks.bench_result_cache [--rows 10000000]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+from benchmarks.bench_load import APP_COLUMNS
+from benchmarks.common import write_synthetic_csv
+
+CHILD_TEMPLATE = '''
+import json, time
+from churn_scoring import score_users
+from data_store import load_users
+from result_cache import cached_frame, dataset_fingerprint, rules_version
+
+def peak_rss_kb():
+    with open('/proc/self/status') as f:
+        return next(int(line.split()[1]) for line in f if line.startswith('VmHWM'))
+
+APP_COLUMNS = list({app_columns!r})
+CSV, PARQUET, CACHE = {csv!r}, {parquet!r}, {cache!r}
+rss_before = peak_rss_kb()
+start = time.perf_counter()
+{body}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    'seconds': elapsed,
+    'peak_rss_mb': (peak_rss_kb() - rss_before) / 1024,
+    'rows': len(scores),
+}}))
+'''
+
+DISK_CACHED = '''
+key = dataset_fingerprint(CSV, CACHE)
+df = cached_frame('users', [key, APP_COLUMNS],
+                  lambda: load_users(APP_COLUMNS, CSV, PARQUET), cache_dir=CACHE)
+scores = cached_frame('scores', [key, rules_version(), list(df.columns)],
+                      lambda: score_users(df), cache_dir=CACHE)
+'''
+
+PATHS = {
+    'First start (parse + score + write)': DISK_CACHED,
+    'Restart, memory cache only': '''
+df = load_users(APP_COLUMNS, CSV, PARQUET)
+scores = score_users(df)
+''',
+    'Restart, disk cache (mmap)': DISK_CACHED,
+}
+
+PARITY = '''
+import numpy as np
+import pyarrow as pa
+fresh = pa.Table.from_pandas(score_users(load_users(APP_COLUMNS, CSV, PARQUET)), preserve_index=False)
+cached = pa.Table.from_pandas(scores, preserve_index=False)
+assert fresh.cast(cached.schema).equals(cached)
+'''
+
+
+def run_child(body, csv_path, parquet_path, cache_dir):
+    """Run one start-up path in a fresh interpreter and return its measurements"""
+    code = CHILD_TEMPLATE.format(
+        app_columns=APP_COLUMNS, csv=csv_path, parquet=parquet_path, cache=cache_dir, body=body
+    )
+    out = subprocess.run(
+        [sys.executable, '-c', code], capture_output=True, text=True, check=True,
+        env={**os.environ, 'PYTHONPATH': os.getcwd()},
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--workdir', default='/tmp/churn_bench')
+    args = parser.parse_args()
+
+    os.makedirs(args.workdir, exist_ok=True)
+    csv_path = os.path.join(args.workdir, f'users_{args.rows}.csv')
+    parquet_path = os.path.join(args.workdir, f'users_{args.rows}_cache.parquet')
+    cache_dir = os.path.join(args.workdir, 'result_cache')
+    if not os.path.exists(csv_path):
+        print(f"Writing {args.rows:,}-row synthetic CSV to {csv_path}...")
+        write_synthetic_csv(csv_path, args.rows)
+    # Start from nothing: no Parquet copy, no cached results
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    if os.path.exists(parquet_path):
+        os.remove(parquet_path)
+
+    print(f"{'Start-up path':<38} | {'Time':>9} | {'Peak RSS':>9}")
+    print("-" * 64)
+    for name, body in PATHS.items():
+        r = run_child(body, csv_path, parquet_path, cache_dir)
+        print(f"{name:<38} | {r['seconds']:>8.2f}s | {r['peak_rss_mb']:>6,.0f} MB")
+
+    run_child(DISK_CACHED + PARITY, csv_path, parquet_path, cache_dir)
+    cache_mb = sum(
+        os.path.getsize(os.path.join(cache_dir, name)) for name in os.listdir(cache_dir)
+    ) / 1024 ** 2
+    print(f"\nCached scores match fresh scoring; cache holds {cache_mb:,.0f} MB")
+
+
+if __name__ == '__main__':
+    main()
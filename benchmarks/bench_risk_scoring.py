@@ -0,0 +1,107 @@
+"""
+Risk Scoring Benchmark
+Checks the compiled churn_scoring evaluator against the original
+iterrows implementation and times both at 10k, 100k and 1M users.
+Exits non-zero if the speedup at the largest size is below --min-speedup.
+
+Usage: python -m benchmarks.bench_risk_scoring [--sizes ...] [--min-speedup 50]
+"""
+
+import argparse
+import sys
+
+import pandas as pd
+
+from benchmarks.common import synthetic_users, timed
+from churn_scoring import score_users
+
+
+def score_rowwise(df):
+    """Reference implementation: the original per-row scoring loop"""
+    scores = []
+    for _, user in df.iterrows():
+        if user.get('churned', 'no') == 'yes':
+            continue
+
+        login_score = 25 if user.get('total_logins_30d', 0) < 2 else 0
+        onboarding_score = 20 if user.get('onboarding_step_reached', 1) <= 3 else 0
+        feature_score = 20 if user.get('features_used_count', 0) <= 2 else 0
+        collab_score = 20 if user.get('used_collaboration', 'no') == 'no' else 0
+        inactive_score = 15 if user.get('days_since_last_login', 0) >= 7 else 0
+
+        total_score = login_score + onboarding_score + feature_score + collab_score + inactive_score
+
+        if total_score <= 30:
+            tier = 'GREEN'
+        elif total_score <= 60:
+            tier = 'AMBER'
+        else:
+            tier = 'RED'
+
+        scores_list = [
+            ('Low Login Frequency', login_score),
+            ('Onboarding Stalled', onboarding_score),
+            ('Low Feature Adoption', feature_score),
+            ('No Collaboration', collab_score),
+            ('Inactive 7+ Days', inactive_score)
+        ]
+        primary_factor = max(scores_list, key=lambda x: x[1])[0] if total_score > 0 else 'Healthy'
+
+        scores.append({
+            'user_id': user['user_id'],
+            'email': user['email'],
+            'plan_type': user['plan_type'],
+            'monthly_revenue': user['monthly_revenue'],
+            'risk_score': total_score,
+            'risk_tier': tier,
+            'primary_risk_factor': primary_factor,
+            'recommended_action': 'Human Outreach (24hr)' if tier == 'RED' else (
+                'Send Nudge (48hr)' if tier == 'AMBER' else 'Monitor Monthly'
+            ),
+            'total_logins_30d': user.get('total_logins_30d', 0),
+            'onboarding_step_reached': user.get('onboarding_step_reached', 1),
+            'features_used_count': user.get('features_used_count', 0),
+            'used_collaboration': user.get('used_collaboration', 'no'),
+            'days_since_last_login': user.get('days_since_last_login', 0)
+        })
+
+    return pd.DataFrame(scores)
+
+
+def check_parity(df):
+    """Fail loudly if the vectorized output differs from the row loop"""
+    expected = score_rowwise(df)
+    # The scores table carries used_collaboration as a boolean flag
+    expected['used_collaboration'] = expected['used_collaboration'] == 'yes'
+    pd.testing.assert_frame_equal(score_users(df), expected)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--min-speedup', type=float, default=50.0)
+    args = parser.parse_args()
+
+    print("Parity check against the row loop...")
+    check_parity(pd.read_csv('data/churn_intelligence_dataset.csv'))
+    check_parity(synthetic_users(20_000, seed=7))
+    print("   [OK] Identical output on the bundled dataset and 20k synthetic users")
+
+    print(f"\n{'Users':>10} | {'Row loop':>10} | {'Compiled':>10} | {'Speedup':>8}")
+    print("-" * 48)
+    speedup = None
+    for n in args.sizes:
+        df = synthetic_users(n)
+        _, vec_time = timed(score_users, df, repeat=3)
+        _, loop_time = timed(score_rowwise, df)
+        speedup = loop_time / vec_time
+        print(f"{n:>10,} | {loop_time:>9.2f}s | {vec_time * 1000:>8.1f}ms | {speedup:>7.0f}x")
+
+    if speedup is not None and speedup < args.min_speedup:
+        print(f"\n[FAIL] Speedup {speedup:.0f}x is below the {args.min_speedup:.0f}x target")
+        sys.exit(1)
+    print(f"\n[OK] Compiled evaluator meets the {args.min_speedup:.0f}x target")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+At-Risk Table Benchmark
+Times a filter change on the at-risk table at N users: the original
+copy + full sort + row-wise HTML formatting against risk_table's
+precomputed rankings and tier/plan cells, which format only the visible page.
+Pages are checked against a stable pandas sort first.
+
+Usage: python -m benchmarks.bench_risk_table [--users 10000000]
+"""
+
+import argparse
+import os
+
+import numpy as np
+
+from benchmarks.bench_cube import load_synthetic
+from benchmarks.common import timed, write_synthetic_arrow
+from churn_scoring import score_users
+from risk_table import PAGE_SIZE, build_risk_table, query_page
+
+FILTERS = [
+    (['AMBER', 'RED'], ['Basic', 'Pro', 'Team'], 'risk_score'),
+    (['RED'], ['Team'], 'monthly_revenue'),
+    (['AMBER'], ['Basic', 'Pro'], 'days_since_last_login'),
+]
+
+
+def format_page(page_df):
+    """The HTML formatting the app applies to visible rows"""
+    page_df = page_df.copy()
+    page_df['Tier'] = page_df['risk_tier'].apply(lambda t: f'<span>{t}</span>')
+    page_df['Risk'] = page_df['risk_score'].apply(lambda s: f'<span>{s}/100</span>')
+    page_df['Revenue'] = page_df['monthly_revenue'].apply(lambda x: f'${x}')
+    return page_df[['user_id', 'email', 'Tier', 'Risk', 'Revenue']].to_html(escape=False, index=False)
+
+
+def original_table(scores_df, tiers, plans, sort_by):
+    """Filter + copy, sort everything, format the first 20 rows"""
+    filtered = scores_df[scores_df['risk_tier'].isin(tiers) & scores_df['plan_type'].isin(plans)].copy()
+    filtered = filtered.sort_values(sort_by, ascending=False)
+    return format_page(filtered.head(PAGE_SIZE))
+
+
+def paged_table(scores_df, table, tiers, plans, sort_by, page=1):
+    result = query_page(table, tiers, plans, sort_by, page)
+    return format_page(scores_df.iloc[result['rows']])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=10_000_000)
+    parser.add_argument('--workdir', default='/tmp/churn_bench')
+    args = parser.parse_args()
+
+    os.makedirs(args.workdir, exist_ok=True)
+    path = os.path.join(args.workdir, f'users_{args.users}.arrow')
+    if not os.path.exists(path):
+        print(f"Writing {args.users:,} synthetic users to {path}...")
+        write_synthetic_arrow(path, args.users)
+    scores_df = score_users(load_synthetic(path, args.users))
+    table, build_s = timed(build_risk_table, scores_df)
+
+    # Parity: pages match a stable descending sort of the filtered rows
+    for tiers, plans, sort_by in FILTERS:
+        filtered = scores_df[scores_df['risk_tier'].isin(tiers) & scores_df['plan_type'].isin(plans)]
+        expected = filtered.sort_values(sort_by, ascending=False, kind='stable').index.to_numpy()
+        last = query_page(table, tiers, plans, sort_by, page=10 ** 9)
+        for page in (1, 2, 50, last['page']):
+            rows = query_page(table, tiers, plans, sort_by, page)['rows']
+            start = (page - 1) * PAGE_SIZE
+            assert np.array_equal(rows, expected[start:start + PAGE_SIZE]), (tiers, plans, sort_by, page)
+
+    print(f"{args.users:,} users scored ({len(scores_df):,} active); table build {build_s:.2f}s\n")
+    print(f"{'Filter':<42} | {'Original':>10} | {'Page 1':>9} | {'Page 1000':>9}")
+    print("-" * 80)
+    for tiers, plans, sort_by in FILTERS:
+        _, original_s = timed(original_table, scores_df, tiers, plans, sort_by)
+        _, first_s = timed(paged_table, scores_df, table, tiers, plans, sort_by, repeat=3)
+        _, deep_s = timed(paged_table, scores_df, table, tiers, plans, sort_by, 1000, repeat=3)
+        label = f"{'+'.join(tiers)} / {'+'.join(plans)} by {sort_by}"
+        print(f"{label:<42} | {original_s * 1e3:>7,.0f} ms | {first_s * 1e3:>6,.0f} ms | {deep_s * 1e3:>6,.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
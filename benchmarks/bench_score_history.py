@@ -0,0 +1,114 @@
+"""
+Score History Benchmark
+Simulates a year of daily scoring runs for N users. Each day a share of
+users get a new score, a few churn out and new signups join. Every run is
+recorded, and the benchmark reports the record time per run and the storage
+used against keeping a full snapshot per day. It then times the queries
+over the whole year: one user's history, and tier transitions in the last
+7/30/90 days.
+
+Checks: the user history for a sample of users equals a replay of the
+simulated scores.
+
+Usage: python -m benchmarks.bench_score_history [--users 10000000] [--days 365]
+"""
+
+import argparse
+import os
+import shutil
+import time
+
+import numpy as np
+
+from benchmarks.common import timed
+from churn_scoring import TIERS, evaluate
+from score_history import open_history, record_run, tier_transitions, user_history
+
+# Daily share of users whose score changes, who churn out, and new signups
+CHANGE_RATE = 0.015
+CHURN_RATE = 0.0005
+SIGNUP_RATE = 0.001
+
+SAMPLE_USERS = 1000
+
+
+def tier_codes(score):
+    bounds = [bound for _, bound in TIERS if bound is not None]
+    return np.searchsorted(bounds, score, side='left').astype(np.int8)
+
+
+def simulate(rng, n, days):
+    """Yield (day, user_id, score, factor) for each daily run"""
+    user_id = np.arange(1, n + 1, dtype=np.int64)
+    score = rng.integers(0, 101, n).astype(np.int16)
+    factor = rng.integers(0, len(evaluate.factor_labels), n).astype(np.int8)
+    for day in range(days):
+        changed = rng.random(len(user_id)) < CHANGE_RATE
+        score[changed] = rng.integers(0, 101, int(changed.sum()))
+        factor[changed] = rng.integers(0, len(evaluate.factor_labels), int(changed.sum()))
+        keep = rng.random(len(user_id)) >= CHURN_RATE
+        signups = int(n * SIGNUP_RATE)
+        user_id = np.concatenate([user_id[keep], user_id[-1] + 1 + np.arange(signups)])
+        score = np.concatenate([score[keep], rng.integers(0, 101, signups).astype(np.int16)])
+        factor = np.concatenate([factor[keep], rng.integers(0, len(evaluate.factor_labels), signups).astype(np.int8)])
+        yield day, user_id, score, factor
+
+
+def directory_mb(path):
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path)) / 1024 ** 2
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=10_000_000)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workdir', default='/tmp/churn_bench/score_history')
+    args = parser.parse_args()
+
+    shutil.rmtree(args.workdir, ignore_errors=True)
+    rng = np.random.default_rng(args.seed)
+    sample = np.sort(rng.choice(np.arange(1, args.users + 1), SAMPLE_USERS, replace=False))
+    expected = {user: [] for user in sample}
+    first = np.datetime64('2025-01-01')
+
+    record_s, full_bytes = [], 0
+    print(f"Recording {args.days} daily runs for {args.users:,} users...")
+    for day, user_id, score, factor in simulate(rng, args.users, args.days):
+        scores = {'user_id': user_id, 'risk_score': score, 'tier_code': tier_codes(score), 'factor_code': factor}
+        run, seconds = timed(record_run, first + day, scores, args.workdir)
+        record_s.append(seconds)
+        full_bytes += len(user_id) * (8 + 2 + 1 + 1 + 1)
+        pos = np.searchsorted(user_id, sample)
+        found = user_id[np.minimum(pos, len(user_id) - 1)] == sample
+        for user, hit, p in zip(sample, found, pos):
+            expected[user].append(int(score[p]) if hit else 0)
+
+    history, open_s = timed(open_history, args.workdir)
+    stored_mb = directory_mb(args.workdir)
+    print(f"Record: median {np.median(record_s):.2f}s/run, p99 {np.percentile(record_s, 99):.2f}s")
+    print(f"Storage: {stored_mb:,.0f} MB vs {full_bytes / 1024 ** 2:,.0f} MB of daily full snapshots "
+          f"({full_bytes / 1024 ** 2 / stored_mb:.0f}x smaller); open {len(history)} runs in {open_s * 1000:.0f} ms\n")
+
+    latencies = []
+    for user in sample:
+        start = time.perf_counter()
+        past = user_history(history, user)
+        latencies.append(time.perf_counter() - start)
+        # History starts at the first scored run; earlier days are absent
+        assert past['risk_score'].tolist() == expected[user][len(expected[user]) - len(past):], user
+    latencies = np.array(latencies) * 1000
+    print(f"{'Query':<32} | {'Median':>10} | {'p99':>10} | {'Rows':>10}")
+    print("-" * 72)
+    print(f"{f'User history ({args.days} runs)':<32} | {np.median(latencies):>7.2f} ms | "
+          f"{np.percentile(latencies, 99):>7.2f} ms | {args.days:>10,}")
+    for days in (7, 30, 90):
+        transitions, seconds = timed(tier_transitions, history, days)
+        print(f"{f'Tier transitions, last {days} days':<32} | {seconds * 1000:>7.0f} ms | {'':>10} | "
+              f"{len(transitions):>10,}")
+    print(f"\nUser histories match the simulated scores for {SAMPLE_USERS:,} sampled users")
+    shutil.rmtree(args.workdir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Sharded Generation Benchmark
+Generates N users as Parquet part files at several worker counts with both
+generators (generate_realistic_data and the PRD rules in generate_dataset).
+It checks that every worker count writes byte-identical parts with unique
+user ids, and reports throughput in rows per second per core. The PRD
+generator's vectorized distributions are first checked against its
+row-by-row generate_user.
+
+Usage: python -m benchmarks.bench_sharded_generation [--users 100000000] [--workers 1 2 4 8]
+"""
+
+import argparse
+import hashlib
+import os
+import random
+import shutil
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+import generate_dataset
+import generate_realistic_data
+from benchmarks.bench_generator import profile
+from benchmarks.common import timed
+
+GENERATORS = {
+    'realistic': generate_realistic_data.generate_users_vectorized,
+    'prd': generate_dataset.generate_users_vectorized,
+}
+
+
+def prd_rows(n, seed):
+    """The PRD generator's original path: one generate_user call per user"""
+    random.seed(seed)
+    churned_count = int(n * generate_dataset.CHURNED_PERCENTAGE)
+    return pd.DataFrame([generate_dataset.generate_user(i + 1, i < churned_count) for i in range(n)])
+
+
+def file_digests(paths):
+    digests = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            digests.append(hashlib.sha256(f.read()).hexdigest())
+    return digests
+
+
+def unique_ids(paths, n):
+    """True if the parts hold user ids 1..n exactly once"""
+    seen = np.zeros(n + 1, dtype=bool)
+    for path in paths:
+        ids = pq.read_table(path, columns=['user_id'])['user_id'].to_numpy()
+        if seen[ids].any():
+            return False
+        seen[ids] = True
+    return bool(seen[1:].all())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=20_000_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--shard-rows', type=int, default=generate_realistic_data.SHARD_ROWS)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workdir', default='/tmp/churn_bench/sharded')
+    args = parser.parse_args()
+
+    expected = profile(prd_rows(100_000, 1))
+    actual = profile(generate_dataset.generate_users_vectorized(100_000, 1).to_pandas())
+    for name, value in expected.items():
+        assert np.isclose(actual[name], value, rtol=0.03, atol=0.003), (name, value, actual[name])
+    print("PRD generator: vectorized distributions match generate_user at 100,000 users")
+    print(f"{os.cpu_count()} CPU(s); {args.users:,} users in {-(-args.users // args.shard_rows):,} shards\n")
+
+    print(f"{'Generator':<10} | {'Workers':>7} | {'Wall':>8} | {'Rows/s':>11} | {'Rows/s/core':>11}")
+    print("-" * 62)
+    for name, generator in GENERATORS.items():
+        reference = None
+        for workers in args.workers:
+            output_dir = os.path.join(args.workdir, f'{name}_{workers}')
+            (_, paths, _), seconds = timed(
+                generate_realistic_data.generate_sharded, args.users, output_dir, args.seed,
+                workers, args.shard_rows, generator,
+            )
+            digests = file_digests(paths)
+            if reference is None:
+                reference = digests
+                assert unique_ids(paths, args.users), name
+            assert digests == reference, (name, workers)
+            rate = args.users / seconds
+            print(f"{name:<10} | {workers:>7} | {seconds:>7.1f}s | {rate:>11,.0f} | "
+                  f"{rate / min(workers, os.cpu_count() or 1):>11,.0f}")
+            shutil.rmtree(output_dir)
+        print(f"{name}: parts byte-identical across {args.workers} workers; user ids unique")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+"""
+SQL Engine Benchmark
+Times the six analysis queries in sql/ run by DuckDB straight over a
+Parquet file against the same results computed in pandas from the loaded
+DataFrame, as the app's pandas paths did. Every result is checked against
+its pandas counterpart first.
+
+Usage: python -m benchmarks.bench_sql [--users 10000000]
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from benchmarks.common import peak_rss_mb, timed, write_synthetic_arrow
+from churn_scoring import score_users
+from data_store import ARROW_TO_PANDAS, ROW_GROUP_SIZE
+from sql_engine import QUERY_NAMES, connect, load_queries
+
+QUERY_COLUMNS = [
+    'user_id', 'email', 'plan_type', 'monthly_revenue', 'churned', 'churn_date',
+    'days_since_signup', 'total_logins_30d', 'onboarding_step_reached',
+    'features_used_count', 'used_collaboration', 'days_since_last_login',
+]
+
+
+def write_parquet(arrow_path, parquet_path):
+    """Copy a synthetic Arrow file to Parquet with the data store's row groups"""
+    with pa.memory_map(arrow_path) as source:
+        reader = pa.ipc.open_file(source)
+        with pq.ParquetWriter(parquet_path + '.tmp', reader.schema, compression='zstd') as writer:
+            for i in range(reader.num_record_batches):
+                writer.write_batch(reader.get_batch(i), row_group_size=ROW_GROUP_SIZE)
+    os.replace(parquet_path + '.tmp', parquet_path)
+
+
+def _churn_rate(churned, users):
+    return (100.0 * churned / users).round(2)
+
+
+def pandas_funnel(df):
+    steps = df.groupby('onboarding_step_reached')['churned'].agg(['size', 'sum'])
+    return pd.DataFrame({
+        'onboarding_step_reached': steps.index,
+        'users_at_step': steps['size'].to_numpy(),
+        'pct_of_total_users': (100.0 * steps['size'] / len(df)).round(2).to_numpy(),
+        'churned_from_step': steps['sum'].to_numpy(),
+        'churn_rate_pct': _churn_rate(steps['sum'], steps['size']).to_numpy(),
+    })
+
+
+def pandas_feature_depth(df):
+    band = pd.cut(df['features_used_count'], bins=[-np.inf, 2, 5, np.inf],
+                  labels=['Low (1-2 features)', 'Medium (3-5 features)', 'High (6+ features)'])
+    bands = df.groupby(band, observed=True)['churned'].agg(['size', 'sum'])
+    result = pd.DataFrame({
+        'feature_usage_band': bands.index.astype(str),
+        'total_users': bands['size'].to_numpy(),
+        'churned_users': bands['sum'].to_numpy(),
+        'churn_rate_pct': _churn_rate(bands['sum'], bands['size']).to_numpy(),
+    })
+    return result.sort_values('churn_rate_pct', ascending=False, kind='stable')
+
+
+def pandas_collaboration(df):
+    users = df[df['days_since_signup'] >= 10]
+    groups = users.groupby('used_collaboration').agg(
+        total_users=('churned', 'size'),
+        churned_users=('churned', 'sum'),
+        avg_features_used=('features_used_count', 'mean'),
+        avg_logins_monthly=('total_logins_30d', 'mean'),
+    )
+    return pd.DataFrame({
+        'used_collaboration': np.where(groups.index, 'yes', 'no'),
+        'total_users': groups['total_users'].to_numpy(),
+        'churned_users': groups['churned_users'].to_numpy(),
+        'churn_rate_pct': _churn_rate(groups['churned_users'], groups['total_users']).to_numpy(),
+        'avg_features_used': groups['avg_features_used'].round(2).to_numpy(),
+        'avg_logins_monthly': groups['avg_logins_monthly'].round(2).to_numpy(),
+    })
+
+
+def pandas_monthly_churn(df):
+    churned = df[df['churned']]
+    dated = churned[churned['churn_date'].notna()]
+    months = pd.Series(
+        pa.array(dated['churn_date']).cast(pa.date32()).to_numpy(zero_copy_only=False).astype('datetime64[M]'),
+        index=dated.index,
+    )
+    monthly = dated.groupby(months)['monthly_revenue'].agg(['size', 'mean', 'sum'])
+    return pd.DataFrame({
+        'churn_month': monthly.index.strftime('%Y-%m'),
+        'churned_users': monthly['size'].to_numpy(),
+        'pct_of_total_churn': (100.0 * monthly['size'] / len(churned)).round(2).to_numpy(),
+        'avg_revenue_lost_per_user': monthly['mean'].round(2).to_numpy(),
+        'total_mrr_lost': monthly['sum'].to_numpy(),
+    })
+
+
+def pandas_at_risk(df):
+    scores = score_users(df)
+    at_risk = scores[scores['risk_score'] >= 31]
+    return at_risk.sort_values(['risk_score', 'monthly_revenue'], ascending=False)
+
+
+def pandas_revenue_at_risk(df):
+    at_risk = pandas_at_risk(df)
+    mrr = int(at_risk['monthly_revenue'].sum())
+    return pd.DataFrame({
+        'at_risk_users': [len(at_risk)],
+        'mrr_at_risk': [mrr],
+        'annual_arr_at_risk': [mrr * 12],
+    })
+
+
+PANDAS_QUERIES = {
+    'onboarding_funnel': pandas_funnel,
+    'feature_depth': pandas_feature_depth,
+    'collaboration_impact': pandas_collaboration,
+    'monthly_churn': pandas_monthly_churn,
+    'at_risk_users': pandas_at_risk,
+    'revenue_at_risk': pandas_revenue_at_risk,
+}
+
+
+def run_sql(con, statement):
+    """Query result as an Arrow table, which keeps the multi-million-row at-risk list compact"""
+    return con.execute(statement).to_arrow_table()
+
+
+def check_parity(name, sql_table, pandas_df):
+    """SQL and pandas results agree on every column both produce"""
+    if name == 'at_risk_users':
+        # Both sort by score and revenue only; compare rows by user
+        sql_df = sql_table.select([
+            'user_id', 'churn_risk_score', 'risk_tier', 'primary_risk_factor', 'recommended_action',
+        ]).to_pandas().sort_values('user_id')
+        pandas_df = pandas_df.sort_values('user_id')
+        assert np.array_equal(sql_df['churn_risk_score'], pandas_df['risk_score']), name
+        assert np.array_equal(sql_df['risk_tier'], pandas_df['risk_tier']), name
+        assert np.array_equal(sql_df['primary_risk_factor'], pandas_df['primary_risk_factor']), name
+        assert np.array_equal(sql_df['recommended_action'], pandas_df['recommended_action']), name
+        return
+    sql_df = sql_table.to_pandas()
+    if name == 'collaboration_impact':
+        # The query has no ORDER BY
+        sql_df = sql_df.sort_values('used_collaboration')
+        pandas_df = pandas_df.sort_values('used_collaboration')
+    for col in pandas_df.columns:
+        expected = pandas_df[col].to_numpy()
+        actual = sql_df[col].to_numpy()
+        if expected.dtype.kind in 'if':
+            # Both sides round half-values independently
+            assert np.allclose(actual.astype(float), expected.astype(float), atol=0.011), (name, col)
+        else:
+            assert np.array_equal(actual.astype(str), expected.astype(str)), (name, col)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=10_000_000)
+    parser.add_argument('--workdir', default='/tmp/churn_bench')
+    args = parser.parse_args()
+
+    os.makedirs(args.workdir, exist_ok=True)
+    arrow_path = os.path.join(args.workdir, f'users_{args.users}.arrow')
+    parquet_path = os.path.join(args.workdir, f'users_{args.users}_sql.parquet')
+    if not os.path.exists(arrow_path):
+        print(f"Writing {args.users:,} synthetic users to {arrow_path}...")
+        write_synthetic_arrow(arrow_path, args.users)
+    if not os.path.exists(parquet_path):
+        write_parquet(arrow_path, parquet_path)
+
+    queries = load_queries()
+    con = connect(parquet_path)
+    sql_results = {}
+    sql_times = {}
+    for name in QUERY_NAMES:
+        sql_results[name], sql_times[name] = timed(run_sql, con, queries[name])
+    con.close()
+    sql_peak = peak_rss_mb()
+
+    df, load_s = timed(lambda: pq.read_table(parquet_path, columns=QUERY_COLUMNS)
+                       .to_pandas(types_mapper=ARROW_TO_PANDAS.get))
+
+    print(f"{args.users:,} users; pandas load {load_s:.2f}s "
+          f"(DuckDB reads Parquet inside each query; peak RSS after SQL {sql_peak:,.0f} MB)\n")
+    print(f"{'Query':<22} | {'pandas':>9} | {'DuckDB':>9} | {'Speedup':>7}")
+    print("-" * 58)
+    for name in QUERY_NAMES:
+        expected, pandas_s = timed(PANDAS_QUERIES[name], df)
+        check_parity(name, sql_results.pop(name), expected)
+        del expected
+        print(f"{name:<22} | {pandas_s * 1e3:>6,.0f} ms | {sql_times[name] * 1e3:>6,.0f} ms | "
+              f"{pandas_s / sql_times[name]:>6.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""
+Startup Profile
+Launches `streamlit run app.py` headless with Python's import profiler on
+(PYTHONPROFILEIMPORTTIME, the same output as -X importtime), then opens a
+browser session over the app's websocket. Reports, from process launch:
+- server ready: the health check answers
+- first paint: the session receives its first element
+- header shown: sidebar navigation and page header are on screen
+- page complete: the script run has finished
+and the slowest modules the session imported, each marked as loaded
+before or after the header was shown.
+
+Checks: churn_scoring imports nothing outside the standard library but
+numpy, and plotly is not imported before the header is shown.
+
+Usage: python -m benchmarks.bench_startup [--workdir .] [--top 15]
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import aiohttp
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+PORT = 8599
+
+# Markup that only the page header contains (the CSS block styles the class too)
+HEADER_MARK = 'class="header-container"'
+
+
+def import_times(lines):
+    """Top-level entries of importtime output: (seconds, module, arrived at)"""
+    entries = []
+    for arrived, line in lines:
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        # Nested imports are indented under the module that triggered them
+        if not name.startswith('  '):
+            entries.append((int(cumulative) / 1e6, name.strip(), arrived))
+    return entries
+
+
+def third_party_imports(module):
+    """Top-level packages outside the standard library that `import module` loads"""
+    script = (f"import sys; before = set(sys.modules); import {module}; "
+              f"print(*{{name.split('.')[0] for name in set(sys.modules) - before}})")
+    loaded = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True)
+    # cython_runtime is registered by compiled extensions such as numpy's
+    packages = set(loaded.stdout.split()) - set(sys.stdlib_module_names) - {module, 'cython_runtime'}
+    return {name for name in packages if not name.startswith('_')}
+
+
+async def open_session(port, launched, timeout=600):
+    """Wait for the server, run the script in one session; returns event times"""
+    events = {}
+    async with aiohttp.ClientSession() as session:
+        while 'ready' not in events:
+            try:
+                async with session.get(f'http://127.0.0.1:{port}/_stcore/health') as response:
+                    if response.status == 200:
+                        events['ready'] = time.perf_counter() - launched
+            except aiohttp.ClientConnectionError:
+                await asyncio.sleep(0.05)
+
+        async with session.ws_connect(f'ws://127.0.0.1:{port}/_stcore/stream', protocols=['streamlit']) as ws:
+            rerun = BackMsg()
+            rerun.rerun_script.query_string = ''
+            await ws.send_bytes(rerun.SerializeToString())
+            async for message in ws:
+                if time.perf_counter() - launched > timeout:
+                    raise TimeoutError("The script did not finish")
+                msg = ForwardMsg.FromString(message.data)
+                kind = msg.WhichOneof('type')
+                now = time.perf_counter() - launched
+                if kind == 'delta':
+                    events.setdefault('first_paint', now)
+                    if HEADER_MARK in msg.delta.new_element.markdown.body:
+                        events.setdefault('header', now)
+                elif kind == 'script_finished':
+                    events['complete'] = now
+                    return events
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workdir', default='.', help="Directory the app runs in (with data/)")
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--port', type=int, default=PORT)
+    args = parser.parse_args()
+
+    repo = os.getcwd()
+    command = [sys.executable, '-m', 'streamlit', 'run', os.path.join(repo, 'app.py'),
+               '--server.headless', 'true', '--server.port', str(args.port),
+               '--browser.gatherUsageStats', 'false']
+    env = {**os.environ, 'PYTHONPATH': repo, 'PYTHONPROFILEIMPORTTIME': '1', 'PYTHONUNBUFFERED': '1'}
+    launched = time.perf_counter()
+    process = subprocess.Popen(command, cwd=args.workdir, env=env, text=True,
+                               stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    lines = []
+
+    def read_output():
+        for line in process.stdout:
+            lines.append((time.perf_counter() - launched, line.rstrip('\n')))
+
+    reader = threading.Thread(target=read_output, daemon=True)
+    reader.start()
+    try:
+        events = asyncio.run(open_session(args.port, launched))
+    finally:
+        process.terminate()
+        process.wait()
+        reader.join()
+
+    print(f"{'Milestone':<44} | {'Since launch':>12}")
+    print("-" * 60)
+    for key, label in [('ready', 'Server ready'), ('first_paint', 'First paint (first element)'),
+                       ('header', 'Navigation and header shown'), ('complete', 'Page complete (script finished)')]:
+        print(f"{label:<44} | {events[key] * 1000:>9.0f} ms")
+
+    session = [entry for entry in import_times(lines) if entry[2] >= events['ready']]
+    total = sum(seconds for seconds, _, _ in session)
+    print(f"\nModules imported by the session: {len(session)}, {total * 1000:,.0f} ms in total")
+    print(f"{'Module':<44} | {'Cumulative':>12} | {'Loaded':<14}")
+    print("-" * 78)
+    for seconds, name, arrived in sorted(session, reverse=True)[:args.top]:
+        loaded = 'before header' if arrived < events['header'] else 'after header'
+        print(f"{name:<44} | {seconds * 1000:>9.1f} ms | {loaded:<14}")
+
+    scoring_deps = third_party_imports('churn_scoring')
+    plotly_early = [name for _, name, arrived in session
+                    if name.split('.')[0] == 'plotly' and arrived < events['header']]
+    print(f"\nchurn_scoring imports: {', '.join(sorted(scoring_deps)) or 'standard library only'}")
+    print(f"plotly before the header: {', '.join(plotly_early) or 'none'}")
+    assert scoring_deps <= {'numpy'}, scoring_deps
+    assert not plotly_early, plotly_early
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Streaming Scorer Memory Benchmark
+Runs score_batch.py in a fresh process over synthetic exports of growing
+size and with different chunk sizes, and reports peak resident memory.
+Each export is scored as CSV and as Parquet written as a single row group,
+larger than any chunk.
+
+Checks: for each format and chunk size, peak RSS on the largest input is
+within RSS_GROWTH of the smallest, so it tracks the chunk size rather than
+the input size.
+
+Usage: python -m benchmarks.bench_streaming [--rows 1000000 4000000] [--chunks 100000 400000]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
+
+from benchmarks.common import write_synthetic_csv
+from data_store import ARROW_SCHEMA, csv_convert_options
+
+# Allowed peak RSS growth from the smallest to the largest input
+RSS_GROWTH = 1.25
+
+CHILD = '''
+import json, sys, time
+from benchmarks.common import peak_rss_mb
+from score_batch import score_file, summarize
+start = time.perf_counter()
+totals = score_file(sys.argv[1], sys.argv[2], int(sys.argv[3]))
+print(json.dumps({{'seconds': time.perf_counter() - start, 'peak_rss_mb': peak_rss_mb(),
+                  'scored': summarize(totals)['users_scored']}}))
+'''
+
+
+def run(input_path, output_path, chunk_rows):
+    out = subprocess.run(
+        [sys.executable, '-c', CHILD.format(), input_path, output_path, str(chunk_rows)],
+        capture_output=True, text=True, check=True,
+        env={**os.environ, 'PYTHONPATH': os.getcwd()},
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def write_one_row_group(csv_path, parquet_path):
+    """The CSV export as Parquet with every row in one row group"""
+    table = pv.read_csv(csv_path, convert_options=csv_convert_options(ARROW_SCHEMA))
+    pq.write_table(table, parquet_path, row_group_size=len(table))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 4_000_000])
+    parser.add_argument('--chunks', type=int, nargs='+', default=[100_000, 400_000])
+    parser.add_argument('--workdir', default='/tmp/churn_bench')
+    args = parser.parse_args()
+
+    os.makedirs(args.workdir, exist_ok=True)
+    print(f"{'Input rows':>12} | {'Format':<22} | {'Chunk rows':>10} | {'File MB':>8} | {'Time':>7} | {'Peak RSS':>9}")
+    print("-" * 85)
+    peaks = {}
+    for rows in sorted(args.rows):
+        csv_path = os.path.join(args.workdir, f'users_{rows}.csv')
+        if not os.path.exists(csv_path):
+            write_synthetic_csv(csv_path, rows)
+        parquet_path = os.path.join(args.workdir, f'users_{rows}_one_row_group.parquet')
+        write_one_row_group(csv_path, parquet_path)
+        inputs = [('CSV', csv_path), ('Parquet, one row group', parquet_path)]
+        for name, input_path in inputs:
+            size_mb = os.path.getsize(input_path) / 1024 ** 2
+            for chunk_rows in args.chunks:
+                out_path = os.path.join(args.workdir, f'scored_{rows}_{chunk_rows}.parquet')
+                r = run(input_path, out_path, chunk_rows)
+                os.remove(out_path)
+                assert r['scored'] > 0
+                peaks.setdefault((name, chunk_rows), []).append(r['peak_rss_mb'])
+                print(f"{rows:>12,} | {name:<22} | {chunk_rows:>10,} | {size_mb:>8,.0f} | "
+                      f"{r['seconds']:>6.1f}s | {r['peak_rss_mb']:>6,.0f} MB")
+        os.remove(parquet_path)
+
+    for (name, chunk_rows), mb in peaks.items():
+        assert mb[-1] <= mb[0] * RSS_GROWTH, f"{name}, {chunk_rows:,}-row chunks: peak RSS grew {mb[0]:.0f} -> {mb[-1]:.0f} MB"
+    print(f"\nPeak RSS stays within {RSS_GROWTH}x of the smallest input for every format and chunk size")
+
+if __name__ == '__main__':
+    main()
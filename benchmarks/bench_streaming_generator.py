@@ -0,0 +1,101 @@
+"""
+Streaming Generator Benchmark
+Runs the row-by-row generator (generate_realistic_data.py) in a fresh
+process at several user counts and reports time and peak memory. The
+streaming writer is compared with the original list + random.shuffle +
+DictWriter pipeline. Each streamed file is checked for unique user ids and
+for the summary statistics the generator printed.
+
+Usage: python -m benchmarks.bench_streaming_generator [--users 100000 300000 1000000]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import pandas as pd
+
+from churn_scoring import evaluate
+
+CHILD_TEMPLATE = '''
+import csv, json, random, time
+import generate_realistic_data as g
+
+def peak_rss_kb():
+    with open('/proc/self/status') as f:
+        return next(int(line.split()[1]) for line in f if line.startswith('VmHWM'))
+
+N, OUT = {users}, {output!r}
+random.seed(1)
+rss_before = peak_rss_kb()
+start = time.perf_counter()
+{body}
+print(json.dumps({{'seconds': time.perf_counter() - start,
+                  'peak_rss_mb': (peak_rss_kb() - rss_before) / 1024, 'stats': stats}}))
+'''
+
+PIPELINES = {
+    'List + shuffle + DictWriter': '''
+users = []
+for user_type, count in g.user_type_counts(N).items():
+    users.extend(g.generate_user(len(users) + 1, user_type) for _ in range(count))
+random.shuffle(users)
+with open(OUT, 'w', newline='') as f:
+    writer = csv.DictWriter(f, fieldnames=g.FIELDNAMES)
+    writer.writeheader()
+    writer.writerows(users)
+stats = {}
+''',
+    'Streaming batches': '''
+stats = g.generate_streaming(N, OUT)
+stats['logins'] = dict(stats['logins'])
+''',
+}
+
+
+def run_child(body, users, output):
+    code = CHILD_TEMPLATE.format(users=users, output=output, body=body)
+    out = subprocess.run(
+        [sys.executable, '-c', code], capture_output=True, text=True, check=True,
+        env={**os.environ, 'PYTHONPATH': os.getcwd()},
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def check_output(path, users, stats):
+    """Unique ids 1..N, and online statistics equal to a recount of the file"""
+    df = pd.read_csv(path)
+    assert len(df) == users and df['user_id'].is_unique
+    assert df['user_id'].min() == 1 and df['user_id'].max() == users
+    active = df[df['churned'] == 'no']
+    assert stats['active'] == len(active)
+    assert stats['active_mrr'] == int(active['monthly_revenue'].sum())
+    assert stats['churned_mrr'] == int(df.loc[df['churned'] == 'yes', 'monthly_revenue'].sum())
+    assert stats['at_risk'] == int((evaluate(active)['risk_tier'] != 'GREEN').sum())
+    counts = active['total_logins_30d'].value_counts()
+    assert {int(k): int(v) for k, v in counts.items()} == {int(k): v for k, v in stats['logins'].items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, nargs='+', default=[100_000, 300_000, 1_000_000])
+    parser.add_argument('--workdir', default='/tmp/churn_bench')
+    args = parser.parse_args()
+
+    os.makedirs(args.workdir, exist_ok=True)
+    print(f"{'Users':>10} | {'Pipeline':<28} | {'Time':>8} | {'Peak RSS':>9}")
+    print("-" * 66)
+    for users in args.users:
+        output = os.path.join(args.workdir, f'generated_{users}.csv')
+        for name, body in PIPELINES.items():
+            r = run_child(body, users, output)
+            print(f"{users:>10,} | {name:<28} | {r['seconds']:>7.1f}s | {r['peak_rss_mb']:>6,.0f} MB")
+        check_output(output, users, r['stats'])
+        os.remove(output)
+    print("\nStreamed files: user ids unique, online statistics match a recount of the file")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Shared helpers for the benchmark scripts
+Synthetic user tables and a small timing utility
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+PLANS = {'Basic': 29, 'Pro': 79, 'Team': 199}
+
+
+def synthetic_users(n, seed=42):
+    """Build an n-row user table with the same columns as the dataset CSV"""
+    rng = np.random.default_rng(seed)
+    plan_names = np.array(list(PLANS), dtype=object)
+    plans = plan_names[rng.choice(3, size=n, p=[0.6, 0.3, 0.1])]
+    churned = np.where(rng.random(n) < 0.25, 'yes', 'no').astype(object)
+
+    signup = pd.Timestamp('2024-07-01') + pd.to_timedelta(rng.integers(0, 549, n), unit='D')
+    days_since_last_login = rng.integers(0, 91, n)
+    last_login = pd.Timestamp('2025-12-31') - pd.to_timedelta(days_since_last_login, unit='D')
+    churn_date = pd.Series(signup + pd.to_timedelta(rng.integers(30, 91, n), unit='D'))
+    churn_date[churned == 'no'] = pd.NaT
+
+    return pd.DataFrame({
+        'user_id': np.arange(1, n + 1),
+        'email': [f'user{i}@example.com' for i in range(1, n + 1)],
+        'signup_date': signup,
+        'plan_type': plans,
+        'monthly_revenue': pd.Series(plans).map(PLANS).to_numpy(),
+        'churned': churned,
+        'churn_date': churn_date,
+        'last_login_date': last_login,
+        'days_since_last_login': days_since_last_login,
+        'total_logins_30d': rng.integers(0, 46, n),
+        'features_used_count': rng.integers(1, 8, n),
+        'onboarding_step_reached': rng.integers(1, 9, n),
+        'used_collaboration': np.where(rng.random(n) < 0.45, 'yes', 'no').astype(object),
+        'support_tickets_raised': rng.integers(0, 4, n),
+        'days_since_signup': rng.integers(0, 549, n),
+    })
+
+
+def write_synthetic_csv(path, rows, chunk_rows=1_000_000):
+    """Write an n-row synthetic export in chunks so the writer stays small"""
+    for i, start in enumerate(range(0, rows, chunk_rows)):
+        chunk = synthetic_users(min(chunk_rows, rows - start), seed=i)
+        chunk['user_id'] += start
+        chunk['email'] = 'user' + chunk['user_id'].astype(str) + '@example.com'
+        chunk.to_csv(path, mode='w' if i == 0 else 'a', header=(i == 0),
+                     index=False, date_format='%Y-%m-%d')
+    return path
+
+
+def write_synthetic_arrow(path, rows, chunk_rows=1_000_000):
+    """Write an n-row synthetic export as a typed Arrow IPC file, one batch per chunk"""
+    import pyarrow as pa
+
+    from data_store import ARROW_SCHEMA, apply_schema
+
+    with pa.ipc.new_file(path, ARROW_SCHEMA) as writer:
+        for i, start in enumerate(range(0, rows, chunk_rows)):
+            chunk = synthetic_users(min(chunk_rows, rows - start), seed=i)
+            chunk['user_id'] += start
+            chunk['email'] = 'user' + chunk['user_id'].astype(str) + '@example.com'
+            table = pa.Table.from_pandas(apply_schema(chunk), preserve_index=False)
+            for batch in table.cast(ARROW_SCHEMA).to_batches():
+                writer.write_batch(batch)
+    return path
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process so far (Linux VmHWM)"""
+    with open('/proc/self/status') as f:
+        kb = next(int(line.split()[1]) for line in f if line.startswith('VmHWM'))
+    return kb / 1024
+
+
+def timed(fn, *args, repeat=1, **kwargs):
+    """Run fn and return (result, best wall-clock seconds over repeat runs)"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return result, best
@@ -0,0 +1,244 @@
+"""
+Churn Intelligence System - Risk Scoring Engine
+Declarative rule table for the 5-signal churn model, compiled once into a
+vectorized evaluator. Shared by the dashboard, batch jobs and generators.
+"""
+
+import operator
+
+import numpy as np
+
+# =============================================================================
+# RULE TABLE
+# =============================================================================
+
+# Each signal fires when `column <op> threshold` and then adds `weight` points.
+# Order matters: ties on the primary risk factor go to the earlier signal.
+SIGNALS = [
+    {
+        'signal': 'Login Frequency',
+        'factor': 'Low Login Frequency',
+        'column': 'total_logins_30d',
+        'op': '<',
+        'threshold': 2,
+        'weight': 25,
+        'default': 0,
+        'impact': 'HIGH',
+        'alert_label': '⚠️ Low (<2 logins)',
+        'healthy_label': '✅ Healthy',
+    },
+    {
+        'signal': 'Onboarding Progress',
+        'factor': 'Onboarding Stalled',
+        'column': 'onboarding_step_reached',
+        'op': '<=',
+        'threshold': 3,
+        'weight': 20,
+        'default': 1,
+        'impact': 'MEDIUM',
+        'alert_label': '⚠️ Step {value}',
+        'healthy_label': '✅ Step 4+',
+    },
+    {
+        'signal': 'Feature Usage',
+        'factor': 'Low Feature Adoption',
+        'column': 'features_used_count',
+        'op': '<=',
+        'threshold': 2,
+        'weight': 20,
+        'default': 0,
+        'impact': 'MEDIUM',
+        'alert_label': '⚠️ {value} features',
+        'healthy_label': '✅ 3+ features',
+    },
+    {
+        'signal': 'Collaboration',
+        'factor': 'No Collaboration',
+        'column': 'used_collaboration',
+        'op': '==',
+        'threshold': False,
+        'weight': 20,
+        'default': False,
+        'impact': 'MEDIUM',
+        'alert_label': '⚠️ Not used',
+        'healthy_label': '✅ Used',
+    },
+    {
+        'signal': 'Inactivity',
+        'factor': 'Inactive 7+ Days',
+        'column': 'days_since_last_login',
+        'op': '>=',
+        'threshold': 7,
+        'weight': 15,
+        'default': 0,
+        'impact': 'LOW',
+        'alert_label': '⚠️ {value} days',
+        'healthy_label': '✅ Active',
+    },
+]
+
+# Upper score bound (inclusive) for each tier; the last tier catches the rest
+TIERS = [
+    ('GREEN', 30),
+    ('AMBER', 60),
+    ('RED', None),
+]
+
+ACTIONS = {
+    'GREEN': 'Monitor Monthly',
+    'AMBER': 'Send Nudge (48hr)',
+    'RED': 'Human Outreach (24hr)',
+}
+
+HEALTHY_FACTOR = 'Healthy'
+
+OPERATORS = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '==': operator.eq,
+    '!=': operator.ne,
+}
+
+# Yes/no columns; accepted as booleans or as the CSV's 'yes'/'no' strings
+FLAG_COLUMNS = ('churned', 'used_collaboration')
+
+# Columns carried through from the input into the scores table
+PASSTHROUGH_COLUMNS = ['user_id', 'email', 'plan_type', 'monthly_revenue']
+
+# =============================================================================
+# COMPILER
+# =============================================================================
+
+def compile_rules(signals=SIGNALS, tiers=TIERS, actions=ACTIONS):
+    """Compile a rule table into a function that scores whole columns at once"""
+    if not signals:
+        raise ValueError("Rule table needs at least one signal")
+    for rule in signals:
+        if rule['op'] not in OPERATORS:
+            raise ValueError(f"Unknown operator {rule['op']!r} in signal {rule['signal']!r}")
+
+    compares = [OPERATORS[rule['op']] for rule in signals]
+    weights = np.array([rule['weight'] for rule in signals], dtype=np.int16)
+    factor_labels = np.array([rule['factor'] for rule in signals] + [HEALTHY_FACTOR], dtype=object)
+    healthy_code = len(signals)
+
+    tier_labels = np.array([name for name, _ in tiers], dtype=object)
+    tier_bounds = np.array([bound for _, bound in tiers[:-1]])
+    action_labels = np.array([actions[name] for name, _ in tiers], dtype=object)
+
+    def evaluate(columns):
+        """Score a mapping of column name -> array; returns a dict of arrays"""
+        n = _length(columns)
+
+        signal_scores = np.zeros((n, len(signals)), dtype=np.int16)
+        for j, rule in enumerate(signals):
+            values = _column(columns, rule['column'], rule['default'], n)
+            fired = np.asarray(compares[j](values, rule['threshold']), dtype=bool)
+            signal_scores[:, j] = fired * weights[j]
+
+        total = signal_scores.sum(axis=1, dtype=np.int64)
+
+        # Tier: first bound the score does not exceed
+        tier_code = np.searchsorted(tier_bounds, total, side='left')
+
+        # argmax returns the first maximum, so rule order breaks ties
+        factor_code = np.where(total > 0, signal_scores.argmax(axis=1), healthy_code)
+
+        return {
+            'signal_scores': signal_scores,
+            'risk_score': total,
+            'tier_code': tier_code,
+            'risk_tier': tier_labels[tier_code],
+            'factor_code': factor_code,
+            'primary_risk_factor': factor_labels[factor_code],
+            'recommended_action': action_labels[tier_code],
+        }
+
+    evaluate.signals = signals
+    evaluate.tier_labels = tier_labels
+    evaluate.factor_labels = factor_labels
+    evaluate.action_labels = action_labels
+    return evaluate
+
+
+def _length(columns):
+    """Row count of a DataFrame or a dict of equal-length arrays"""
+    if hasattr(columns, 'shape'):
+        return columns.shape[0]
+    return len(next(iter(columns.values()))) if columns else 0
+
+
+def _column(columns, name, default, n):
+    """Fetch a column as an array, falling back to the rule default if missing"""
+    if name not in columns:
+        return np.full(n, default)
+    values = np.asarray(columns[name])
+    if name in FLAG_COLUMNS and values.dtype != bool:
+        return values == 'yes'
+    return values
+
+
+# Compiled once at import; callers share this evaluator
+evaluate = compile_rules()
+
+# =============================================================================
+# PUBLIC API
+# =============================================================================
+
+def active_mask(columns):
+    """Boolean mask of users that have not churned"""
+    return ~_column(columns, 'churned', False, _length(columns))
+
+
+def input_columns(signals=SIGNALS):
+    """Columns a user's score depends on: churn status plus every signal column"""
+    return ['churned'] + [rule['column'] for rule in signals]
+
+
+def signal_inputs(columns, signals=SIGNALS):
+    """Normalized input arrays (flags as booleans, defaults filled) keyed by column"""
+    n = _length(columns)
+    inputs = {'churned': _column(columns, 'churned', False, n)}
+    for rule in signals:
+        inputs[rule['column']] = _column(columns, rule['column'], rule['default'], n)
+    return inputs
+
+
+def score_users(df, evaluator=None):
+    """Score every active user in a DataFrame and return the scores table"""
+    import pandas as pd
+
+    evaluator = evaluator or evaluate
+    active = active_mask(df)
+    users = df[active]
+    result = evaluator(users)
+    n = len(users)
+
+    scores = {col: users[col].to_numpy() for col in PASSTHROUGH_COLUMNS}
+    scores['risk_score'] = result['risk_score']
+    scores['risk_tier'] = result['risk_tier']
+    scores['primary_risk_factor'] = result['primary_risk_factor']
+    scores['recommended_action'] = result['recommended_action']
+    for rule in evaluator.signals:
+        scores[rule['column']] = _column(users, rule['column'], rule['default'], n)
+
+    return pd.DataFrame(scores)
+
+
+def signal_breakdown(user, signals=SIGNALS):
+    """Per-signal score, status and impact rows for a single user record"""
+    rows = []
+    for rule in signals:
+        value = user.get(rule['column'], rule['default'])
+        if rule['column'] in FLAG_COLUMNS and isinstance(value, str):
+            value = value == 'yes'
+        fired = bool(OPERATORS[rule['op']](value, rule['threshold']))
+        rows.append({
+            'Signal': rule['signal'],
+            'Score': rule['weight'] if fired else 0,
+            'Status': (rule['alert_label'] if fired else rule['healthy_label']).format(value=value),
+            'Impact': rule['impact'] if fired else 'NONE',
+        })
+    return rows
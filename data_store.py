@@ -0,0 +1,164 @@
+"""
+Churn Intelligence System - Columnar Storage Layer
+Converts the user CSV to a typed Parquet file once and reads back
+only the columns a caller needs.
+"""
+
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
+
+# Configuration
+DATA_CSV = 'data/churn_intelligence_dataset.csv'
+DATA_PARQUET = 'data/churn_intelligence_dataset.parquet'
+
+# plan_type holds a handful of plan names
+CATEGORY = pa.dictionary(pa.int8(), pa.string())
+
+# 'yes'/'no' columns in the CSV, stored as booleans
+FLAG_COLUMNS = ('churned', 'used_collaboration')
+
+ARROW_SCHEMA = pa.schema([
+    ('user_id', pa.int32()),
+    ('email', pa.string()),
+    ('signup_date', pa.date32()),
+    ('plan_type', CATEGORY),
+    ('monthly_revenue', pa.int16()),
+    ('churned', pa.bool_()),
+    ('churn_date', pa.date32()),
+    ('last_login_date', pa.date32()),
+    ('days_since_last_login', pa.int16()),
+    ('total_logins_30d', pa.int16()),
+    ('features_used_count', pa.int8()),
+    ('onboarding_step_reached', pa.int8()),
+    ('used_collaboration', pa.bool_()),
+    ('support_tickets_raised', pa.int8()),
+    ('days_since_signup', pa.int16()),
+])
+
+# Smallest safe pandas dtype per column, matching ARROW_SCHEMA in memory
+FRAME_DTYPES = {
+    'user_id': 'int32',
+    'email': pd.StringDtype('pyarrow'),
+    'signup_date': pd.ArrowDtype(pa.date32()),
+    'plan_type': 'category',
+    'monthly_revenue': 'int16',
+    'churned': 'bool',
+    'churn_date': pd.ArrowDtype(pa.date32()),
+    'last_login_date': pd.ArrowDtype(pa.date32()),
+    'days_since_last_login': 'int16',
+    'total_logins_30d': 'int16',
+    'features_used_count': 'int8',
+    'onboarding_step_reached': 'int8',
+    'used_collaboration': 'bool',
+    'support_tickets_raised': 'int8',
+    'days_since_signup': 'int16',
+}
+
+# Row groups sized for fast column-pruned scans on large exports
+ROW_GROUP_SIZE = 1_000_000
+
+# =============================================================================
+# CONVERSION
+# =============================================================================
+
+def csv_convert_options(schema=ARROW_SCHEMA):
+    """pyarrow CSV options that parse the user CSV into `schema`'s types"""
+    # Parse categoricals as plain strings; callers dictionary-encode them
+    column_types = {
+        field.name: pa.string() if pa.types.is_dictionary(field.type) else field.type
+        for field in schema
+    }
+    return pv.ConvertOptions(
+        column_types=column_types,
+        include_columns=list(schema.names),
+        include_missing_columns=True,
+        true_values=['yes'],
+        false_values=['no'],
+    )
+
+
+def read_csv_table(csv_path=DATA_CSV, schema=ARROW_SCHEMA):
+    """Parse the user CSV straight into a typed Arrow table"""
+    table = pv.read_csv(csv_path, convert_options=csv_convert_options(schema))
+    return table.cast(schema)
+
+
+def convert_csv_to_parquet(csv_path=DATA_CSV, parquet_path=DATA_PARQUET):
+    """Write the CSV as a typed Parquet file and return the Parquet path"""
+    table = read_csv_table(csv_path)
+    tmp_path = parquet_path + '.tmp'
+    pq.write_table(table, tmp_path, row_group_size=ROW_GROUP_SIZE, compression='zstd')
+    os.replace(tmp_path, parquet_path)
+    return parquet_path
+
+
+def is_stale(csv_path=DATA_CSV, parquet_path=DATA_PARQUET):
+    """True if the Parquet copy is missing, older than the CSV or on an old schema"""
+    if not os.path.exists(parquet_path):
+        return True
+    if os.path.getmtime(parquet_path) < os.path.getmtime(csv_path):
+        return True
+    return not pq.read_schema(parquet_path).remove_metadata().equals(ARROW_SCHEMA)
+
+
+def ensure_parquet(csv_path=DATA_CSV, parquet_path=DATA_PARQUET):
+    """Convert the CSV if needed; returns the Parquet path, or None if unwritable"""
+    if not is_stale(csv_path, parquet_path):
+        return parquet_path
+    try:
+        return convert_csv_to_parquet(csv_path, parquet_path)
+    except OSError:
+        # Read-only deployments fall back to parsing the CSV each load
+        return None
+
+ARROW_TO_PANDAS = {
+    pa.string(): FRAME_DTYPES['email'],
+    pa.date32(): FRAME_DTYPES['signup_date'],
+}
+
+# =============================================================================
+# LOADING
+# =============================================================================
+
+def read_table(columns=None, csv_path=DATA_CSV, parquet_path=DATA_PARQUET):
+    """Read the user table as Arrow, pruned to `columns` when given"""
+    if not os.path.exists(csv_path) and not os.path.exists(parquet_path):
+        raise FileNotFoundError(csv_path)
+
+    if os.path.exists(csv_path):
+        parquet_path = ensure_parquet(csv_path, parquet_path)
+
+    if parquet_path is None:
+        table = read_csv_table(csv_path)
+        return table.select(list(columns)) if columns else table
+
+    return pq.read_table(parquet_path, columns=list(columns) if columns else None)
+
+
+def load_users(columns=None, csv_path=DATA_CSV, parquet_path=DATA_PARQUET):
+    """Load the user table as a pandas DataFrame, pruned to `columns` when given"""
+    table = read_table(columns, csv_path, parquet_path)
+    # Strings and dates stay Arrow-backed instead of one Python object per row
+    return table.to_pandas(types_mapper=ARROW_TO_PANDAS.get)
+
+
+def apply_schema(df):
+    """Downcast a frame with the original CSV dtypes to FRAME_DTYPES"""
+    df = df.copy()
+    for col, dtype in FRAME_DTYPES.items():
+        if col not in df.columns:
+            continue
+        if col in FLAG_COLUMNS and df[col].dtype != bool:
+            df[col] = df[col] == 'yes'
+        else:
+            df[col] = df[col].astype(dtype)
+    return df
+
+
+def memory_per_user(df):
+    """Deep memory footprint of each column, in bytes per row"""
+    return df.memory_usage(index=False, deep=True) / max(len(df), 1)
@@ -0,0 +1,268 @@
+"""
+Churn Intelligence System - Activity Event Log
+Raw per-user login and feature events, and the aggregation that rebuilds
+the snapshot columns from them (total_logins_30d, last_login_date,
+days_since_last_login, features_used_count) for any as-of date.
+
+Events are stored as zstd Parquet, one row per event, sorted by user and
+date. Generation works through the user table in chunks and aggregation
+reads the log in fixed-size batches, so neither holds the whole log.
+A churned user's window ends at their churn date, because their activity
+stops there.
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from data_store import read_csv_table
+
+# Rolling window behind total_logins_30d
+WINDOW_DAYS = 30
+
+EVENT_TYPES = ['login', 'feature']
+LOGIN, FEATURE = 0, 1
+
+# Feature catalog; features_used_count counts distinct feature ids used
+FEATURES = [
+    'Tasks', 'Team Huddles', 'Workflow Builder', 'Docs', 'Calendar', 'Reports', 'Integrations',
+]
+
+# Dictionary-encoded type, so a column of 'login'/'feature' costs a byte per event
+EVENT_SCHEMA = pa.schema([
+    ('user_id', pa.int32()),
+    ('event_date', pa.date32()),
+    ('event_type', pa.dictionary(pa.int8(), pa.string())),
+    ('feature', pa.dictionary(pa.int8(), pa.string())),
+])
+
+# Users per generation chunk (one Parquet row group each)
+USERS_PER_CHUNK = 250_000
+
+# Events decoded per aggregation step
+AGGREGATE_BATCH_ROWS = 1 << 20
+
+# Pre-window login rate floor (logins per day) for users idle in the window
+MIN_DAILY_LOGINS = 0.05
+
+# =============================================================================
+# DATES
+# =============================================================================
+
+def to_days(values):
+    """Arrow/pandas dates -> int64 days since epoch (missing -> -1)"""
+    if isinstance(values, pa.ChunkedArray):
+        values = values.combine_chunks()
+    elif not isinstance(values, pa.Array):
+        values = pa.array(values)
+    days = values.cast(pa.date32()).fill_null(-1)
+    return days.to_numpy(zero_copy_only=False).astype(np.int64)
+
+
+def reference_days(churned, churn_dates, as_of, clamp=True):
+    """Last day of each user's window: the as-of date, or the churn date if earlier.
+
+    With clamp=False a churn date after as_of is kept, which is how far a
+    churned user's generated history runs.
+    """
+    as_of_day = int(np.datetime64(as_of, 'D').astype(np.int64))
+    churn = to_days(churn_dates)
+    end = np.minimum(churn, as_of_day) if clamp else churn
+    return np.where(np.asarray(churned) & (churn >= 0), end, as_of_day)
+
+# =============================================================================
+# GENERATION
+# =============================================================================
+
+def _uniform_days(rng, low, high):
+    """One uniform integer day in [low, high] per element (high >= low)"""
+    return low + (rng.random(len(low)) * (high - low + 1)).astype(np.int64)
+
+
+def _chunk_events(rng, user_id, signup, ref, last_login, logins_30d, features_used):
+    """Event columns for one chunk of users, sorted by user and date"""
+    n = len(user_id)
+    rows = np.arange(n)
+    last = np.maximum(last_login, signup)
+    window_start = np.maximum(ref - WINDOW_DAYS + 1, signup)
+
+    # The last login, the rest of the window's logins, and older history
+    extra = np.maximum(logins_30d, 1) - 1
+    history_days = np.maximum(window_start - signup, 0)
+    rate = np.maximum(logins_30d / WINDOW_DAYS, MIN_DAILY_LOGINS)
+    history = rng.poisson(rate * history_days)
+
+    window_rows = np.repeat(rows, extra)
+    history_rows = np.repeat(rows, history)
+    login_rows = np.concatenate([rows, window_rows, history_rows])
+    login_days = np.concatenate([
+        last,
+        _uniform_days(rng, window_start[window_rows], last[window_rows]),
+        _uniform_days(rng, signup[history_rows], window_start[history_rows] - 1),
+    ])
+
+    # features_used distinct features, each first used between signup and the last login
+    order = np.argsort(rng.random((n, len(FEATURES))), axis=1)
+    picked = np.arange(len(FEATURES)) < np.asarray(features_used)[:, None]
+    feature_rows, slot = np.nonzero(picked)
+    feature_ids = order[feature_rows, slot]
+    feature_days = _uniform_days(rng, signup[feature_rows], last[feature_rows])
+
+    event_rows = np.concatenate([login_rows, feature_rows])
+    days = np.concatenate([login_days, feature_days])
+    kinds = np.concatenate([np.full(len(login_rows), LOGIN, np.int8), np.full(len(feature_rows), FEATURE, np.int8)])
+    features = np.concatenate([np.full(len(login_rows), -1, np.int8), feature_ids.astype(np.int8)])
+
+    # One int64 key (row, day offset) sorts much faster than lexsort on two columns
+    sort = np.argsort(event_rows * (1 << 20) + (days - days.min()))
+    feature_codes = pa.array(features[sort], mask=features[sort] < 0)
+    return pa.record_batch([
+        pa.array(user_id[event_rows[sort]], pa.int32()),
+        pa.array(days[sort].astype(np.int32)).view(pa.date32()),
+        pa.DictionaryArray.from_arrays(pa.array(kinds[sort]), pa.array(EVENT_TYPES)),
+        pa.DictionaryArray.from_arrays(feature_codes, pa.array(FEATURES)),
+    ], schema=EVENT_SCHEMA)
+
+
+def generate_events(users, as_of, seed=None, chunk_users=USERS_PER_CHUNK):
+    """Yield event batches consistent with a user table's snapshot columns.
+
+    users is an Arrow table or DataFrame with user_id, signup_date, churned,
+    churn_date, last_login_date, total_logins_30d and features_used_count.
+    Aggregating the events at as_of gives back the snapshot columns. There
+    are two exceptions: a user with no window logins but a last login inside
+    the window counts that login, and a last login before signup moves to
+    the signup date.
+    """
+    rng = np.random.default_rng(seed)
+    for start in range(0, len(users), chunk_users):
+        chunk = users.slice(start, chunk_users) if isinstance(users, pa.Table) else users.iloc[start:start + chunk_users]
+        churned = np.asarray(chunk['churned'])
+        yield _chunk_events(
+            rng,
+            np.asarray(chunk['user_id']),
+            to_days(chunk['signup_date']),
+            reference_days(churned, chunk['churn_date'], as_of, clamp=False),
+            to_days(chunk['last_login_date']),
+            np.asarray(chunk['total_logins_30d']).astype(np.int64),
+            np.asarray(chunk['features_used_count']).astype(np.int64),
+        )
+
+
+def write_events(users, path, as_of, seed=None, chunk_users=USERS_PER_CHUNK):
+    """Write the event log for a user table as zstd Parquet; returns the event count"""
+    count = 0
+    with pq.ParquetWriter(path, EVENT_SCHEMA, compression='zstd') as writer:
+        for batch in generate_events(users, as_of, seed, chunk_users):
+            writer.write_batch(batch, row_group_size=len(batch))
+            count += len(batch)
+    return count
+
+# =============================================================================
+# AGGREGATION
+# =============================================================================
+
+def user_rows(user_id):
+    """Dense lookup table: user_id -> row (-1 for ids not in the table)"""
+    user_id = np.asarray(user_id).astype(np.int64)
+    row_of = np.full(user_id.max() + 1 if len(user_id) else 1, -1, dtype=np.int64)
+    row_of[user_id] = np.arange(len(user_id))
+    return row_of
+
+
+def decode_events(batch, row_of):
+    """(rows, days, is_login, feature ids) for an event batch; unknown users are dropped"""
+    if isinstance(batch, pa.Table):
+        batch = batch.combine_chunks().to_batches()[0] if len(batch) else pa.RecordBatch.from_pylist([], batch.schema)
+    ids = batch['user_id'].to_numpy()
+    known = ids < len(row_of)
+    rows = np.where(known, row_of[np.where(known, ids, 0)], -1)
+    keep = rows >= 0
+    days = batch['event_date'].view(pa.int32()).to_numpy().astype(np.int64)
+    is_login = batch['event_type'].indices.to_numpy() == LOGIN
+    feature_ids = batch['feature'].indices.fill_null(0).to_numpy(zero_copy_only=False).astype(np.int64)
+    return rows[keep], days[keep], is_login[keep], feature_ids[keep]
+
+
+def feature_counts(feature_bits):
+    """Distinct features per user from FEATURES bit masks"""
+    counts = np.zeros(len(feature_bits), dtype=np.int64)
+    for bit in range(len(FEATURES)):
+        counts += (feature_bits >> bit) & 1
+    return counts
+
+
+def aggregate_snapshot(events_path, users, as_of, batch_rows=AGGREGATE_BATCH_ROWS):
+    """Snapshot columns for each user in `users`, counted from the event log.
+
+    Events are read in batches of batch_rows. Each one is mapped to its user's
+    row through a dense id lookup, then windowed counts (bincount), last
+    login dates (maximum.at) and feature sets (bit masks) are accumulated.
+    Events after a user's reference day are ignored, so any as-of date can
+    be replayed. Returns a dict of arrays aligned with `users`.
+    """
+    row_of = user_rows(users['user_id'])
+    n = len(users)
+    ref = reference_days(users['churned'], users['churn_date'], as_of)
+    signup = to_days(users['signup_date'])
+
+    logins = np.zeros(n, dtype=np.int64)
+    last = np.full(n, np.iinfo(np.int64).min)
+    feature_bits = np.zeros(n, dtype=np.int64)
+
+    source = pq.ParquetFile(events_path)
+    for batch in source.iter_batches(batch_size=batch_rows, columns=EVENT_SCHEMA.names):
+        rows, days, is_login, feature_ids = decode_events(batch, row_of)
+        keep = days <= ref[rows]
+        rows, days, is_login, feature_ids = rows[keep], days[keep], is_login[keep], feature_ids[keep]
+
+        login_rows, login_days = rows[is_login], days[is_login]
+        in_window = login_days > ref[login_rows] - WINDOW_DAYS
+        logins += np.bincount(login_rows[in_window], minlength=n)
+        np.maximum.at(last, login_rows, login_days)
+        np.bitwise_or.at(feature_bits, rows[~is_login], 1 << feature_ids[~is_login])
+
+    seen = last > np.iinfo(np.int64).min
+    last = np.where(seen, last, signup)
+    return {
+        'total_logins_30d': logins,
+        'last_login_date': last.astype('datetime64[D]'),
+        'days_since_last_login': ref - last,
+        'features_used_count': feature_counts(feature_bits),
+    }
+
+
+def apply_snapshot(users, snapshot):
+    """Arrow user table with the snapshot columns replaced, keeping their types"""
+    for name, values in snapshot.items():
+        index = users.schema.get_field_index(name)
+        column = pa.array(values).cast(users.schema.field(name).type)
+        users = users.set_column(index, users.schema.field(name), column)
+    return users
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild snapshot columns from an activity event log")
+    parser.add_argument('users', help="User table (.csv or .parquet)")
+    parser.add_argument('events', help="Event log written by generate_realistic_data.py --events")
+    parser.add_argument('--as-of', required=True, help="Snapshot date (YYYY-MM-DD)")
+    parser.add_argument('-o', '--output', required=True, help="Rebuilt user table (.parquet)")
+    args = parser.parse_args()
+
+    users = pq.read_table(args.users) if args.users.endswith('.parquet') else read_csv_table(args.users)
+    print(f"Aggregating {pq.ParquetFile(args.events).metadata.num_rows:,} events "
+          f"for {len(users):,} users as of {args.as_of}...")
+    start = time.perf_counter()
+    snapshot = aggregate_snapshot(args.events, users, args.as_of)
+    pq.write_table(apply_snapshot(users, snapshot), args.output, compression='zstd')
+    print(f"\n[OK] Snapshot written: {args.output} ({time.perf_counter() - start:.1f}s)")
+
+
+if __name__ == '__main__':
+    main()
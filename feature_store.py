@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Churn Intelligence System - Rolling-Window Feature Store
+Keeps the login and activity signals (total_logins_30d, days_since_last_login,
+features_used_count) up to date one day at a time. Each user has a ring of 30
+daily login counts, and each column is a raw memory-mapped file like the
+score store. Advancing the window drops the oldest day and adds the new
+day's events. That costs O(users + events of that day) rather than a rescan
+of the event history.
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+import pyarrow.parquet as pq
+
+from churn_scoring import signal_inputs
+from event_log import (
+    AGGREGATE_BATCH_ROWS, EVENT_SCHEMA, WINDOW_DAYS, decode_events, feature_counts, to_days, user_rows,
+)
+
+# One (WINDOW_DAYS, users) array of daily counts; a day holds at most 255 logins
+RING_DTYPE = np.uint8
+
+COLUMN_DTYPES = {
+    'user_id': np.int64,
+    'end_day': np.int32,       # last day counted (churn date, or "open" for active users)
+    'last_login': np.int32,    # days since epoch; signup day until the first login
+    'logins_30d': np.int16,
+    'feature_bits': np.int16,  # bit i set once FEATURES[i] has been used
+}
+
+# end_day of users whose window keeps moving
+OPEN_END = np.iinfo(np.int32).max
+
+META_FILE = 'meta.json'
+RING_FILE = 'daily_logins.bin'
+
+# =============================================================================
+# FILE LAYOUT
+# =============================================================================
+
+def _column_path(path, col):
+    return os.path.join(path, f'{col}.bin')
+
+
+def _read_meta(path):
+    with open(os.path.join(path, META_FILE)) as f:
+        return json.load(f)
+
+
+def _write_meta(path, rows, day):
+    tmp = os.path.join(path, META_FILE + '.tmp')
+    with open(tmp, 'w') as f:
+        json.dump({'rows': rows, 'day': day}, f)
+    os.replace(tmp, os.path.join(path, META_FILE))
+
+
+def _write_store(path, columns, ring, day):
+    """Write every column and the ring atomically (tmp file + rename)"""
+    os.makedirs(path, exist_ok=True)
+    files = {**{_column_path(path, col): values for col, values in columns.items()},
+             os.path.join(path, RING_FILE): ring}
+    for target, values in files.items():
+        values.tofile(target + '.tmp')
+        os.replace(target + '.tmp', target)
+    _write_meta(path, len(columns['user_id']), day)
+
+
+def open_feature_store(path, mode='r+'):
+    """Memory-map the store: (columns, ring, day); mode 'r+' lets advance_day patch in place"""
+    meta = _read_meta(path)
+    rows = meta['rows']
+    columns = {
+        col: np.memmap(_column_path(path, col), dtype=dtype, mode=mode, shape=(rows,)).view(np.ndarray)
+        for col, dtype in COLUMN_DTYPES.items()
+    }
+    ring = np.memmap(os.path.join(path, RING_FILE), dtype=RING_DTYPE, mode=mode,
+                     shape=(WINDOW_DAYS, rows)).view(np.ndarray)
+    return columns, ring, meta['day']
+
+# =============================================================================
+# BUILD
+# =============================================================================
+
+def _user_columns(users):
+    """user_id, end_day and initial last_login for a user table, sorted by user_id"""
+    user_id = np.asarray(users['user_id']).astype(np.int64)
+    churn = to_days(users['churn_date'])
+    end_day = np.where(np.asarray(users['churned']) & (churn >= 0), churn, OPEN_END)
+    last_login = to_days(users['signup_date'])
+    order = np.argsort(user_id, kind='stable')
+    return user_id[order], end_day[order], last_login[order]
+
+
+def build_feature_store(path, events_path, users, as_of, batch_rows=AGGREGATE_BATCH_ROWS):
+    """Fill a new store from the event log, as of `as_of`; returns the user count.
+
+    This is the one full scan of the history. After it, advance_day only
+    needs each new day's events.
+    """
+    user_id, end_day, last_login = _user_columns(users)
+    n = len(user_id)
+    day = int(np.datetime64(as_of, 'D').astype(np.int64))
+    row_of = user_rows(user_id)
+    ring = np.zeros((WINDOW_DAYS, n), dtype=RING_DTYPE)
+    last = last_login.astype(np.int64)
+    feature_bits = np.zeros(n, dtype=np.int64)
+
+    source = pq.ParquetFile(events_path)
+    for batch in source.iter_batches(batch_size=batch_rows, columns=EVENT_SCHEMA.names):
+        rows, days, is_login, feature_ids = decode_events(batch, row_of)
+        keep = days <= np.minimum(end_day[rows], day)
+        rows, days, is_login, feature_ids = rows[keep], days[keep], is_login[keep], feature_ids[keep]
+
+        login_rows, login_days = rows[is_login], days[is_login]
+        np.maximum.at(last, login_rows, login_days)
+        np.bitwise_or.at(feature_bits, rows[~is_login], 1 << feature_ids[~is_login])
+
+        # Window is relative to each user's own last counted day
+        in_window = login_days > np.minimum(end_day[login_rows], day) - WINDOW_DAYS
+        slots = login_days[in_window] % WINDOW_DAYS
+        np.add.at(ring.reshape(-1), slots * n + login_rows[in_window], 1)
+
+    columns = {
+        'user_id': user_id,
+        'end_day': end_day,
+        'last_login': last,
+        'logins_30d': ring.sum(axis=0, dtype=np.int64),
+        'feature_bits': feature_bits,
+    }
+    columns = {col: np.asarray(values, dtype=COLUMN_DTYPES[col]) for col, values in columns.items()}
+    _write_store(path, columns, ring, day)
+    return n
+
+
+def add_users(path, users):
+    """Append new signups (ids above every stored id) with empty windows"""
+    columns, ring, day = open_feature_store(path, mode='r')
+    user_id, end_day, last_login = _user_columns(users)
+    if len(user_id) and len(columns['user_id']) and user_id[0] <= columns['user_id'][-1]:
+        raise ValueError("New users must have ids above the stored ones")
+    added = {
+        'user_id': user_id,
+        'end_day': end_day,
+        'last_login': last_login,
+        'logins_30d': np.zeros(len(user_id)),
+        'feature_bits': np.zeros(len(user_id)),
+    }
+    merged = {col: np.concatenate([columns[col], np.asarray(added[col], dtype=COLUMN_DTYPES[col])])
+              for col in COLUMN_DTYPES}
+    merged_ring = np.concatenate([ring, np.zeros((WINDOW_DAYS, len(user_id)), dtype=RING_DTYPE)], axis=1)
+    del columns, ring
+    _write_store(path, merged, merged_ring, day)
+    return len(user_id)
+
+# =============================================================================
+# DAILY REFRESH
+# =============================================================================
+
+def advance_day(path, events):
+    """Move the window forward one day using that day's events (Arrow table or batch).
+
+    The slot of the day leaving the window is subtracted from every open
+    user's total and overwritten with the new day's counts. Churned users
+    whose end_day has passed keep their values. Returns the new day.
+    """
+    columns, ring, day = open_feature_store(path, mode='r+')
+    day += 1
+    n = len(columns['user_id'])
+    rows, days, is_login, feature_ids = decode_events(events, user_rows(columns['user_id']))
+    if len(days) and (days.min() != day or days.max() != day):
+        raise ValueError(f"Expected events for {np.datetime64(day, 'D')} only")
+
+    moving = columns['end_day'] >= day
+    rows, is_login, feature_ids = rows[moving[rows]], is_login[moving[rows]], feature_ids[moving[rows]]
+    counts = np.minimum(np.bincount(rows[is_login], minlength=n), np.iinfo(RING_DTYPE).max)
+
+    slot = ring[day % WINDOW_DAYS]
+    columns['logins_30d'] += np.where(moving, counts.astype(np.int16) - slot, 0).astype(np.int16)
+    slot[moving] = counts[moving]
+    columns['last_login'][counts > 0] = day
+    np.bitwise_or.at(columns['feature_bits'], rows[~is_login], (1 << feature_ids[~is_login]).astype(np.int16))
+
+    del columns, ring
+    _write_meta(path, n, day)
+    return np.datetime64(day, 'D')
+
+# =============================================================================
+# SCORING INPUTS
+# =============================================================================
+
+def feature_columns(path):
+    """The store's signal columns keyed like the snapshot, sorted by user_id"""
+    columns, _, day = open_feature_store(path, mode='r')
+    last_day = np.minimum(columns['end_day'], day).astype(np.int64)
+    return {
+        'user_id': columns['user_id'],
+        'total_logins_30d': columns['logins_30d'],
+        'last_login_date': columns['last_login'].astype('datetime64[D]'),
+        'days_since_last_login': last_day - columns['last_login'],
+        'features_used_count': feature_counts(columns['feature_bits']),
+    }
+
+
+def scoring_inputs(path, users):
+    """signal_inputs for `users` with the activity signals taken from the store"""
+    inputs = signal_inputs(users)
+    features = feature_columns(path)
+    ids = np.asarray(users['user_id']).astype(np.int64)
+    row_of = user_rows(features['user_id'])
+    known = ids < len(row_of)
+    pos = row_of[np.where(known, ids, 0)]
+    found = known & (pos >= 0)
+    for col in ('total_logins_30d', 'days_since_last_login', 'features_used_count'):
+        if col in inputs:
+            inputs[col] = np.where(found, features[col][pos], inputs[col])
+    return inputs
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or advance the rolling-window feature store")
+    parser.add_argument('command', choices=['build', 'advance'])
+    parser.add_argument('--events', required=True, help="Event log (.parquet)")
+    parser.add_argument('--users', help="User table for build (.csv or .parquet)")
+    parser.add_argument('--as-of', help="Last day included by build (YYYY-MM-DD)")
+    parser.add_argument('--days', type=int, default=1, help="Days to advance")
+    parser.add_argument('--store', default='data/features', help="Feature store directory")
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        from data_store import read_csv_table
+
+        users = pq.read_table(args.users) if args.users.endswith('.parquet') else read_csv_table(args.users)
+        count = build_feature_store(args.store, args.events, users, args.as_of)
+        print(f"[OK] Built feature store for {count:,} users as of {args.as_of}: {args.store}")
+        return
+
+    for _ in range(args.days):
+        next_day = np.datetime64(_read_meta(args.store)['day'] + 1, 'D')
+        events = pq.read_table(args.events, columns=EVENT_SCHEMA.names,
+                               filters=[('event_date', '=', next_day.astype(object))])
+        print(f"[OK] Advanced to {advance_day(args.store, events)} ({len(events):,} events)")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,11 +4,17 @@ Churn Intelligence System - Mock Dataset Generator
 Generates 300 realistic user records following PRD specifications
 """
 
-import csv
+import argparse
 import random
 from datetime import datetime, timedelta
 from collections import defaultdict
 
+import numpy as np
+import pyarrow as pa
+
+from data_store import ARROW_SCHEMA, DATA_CSV
+from generate_realistic_data import SHARD_ROWS, WORKERS, affine_permutation, draw_emails, main_sharded, write_rows
+
 # Configuration
 TOTAL_USERS = 300
 CHURNED_PERCENTAGE = 0.25
@@ -159,64 +165,171 @@ def generate_user(user_id, is_churned):
         'days_since_signup': days_since_signup if not is_churned else (churn_date - signup_date).days
     }
 
+# =============================================================================
+# VECTORIZED GENERATOR
+# =============================================================================
+
+# Active user segments: (share, onboarding range, collaboration rate,
+# features range, 30-day logins range, support ticket weights), as in generate_user
+ACTIVE_SEGMENTS = [
+    (0.35, (5, 8), 0.85, (5, 7), (15, 45), [0.40, 0.35, 0.20, 0.05]),
+    (0.40, (3, 6), 0.50, (2, 4), (4, 14), [0.60, 0.30, 0.10, 0.0]),
+    (0.25, (1, 4), 0.30, (1, 3), (0, 6), [0.80, 0.20, 0.0, 0.0]),
+]
+
+def _choice(rng, values, weights, n):
+    return np.asarray(values)[rng.choice(len(values), size=n, p=weights)]
+
+def generate_users_vectorized(n, seed=None, first_user_id=1):
+    """n users following the PRD rules as a typed Arrow table, drawn a column at a time"""
+    rng = np.random.default_rng(seed)
+    churned_count = int(n * CHURNED_PERCENTAGE)
+    # Churned users take the first ids, then rows are shuffled, like main()
+    order = rng.permutation(n)
+    user_id = order + first_user_id
+    churned = order < churned_count
+
+    start = np.datetime64(START_DATE.date())
+    end = np.datetime64(END_DATE.date())
+    signup = start + rng.integers(0, (END_DATE - START_DATE).days + 1, n)
+    until_end = (end - signup).astype(np.int64)
+
+    plan_names = list(PLANS)
+    plan = np.searchsorted(np.cumsum(PLAN_DISTRIBUTION)[:-1], rng.random(n), side='right')
+    revenue = np.array([PLANS[name] for name in plan_names])[plan]
+
+    # Active users: pick a segment, then draw each column in its range
+    segment = np.searchsorted(np.cumsum([seg[0] for seg in ACTIVE_SEGMENTS])[:-1], rng.random(n), side='right')
+
+    def segment_range(field):
+        bounds = np.array([seg[field] for seg in ACTIVE_SEGMENTS])
+        low = bounds[:, 0].take(segment)
+        return low + (rng.random(n) * (bounds[:, 1].take(segment) - low + 1)).astype(np.int64)
+
+    onboarding = segment_range(1)
+    collab_rate = np.array([seg[2] for seg in ACTIVE_SEGMENTS]).take(segment)
+    features = segment_range(3)
+    logins = segment_range(4)
+    ticket_cdf = np.cumsum([seg[5] for seg in ACTIVE_SEGMENTS], axis=1)
+    u = rng.random(n)
+    tickets = sum((u >= ticket_cdf[:, k].take(segment)).astype(np.int8) for k in range(3))
+    login_low = np.minimum(30, until_end)
+    login_high = np.minimum(90, until_end)
+    last_login = signup + login_low + (rng.random(n) * (login_high - login_low + 1)).astype(np.int64)
+
+    # Churned users overwrite their rows
+    active_before_churn = rng.integers(14, 63, n)
+    churn_last_login = signup + active_before_churn
+    churn_date = churn_last_login + rng.integers(0, 8, n)
+    onboarding = np.where(churned, _choice(rng, [1, 2, 3], [0.40, 0.35, 0.25], n), onboarding)
+    collab = rng.random(n) < np.where(churned, 0.20, collab_rate)
+    features = np.where(churned, _choice(rng, [1, 2, 3], [0.50, 0.35, 0.15], n), features)
+    logins = np.where(churned, np.minimum(rng.integers(1, 13, n), active_before_churn), logins)
+    tickets = np.where(churned, _choice(rng, [0, 1, 2], [0.70, 0.25, 0.05], n), tickets)
+    last_login = np.where(churned, churn_last_login, last_login)
+    days_since_signup = np.where(churned, (churn_date - signup).astype(np.int64), until_end)
+    days_since_last_login = np.where(churned, rng.integers(14, 91, n), rng.integers(0, 15, n))
+
+    columns = {
+        'user_id': pa.array(user_id, pa.int32()),
+        'email': draw_emails(rng, n, FIRST_NAMES, LAST_NAMES),
+        'signup_date': pa.array(signup).cast(pa.date32()),
+        'plan_type': pa.DictionaryArray.from_arrays(pa.array(plan, pa.int8()), pa.array(plan_names)),
+        'monthly_revenue': pa.array(revenue, pa.int16()),
+        'churned': pa.array(churned),
+        'churn_date': pa.array(np.where(churned, churn_date, np.datetime64('NaT'))).cast(pa.date32()),
+        'last_login_date': pa.array(last_login).cast(pa.date32()),
+        'days_since_last_login': pa.array(days_since_last_login, pa.int16()),
+        'total_logins_30d': pa.array(logins, pa.int16()),
+        'features_used_count': pa.array(features, pa.int8()),
+        'onboarding_step_reached': pa.array(onboarding, pa.int8()),
+        'used_collaboration': pa.array(collab),
+        'support_tickets_raised': pa.array(tickets, pa.int8()),
+        'days_since_signup': pa.array(days_since_signup, pa.int16()),
+    }
+    return pa.table(columns).cast(ARROW_SCHEMA)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate the PRD mock dataset")
+    parser.add_argument('-n', '--users', type=int, default=TOTAL_USERS, help="number of users")
+    parser.add_argument('--seed', type=int, default=None, help="random seed for a reproducible dataset")
+    parser.add_argument('--output', default=DATA_CSV, help="output CSV path (row-by-row mode)")
+    parser.add_argument('--output-dir', default=None,
+                        help="write vectorized Parquet part files here, generated in parallel")
+    parser.add_argument('--workers', type=int, default=WORKERS, help="processes for --output-dir")
+    parser.add_argument('--shard-rows', type=int, default=SHARD_ROWS, help="users per part file")
+    return parser.parse_args()
+
+
 def main():
+    args = parse_args()
+    if args.output_dir:
+        main_sharded(args.users, args.seed, args.output_dir, args.workers, args.shard_rows,
+                     generator=generate_users_vectorized)
+        return
+    random.seed(args.seed)
+    total_users = args.users
+
     print("Generating Churn Intelligence System Mock Dataset...")
-    print(f"Total users: {TOTAL_USERS}")
-    print(f"Churned users: {int(TOTAL_USERS * CHURNED_PERCENTAGE)}")
-    print(f"Active users: {int(TOTAL_USERS * (1 - CHURNED_PERCENTAGE))}")
-
-    users = []
-
-    # Generate churned users first
-    churned_count = int(TOTAL_USERS * CHURNED_PERCENTAGE)
-    for i in range(1, churned_count + 1):
-        users.append(generate_user(i, is_churned=True))
-
-    # Generate active users
-    for i in range(churned_count + 1, TOTAL_USERS + 1):
-        users.append(generate_user(i, is_churned=False))
-
-    # Shuffle to mix users
-    random.shuffle(users)
-
-    # Write to CSV
-    output_file = 'data/churn_intelligence_dataset.csv'
-    with open(output_file, 'w', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=[
-            'user_id', 'email', 'signup_date', 'plan_type', 'monthly_revenue',
-            'churned', 'churn_date', 'last_login_date', 'days_since_last_login',
-            'total_logins_30d', 'features_used_count', 'onboarding_step_reached',
-            'used_collaboration', 'support_tickets_raised', 'days_since_signup'
-        ])
-        writer.writeheader()
-        writer.writerows(users)
+    print(f"Total users: {total_users}")
+    print(f"Churned users: {int(total_users * CHURNED_PERCENTAGE)}")
+    print(f"Active users: {int(total_users * (1 - CHURNED_PERCENTAGE))}")
+
+    # Churned users take the first ids; the permutation writes them in shuffled order
+    churned_count = int(total_users * CHURNED_PERCENTAGE)
+    shuffle = affine_permutation(total_users)
+
+    def users():
+        for i in range(total_users):
+            row = shuffle(i)
+            yield generate_user(row + 1, is_churned=row < churned_count)
+
+    stats = {
+        'users': 0,
+        'churned': 0,
+        'churned_low_step': 0,
+        'churned_no_collab': 0,
+        'active_mrr': 0,
+        'churned_mrr': 0,
+        'plans': defaultdict(int),
+    }
+
+    def on_batch(batch):
+        """Validation statistics, accumulated one batch at a time"""
+        for u in batch:
+            stats['users'] += 1
+            stats['plans'][u['plan_type']] += 1
+            if u['churned'] == 'yes':
+                stats['churned'] += 1
+                stats['churned_mrr'] += u['monthly_revenue']
+                stats['churned_low_step'] += u['onboarding_step_reached'] <= 5
+                stats['churned_no_collab'] += u['used_collaboration'] == 'no'
+            else:
+                stats['active_mrr'] += u['monthly_revenue']
+
+    # Generate, summarize and write a batch at a time
+    output_file = args.output
+    write_rows(users(), output_file, on_batch=on_batch)
 
     print(f"\n[OK] Dataset generated: {output_file}")
 
     # Print validation statistics
     print("\n--- Validation Statistics ---")
 
-    churned_users = [u for u in users if u['churned'] == 'yes']
-    active_users = [u for u in users if u['churned'] == 'no']
-
-    churned_at_low_step = [u for u in churned_users if u['onboarding_step_reached'] <= 5]
-    churned_no_collab = [u for u in churned_users if u['used_collaboration'] == 'no']
-
-    print(f"Churned users: {len(churned_users)} ({len(churned_users)/len(users)*100:.1f}%)")
-    print(f"Churned users at step <=5: {len(churned_at_low_step)} ({len(churned_at_low_step)/len(churned_users)*100:.1f}%)")
-    print(f"Churned users never used collaboration: {len(churned_no_collab)} ({len(churned_no_collab)/len(churned_users)*100:.1f}%)")
+    users_total = stats['users']
+    churned = max(stats['churned'], 1)
+    print(f"Churned users: {stats['churned']} ({stats['churned']/users_total*100:.1f}%)")
+    print(f"Churned users at step <=5: {stats['churned_low_step']} ({stats['churned_low_step']/churned*100:.1f}%)")
+    print(f"Churned users never used collaboration: {stats['churned_no_collab']} ({stats['churned_no_collab']/churned*100:.1f}%)")
 
     # Plan distribution
-    plan_counts = defaultdict(int)
-    for u in users:
-        plan_counts[u['plan_type']] += 1
     print(f"\nPlan distribution:")
-    for plan, count in sorted(plan_counts.items()):
-        print(f"  {plan}: {count} ({count/len(users)*100:.1f}%)")
+    for plan, count in sorted(stats['plans'].items()):
+        print(f"  {plan}: {count} ({count/users_total*100:.1f}%)")
 
     # Revenue calculation
-    total_mrr = sum(u['monthly_revenue'] for u in active_users)
-    churned_mrr = sum(u['monthly_revenue'] for u in churned_users)
+    total_mrr = stats['active_mrr']
+    churned_mrr = stats['churned_mrr']
     print(f"\nMonthly Recurring Revenue:")
     print(f"  Active MRR: ${total_mrr:,.2f}")
     print(f"  Churned MRR: ${churned_mrr:,.2f}")
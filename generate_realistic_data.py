@@ -5,11 +5,27 @@ Generates realistic user behavioral data with seasonal patterns,
 power law distributions, and cohort-based behaviors
 """
 
+import argparse
+import bisect
 import csv
+import itertools
 import random
 import math
+import os
+import time
 from datetime import datetime, timedelta
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
+
+from churn_scoring import SIGNALS, evaluate
+from data_store import ARROW_SCHEMA, DATA_CSV, FLAG_COLUMNS, ROW_GROUP_SIZE
+from event_log import write_events
 
 # Configuration
 TOTAL_USERS = 300
@@ -208,105 +224,479 @@ def generate_user(user_id, user_type):
         'days_since_signup': days_since_signup
     }
 
-def main():
-    print("Generating Enhanced Realistic Dataset...")
-    print(f"   Total users: {TOTAL_USERS}")
+# =============================================================================
+# STREAMING OUTPUT
+# =============================================================================
+
+FIELDNAMES = [
+    'user_id', 'email', 'signup_date', 'plan_type', 'monthly_revenue',
+    'churned', 'churn_date', 'last_login_date', 'days_since_last_login',
+    'total_logins_30d', 'features_used_count', 'onboarding_step_reached',
+    'used_collaboration', 'support_tickets_raised', 'days_since_signup'
+]
+
+# Rows generated, summarized and written at a time by the row-by-row mode
+WRITE_BATCH_ROWS = 10_000
+
+def affine_permutation(n, rng=random):
+    """A random bijection on range(n) in constant memory: i -> (a * i + b) mod n.
+
+    Any a coprime with n visits every index exactly once, so users can be
+    written in shuffled order without holding them all for random.shuffle.
+    """
+    if n <= 1:
+        return lambda i: i
+    a = rng.randrange(1, n)
+    while math.gcd(a, n) != 1:
+        a = rng.randrange(1, n)
+    b = rng.randrange(n)
+    return lambda i: (a * i + b) % n
+
+def _typed_batch(rows, fieldnames):
+    """Row dicts in the CSV layout -> Arrow table in data_store.ARROW_SCHEMA"""
+    table = pa.Table.from_pylist(rows)
+    columns = []
+    for field in ARROW_SCHEMA:
+        col = table[field.name]
+        if field.name in FLAG_COLUMNS:
+            col = pc.equal(col, 'yes')
+        elif pa.types.is_date32(field.type):
+            col = pc.if_else(pc.equal(col, ''), pa.scalar(None, pa.string()), col)
+        columns.append(col.cast(field.type))
+    return pa.table(columns, schema=ARROW_SCHEMA).select(fieldnames)
+
+def write_rows(rows, path, fieldnames=FIELDNAMES, batch_rows=WRITE_BATCH_ROWS, on_batch=None):
+    """Write an iterable of user dicts to CSV or Parquet a batch at a time.
+
+    on_batch(batch) sees each batch before it is written, for online
+    statistics. Memory is bounded by one batch. Returns the row count.
+    """
+    rows = iter(rows)
+    written = 0
+    parquet = path.endswith('.parquet')
+    with open(path, 'wb' if parquet else 'w', newline=None if parquet else '') as f:
+        writer = None if parquet else csv.DictWriter(f, fieldnames=fieldnames)
+        if writer:
+            writer.writeheader()
+        while True:
+            batch = list(itertools.islice(rows, batch_rows))
+            if not batch:
+                break
+            if on_batch:
+                on_batch(batch)
+            if parquet:
+                table = _typed_batch(batch, fieldnames)
+                writer = writer or pq.ParquetWriter(f, table.schema, compression='zstd')
+                writer.write_table(table)
+            else:
+                writer.writerows(batch)
+            written += len(batch)
+        if parquet and writer:
+            writer.close()
+    return written
+
+def _histogram_median(counts):
+    """Value at rank total // 2 (the upper median) of a value -> count histogram"""
+    rank = sum(counts.values()) // 2
+    seen = 0
+    for value in sorted(counts):
+        seen += counts[value]
+        if seen > rank:
+            return value
+    return 0
+
+def new_statistics():
+    """Running totals for the dataset summary, updated one batch at a time"""
+    return {
+        'users': 0,
+        'active': 0,
+        'churned': 0,
+        'at_risk': 0,
+        'active_mrr': 0,
+        'churned_mrr': 0,
+        'logins': defaultdict(int),
+    }
+
+def update_statistics(stats, batch):
+    """Fold one batch of user dicts into the running totals"""
+    active_users = [u for u in batch if u['churned'] == 'no']
+    stats['users'] += len(batch)
+    stats['active'] += len(active_users)
+    stats['churned'] += len(batch) - len(active_users)
+    for u in batch:
+        stats['active_mrr' if u['churned'] == 'no' else 'churned_mrr'] += u['monthly_revenue']
+    for u in active_users:
+        stats['logins'][u['total_logins_30d']] += 1
+    if active_users:
+        # At-risk users (Amber + Red) with the shared scoring rules
+        signal_columns = {
+            rule['column']: [u[rule['column']] for u in active_users] for rule in SIGNALS
+        }
+        stats['at_risk'] += int((evaluate(signal_columns)['risk_tier'] != 'GREEN').sum())
+
+def print_statistics(stats):
+    """The dataset summary printed after generation"""
+    users, active, churned = stats['users'], stats['active'], stats['churned']
+    print(f"\nUser Status:")
+    print(f"   Active Users: {active} ({active/users*100:.1f}%)")
+    print(f"   Churned Users: {churned} ({churned/users*100:.1f}%)")
+    print(f"   At-Risk Users: {stats['at_risk']} ({stats['at_risk']/max(active, 1)*100:.1f}% of active)")
+
+    print(f"\nRevenue:")
+    print(f"   Active MRR: ${stats['active_mrr']:,.2f}")
+    print(f"   Churned MRR: ${stats['churned_mrr']:,.2f}")
+    print(f"   Total MRR: ${stats['active_mrr'] + stats['churned_mrr']:,.2f}")
+
+    # Login distribution (power law check)
+    logins = stats['logins']
+    if logins:
+        total = sum(logins.values())
+        print(f"\nLogin Distribution (Active Users):")
+        print(f"   Min: {min(logins)}")
+        print(f"   Max: {max(logins)}")
+        print(f"   Median: {_histogram_median(logins):.1f}")
+        print(f"   Mean: {sum(value * count for value, count in logins.items())/total:.1f}")
+
+def generate_streaming(n, output_file, progress=False):
+    """Generate n users row by row straight to a CSV/Parquet file; returns the statistics.
+
+    Ids are numbered by type and written in shuffled order through
+    affine_permutation, so memory stays at one batch however large n is.
+    """
+    counts = user_type_counts(n)
+    boundaries = list(itertools.accumulate(counts.values()))
+    type_names = list(counts)
+    shuffle = affine_permutation(n)
+
+    def users():
+        for i in range(n):
+            row = shuffle(i)
+            yield generate_user(row + 1, type_names[bisect.bisect_right(boundaries, row)])
+
+    stats = new_statistics()
+    step = max(n // 10, WRITE_BATCH_ROWS)
+
+    def on_batch(batch):
+        update_statistics(stats, batch)
+        if progress and stats['users'] % step < len(batch):
+            print(f"   Progress: {stats['users']}/{n}")
+
+    write_rows(users(), output_file, on_batch=on_batch)
+    return stats
+
+# =============================================================================
+# VECTORIZED GENERATOR
+# =============================================================================
+
+# User type mix per 300 users (the default dataset)
+USER_TYPE_MIX = [('churned', 75), ('power', 45), ('casual', 100), ('at_risk', 80)]
+
+# Per-type behaviour, mirroring generate_user_behavior and generate_support_tickets.
+# Ranges are inclusive; power-user logins come from the Pareto draw instead.
+USER_TYPE_PROFILES = {
+    'power': {
+        'logins': None, 'features': (5, 7), 'onboarding': (6, 8), 'collab_rate': 0.90,
+        'days_inactive': (0, 3), 'tickets': [0.50, 0.35, 0.15],
+    },
+    'casual': {
+        'logins': (4, 14), 'features': (2, 4), 'onboarding': (3, 5), 'collab_rate': 0.45,
+        'days_inactive': (0, 7), 'tickets': [0.60, 0.30, 0.10],
+    },
+    'at_risk': {
+        'logins': (0, 6), 'features': (1, 3), 'onboarding': (1, 4), 'collab_rate': 0.25,
+        'days_inactive': (7, 21), 'tickets': [0.60, 0.30, 0.10],
+    },
+    'churned': {
+        'logins': (0, 4), 'features': (1, 2), 'onboarding': (1, 4), 'collab_rate': 0.15,
+        'days_inactive': (14, 90), 'tickets': [0.75, 0.25, 0.0],
+    },
+}
+
+# Power-user logins: Pareto(alpha) scaled by 5, as in power_law_distribution
+POWER_LOGIN_ALPHA = 2.0
+
+# Redraws of an out-of-season signup date before it is accepted anyway
+SEASONAL_ATTEMPTS = 11
+
+def user_type_counts(n):
+    """Users per type for n users, in USER_TYPE_MIX proportions"""
+    total = sum(weight for _, weight in USER_TYPE_MIX)
+    counts = {name: n * weight // total for name, weight in USER_TYPE_MIX}
+    # Rounding leftovers go to the largest group
+    counts['casual'] += n - sum(counts.values())
+    return counts
+
+def _profile_values(types, field):
+    """A profile value per user, looked up from its type code"""
+    values = np.array([USER_TYPE_PROFILES[name][field] for name, _ in USER_TYPE_MIX])
+    return values.take(types, axis=0)
+
+def _draw(rng, types, field):
+    """Uniform integers in each user's inclusive profile range"""
+    bounds = np.array([USER_TYPE_PROFILES[name][field] or (0, 0) for name, _ in USER_TYPE_MIX])
+    low = bounds[:, 0].take(types)
+    width = (bounds[:, 1] - bounds[:, 0] + 1).take(types)
+    # Scaled uniforms; per-element integer bounds are several times slower
+    return low + (rng.random(len(types)) * width).astype(np.int64)
+
+def _seasonal_signup_days(rng, n):
+    """Signup offsets from START_DATE with the seasonal rejection sampling of generate_user"""
+    span = (END_DATE - START_DATE).days + 1
+    days = np.arange(span)
+    months = (np.datetime64(START_DATE.date()) + days).astype('datetime64[M]').astype(int) % 12 + 1
+    factor = np.array([get_seasonal_factor(datetime(2000, month, 1)) for month in range(1, 13)])[months - 1]
+
+    offsets = rng.integers(0, span, n)
+    pending = np.arange(n)
+    for _ in range(SEASONAL_ATTEMPTS):
+        rejected = rng.random(len(pending)) >= factor[offsets[pending]]
+        pending = pending[rejected]
+        if len(pending) == 0:
+            break
+        offsets[pending] = rng.integers(0, span, len(pending))
+    return offsets
+
+def draw_emails(rng, n, first_names=FIRST_NAMES, last_names=LAST_NAMES):
+    """first.last<1-999>@example.com for n users, joined column-wise in Arrow"""
+    names = pa.array([f"{first.lower()}.{last.lower()}" for first in first_names for last in last_names])
+    numbers = pa.array([str(i) for i in range(1, 1000)])
+    picks = rng.integers(0, len(first_names), n) * len(last_names) + rng.integers(0, len(last_names), n)
+    suffixes = rng.integers(0, len(numbers), n)
+    return pc.binary_join_element_wise(names.take(picks), numbers.take(suffixes), pa.scalar('@example.com'), '')
+
+def generate_users_vectorized(n, seed=None, first_user_id=1):
+    """n users as a typed Arrow table (data_store.ARROW_SCHEMA), drawn a column at a time.
+
+    seed is anything numpy.random.default_rng accepts, including a
+    SeedSequence. User ids run from first_user_id to first_user_id + n - 1.
+    """
+    rng = np.random.default_rng(seed)
+    counts = user_type_counts(n)
+    names = [name for name, _ in USER_TYPE_MIX]
+    type_sorted = np.repeat(np.arange(len(names), dtype=np.int8), [counts[name] for name in names])
+    # Users are numbered by type, then shuffled, like main()
+    order = rng.permutation(n)
+    user_id = order + first_user_id
+    types = type_sorted[order].astype(np.intp)
+    churned = types == names.index('churned')
+    power = types == names.index('power')
+
+    start = np.datetime64(START_DATE.date())
+    end = np.datetime64(END_DATE.date())
+    signup = start + _seasonal_signup_days(rng, n)
+
+    plan_names = list(PLANS)
+    plan = rng.choice(len(plan_names), size=n, p=[0.75, 0.20, 0.05])
+    revenue = np.array([PLANS[name] for name in plan_names])[plan]
+
+    days_active = rng.integers(30, 91, n)
+    churn_date = np.where(churned, signup + days_active, np.datetime64('NaT'))
+    days_since_signup = np.where(churned, days_active, (end - signup).astype(int))
+
+    engagement = np.select([days_since_signup > 400, days_since_signup > 200], [1.3, 1.0], 0.85)
+    pareto = (rng.pareto(POWER_LOGIN_ALPHA, n) + 1) * 5
+    power_logins = np.minimum(45, pareto * engagement).astype(int)
+    logins = np.where(power, power_logins, _draw(rng, types, 'logins'))
+    # generate_user_behavior scales by engagement a second time, then clamps
+    logins = np.clip((logins * engagement).astype(int), 0, 50)
+
+    collab_rate = _profile_values(types, 'collab_rate')
+    days_inactive = _draw(rng, types, 'days_inactive')
+    last_login = np.where(churned, churn_date - rng.integers(0, 8, n), end - days_inactive)
+
+    ticket_cdf = np.cumsum([USER_TYPE_PROFILES[name]['tickets'] for name in names], axis=1)
+    u = rng.random(n)
+    tickets = (u >= ticket_cdf[:, 0].take(types)).astype(np.int8) + (u >= ticket_cdf[:, 1].take(types))
+
+    columns = {
+        'user_id': pa.array(user_id, pa.int32()),
+        'email': draw_emails(rng, n),
+        'signup_date': pa.array(signup).cast(pa.date32()),
+        'plan_type': pa.DictionaryArray.from_arrays(pa.array(plan, pa.int8()), pa.array(plan_names)),
+        'monthly_revenue': pa.array(revenue, pa.int16()),
+        'churned': pa.array(churned),
+        'churn_date': pa.array(churn_date).cast(pa.date32()),
+        'last_login_date': pa.array(last_login).cast(pa.date32()),
+        'days_since_last_login': pa.array(days_inactive, pa.int16()),
+        'total_logins_30d': pa.array(logins, pa.int16()),
+        'features_used_count': pa.array(_draw(rng, types, 'features'), pa.int8()),
+        'onboarding_step_reached': pa.array(_draw(rng, types, 'onboarding'), pa.int8()),
+        'used_collaboration': pa.array(rng.random(n) < collab_rate),
+        'support_tickets_raised': pa.array(tickets, pa.int8()),
+        'days_since_signup': pa.array(days_since_signup, pa.int16()),
+    }
+    return pa.table(columns).cast(ARROW_SCHEMA)
+
+def write_users(table, path):
+    """Write a generated table as Parquet or as the dataset's CSV layout ('yes'/'no' flags)"""
+    if path.endswith('.parquet'):
+        pq.write_table(table, path, row_group_size=ROW_GROUP_SIZE, compression='zstd')
+        return
+    yes_no = pa.array(['no', 'yes'])
+    for col in FLAG_COLUMNS:
+        codes = pc.cast(table[col], pa.int8())
+        flags = pa.chunked_array([
+            pa.DictionaryArray.from_arrays(chunk, yes_no).cast(pa.string()) for chunk in codes.chunks
+        ])
+        table = table.set_column(table.schema.get_field_index(col), col, flags)
+    table = table.set_column(3, 'plan_type', table['plan_type'].cast(pa.string()))
+    # Arrow quotes header names regardless of quoting_style, so write the header here
+    with open(path, 'w', newline='') as f:
+        f.write(','.join(table.column_names) + '\n')
+    with open(path, 'ab') as f:
+        pv.write_csv(table, f, write_options=pv.WriteOptions(include_header=False, quoting_style='none'))
+
+def print_table_statistics(table):
+    """The summary main() prints, computed with column operations"""
+    churned = table['churned'].to_numpy()
+    active = ~churned
+    revenue = table['monthly_revenue'].to_numpy().astype(np.int64)
+    n = len(churned)
+    print(f"\nUser Status:")
+    print(f"   Active Users: {active.sum():,} ({active.mean() * 100:.1f}%)")
+    print(f"   Churned Users: {churned.sum():,} ({churned.mean() * 100:.1f}%)")
 
-    users = []
+    signal_columns = {
+        rule['column']: table[rule['column']].to_numpy()[active] for rule in SIGNALS
+    }
+    at_risk = int((evaluate(signal_columns)['risk_tier'] != 'GREEN').sum())
+    print(f"   At-Risk Users: {at_risk:,} ({at_risk / max(active.sum(), 1) * 100:.1f}% of active)")
 
-    # Generate users by type with realistic distribution
-    user_types = []
+    print(f"\nRevenue:")
+    print(f"   Active MRR: ${revenue[active].sum():,.2f}")
+    print(f"   Churned MRR: ${revenue[churned].sum():,.2f}")
+    print(f"   Total MRR: ${revenue.sum():,.2f}")
 
-    # Churned users (25%)
-    user_types.extend(['churned'] * 75)
+    logins = table['total_logins_30d'].to_numpy()[active]
+    print(f"\nLogin Distribution (Active Users):")
+    print(f"   Min: {logins.min()}")
+    print(f"   Max: {logins.max()}")
+    print(f"   Median: {np.median(logins):.1f}")
+    print(f"   Mean: {logins.mean():.1f}")
+    print(f"\n   {n:,} users in total")
+
+# =============================================================================
+# SHARDED GENERATION
+# =============================================================================
+
+# Users per Parquet part file. Shards (and their seeds) depend only on the
+# user count and this size, never on the number of workers.
+SHARD_ROWS = 1_000_000
+
+# Default process count for --workers
+WORKERS = os.cpu_count() or 1
+
+def shard_plan(n, root_seed, shard_rows=SHARD_ROWS):
+    """(first_user_id, rows, SeedSequence) per shard, with one spawned stream each"""
+    starts = range(0, n, shard_rows)
+    seeds = root_seed.spawn(len(starts))
+    return [(start + 1, min(shard_rows, n - start), seq) for start, seq in zip(starts, seeds)]
+
+def write_shard(generator, rows, seed, first_user_id, path):
+    """Generate one shard and write it as a Parquet part; returns (rows, seconds)"""
+    start = time.perf_counter()
+    write_users(generator(rows, seed, first_user_id), path)
+    return rows, time.perf_counter() - start
+
+def generate_sharded(n, output_dir, seed=None, workers=WORKERS, shard_rows=SHARD_ROWS,
+                     generator=generate_users_vectorized):
+    """Generate n users as Parquet part files across a process pool.
+
+    Returns (root SeedSequence, part paths, per-shard (rows, seconds)). The
+    root's entropy reproduces the same files with any worker count.
+    """
+    root_seed = np.random.SeedSequence(seed)
+    shards = shard_plan(n, root_seed, shard_rows)
+    os.makedirs(output_dir, exist_ok=True)
+    for name in os.listdir(output_dir):
+        if name.startswith('part-') and name.endswith('.parquet'):
+            os.remove(os.path.join(output_dir, name))
+    paths = [os.path.join(output_dir, f'part-{i:05d}.parquet') for i in range(len(shards))]
+
+    first_ids = [first for first, _, _ in shards]
+    rows = [count for _, count, _ in shards]
+    seeds = [seq for _, _, seq in shards]
+    if workers == 1:
+        results = list(map(write_shard, [generator] * len(shards), rows, seeds, first_ids, paths))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(write_shard, [generator] * len(shards), rows, seeds, first_ids, paths))
+    return root_seed, paths, results
+
+def main_sharded(n, seed, output_dir, workers, shard_rows, generator=generate_users_vectorized):
+    print(f"Generating {n:,} users in {-(-n // shard_rows):,} shards on {workers} worker(s)...")
+    start = time.perf_counter()
+    root_seed, paths, results = generate_sharded(n, output_dir, seed, workers, shard_rows, generator)
+    elapsed = time.perf_counter() - start
+    busy = sum(seconds for _, seconds in results)
+    print(f"\n[OK] {len(paths):,} part files in {output_dir} ({elapsed:.1f}s)")
+    print(f"   Seed entropy: {root_seed.entropy} (pass as --seed to reproduce)")
+    print(f"   Throughput: {n / elapsed:,.0f} rows/s, {n / elapsed / workers:,.0f} rows/s per core, "
+          f"{n / busy:,.0f} rows/s per busy worker")
+
+
+def main_vectorized(n, seed, output_file, events_file=None):
+    print(f"Generating {n:,} users (vectorized)...")
+    start = time.perf_counter()
+    table = generate_users_vectorized(n, seed)
+    generated = time.perf_counter() - start
+    write_users(table, output_file)
+    print(f"\n[OK] Dataset generated: {output_file} "
+          f"({generated:.1f}s to generate, {time.perf_counter() - start - generated:.1f}s to write)")
+    if events_file:
+        start = time.perf_counter()
+        events = write_events(table, events_file, END_DATE.date(), seed)
+        print(f"[OK] Event log: {events_file} ({events:,} events, {time.perf_counter() - start:.1f}s)")
+    print_table_statistics(table)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate the churn intelligence dataset")
+    parser.add_argument('-n', '--users', type=int, default=TOTAL_USERS, help="number of users")
+    parser.add_argument('--seed', type=int, default=None, help="random seed for a reproducible dataset")
+    parser.add_argument('--vectorized', action='store_true',
+                        help="draw whole columns with numpy (for millions of users)")
+    parser.add_argument('--output', default=DATA_CSV, help="output .csv or .parquet path")
+    parser.add_argument('--events', default=None,
+                        help="with --vectorized, also write the daily login/feature event log (.parquet)")
+    parser.add_argument('--output-dir', default=None,
+                        help="write vectorized Parquet part files here, generated in parallel")
+    parser.add_argument('--workers', type=int, default=WORKERS, help="processes for --output-dir")
+    parser.add_argument('--shard-rows', type=int, default=SHARD_ROWS, help="users per part file")
+    return parser.parse_args()
 
-    # Power users (20% of active = 15% of total)
-    user_types.extend(['power'] * 45)
+def main():
+    args = parse_args()
+    if args.output_dir:
+        main_sharded(args.users, args.seed, args.output_dir, args.workers, args.shard_rows)
+        return
+    if args.vectorized:
+        main_vectorized(args.users, args.seed, args.output, args.events)
+        return
+    random.seed(args.seed)
 
-    # Casual users (45% of active = 34% of total)
-    user_types.extend(['casual'] * 100)
+    print("Generating Enhanced Realistic Dataset...")
+    print(f"   Total users: {args.users}")
 
-    # At-risk users (35% of active = 26% of total)
-    user_types.extend(['at_risk'] * 80)
+    # Users by type with realistic distribution:
+    # 25% churned, then power (20% of active), casual (45%) and at-risk (35%)
+    counts = user_type_counts(args.users)
 
     # Verify distribution
     print(f"\nUser Distribution:")
-    print(f"   Churned: {len([t for t in user_types if t == 'churned'])} ({len([t for t in user_types if t == 'churned'])/len(user_types)*100:.1f}%)")
-    print(f"   Power: {len([t for t in user_types if t == 'power'])} ({len([t for t in user_types if t == 'power'])/len(user_types)*100:.1f}%)")
-    print(f"   Casual: {len([t for t in user_types if t == 'casual'])} ({len([t for t in user_types if t == 'casual'])/len(user_types)*100:.1f}%)")
-    print(f"   At-risk: {len([t for t in user_types if t == 'at_risk'])} ({len([t for t in user_types if t == 'at_risk'])/len(user_types)*100:.1f}%)")
+    for user_type, label in [('churned', 'Churned'), ('power', 'Power'), ('casual', 'Casual'), ('at_risk', 'At-risk')]:
+        print(f"   {label}: {counts[user_type]} ({counts[user_type]/max(args.users, 1)*100:.1f}%)")
 
-    # Generate users
+    # Generate, summarize and write a batch at a time
     print(f"\nGenerating user records...")
-    for i, user_type in enumerate(user_types, 1):
-        if i % 50 == 0:
-            print(f"   Progress: {i}/{len(user_types)}")
-        users.append(generate_user(i, user_type))
-
-    # Shuffle to mix users
-    random.shuffle(users)
-
-    # Write to CSV
-    output_file = 'data/churn_intelligence_dataset.csv'
-    with open(output_file, 'w', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=[
-            'user_id', 'email', 'signup_date', 'plan_type', 'monthly_revenue',
-            'churned', 'churn_date', 'last_login_date', 'days_since_last_login',
-            'total_logins_30d', 'features_used_count', 'onboarding_step_reached',
-            'used_collaboration', 'support_tickets_raised', 'days_since_signup'
-        ])
-        writer.writeheader()
-        writer.writerows(users)
+    output_file = args.output
+    stats = generate_streaming(args.users, output_file, progress=True)
 
     print(f"\n[OK] Dataset generated: {output_file}")
 
     # Print statistics
     print(f"\nDataset Statistics:")
-
-    active_users = [u for u in users if u['churned'] == 'no']
-    churned_users = [u for u in users if u['churned'] == 'yes']
-
-    print(f"\nUser Status:")
-    print(f"   Active Users: {len(active_users)} ({len(active_users)/len(users)*100:.1f}%)")
-    print(f"   Churned Users: {len(churned_users)} ({len(churned_users)/len(users)*100:.1f}%)")
-
-    # Calculate at-risk users
-    at_risk = 0
-    for user in active_users:
-        score = 0
-        if user['total_logins_30d'] < 2:
-            score += 25
-        if user['onboarding_step_reached'] <= 3:
-            score += 20
-        if user['features_used_count'] <= 2:
-            score += 20
-        if user['used_collaboration'] == 'no':
-            score += 20
-        if user['days_since_last_login'] >= 7:
-            score += 15
-
-        if score >= 31:
-            at_risk += 1
-
-    print(f"   At-Risk Users: {at_risk} ({at_risk/len(active_users)*100:.1f}% of active)")
-
-    # Revenue
-    active_mrr = sum(u['monthly_revenue'] for u in active_users)
-    churned_mrr = sum(u['monthly_revenue'] for u in churned_users)
-
-    print(f"\nRevenue:")
-    print(f"   Active MRR: ${active_mrr:,.2f}")
-    print(f"   Churned MRR: ${churned_mrr:,.2f}")
-    print(f"   Total MRR: ${active_mrr + churned_mrr:,.2f}")
-
-    # Login distribution (power law check)
-    logins = [u['total_logins_30d'] for u in active_users]
-    logins_sorted = sorted(logins)
-    print(f"\nLogin Distribution (Active Users):")
-    print(f"   Min: {min(logins)}")
-    print(f"   Max: {max(logins)}")
-    print(f"   Median: {logins_sorted[len(logins)//2]:.1f}")
-    print(f"   Mean: {sum(logins)/len(logins):.1f}")
+    print_statistics(stats)
 
     print(f"\n[OK] Dataset complete! Ready for dashboard.")
 
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Churn Intelligence System - Intervention Log
+Append-only log of nudge events (sent / opened / responded / converted /
+dismissed) in SQLite, in WAL mode so the dashboard can read while nudges
+are written. Events are written in batches, one transaction each, into one
+table per month. Each partition is indexed on user_id, nudge type + time,
+and time. A partition's indexes stay small enough to cache, so ingest does
+not slow down as the log grows, and old months can be dropped whole.
+
+Each batch also adds its counts to a `funnel` table: events per day, nudge
+type and status. Conversion funnels per variant read only this table, so
+they take the same time at 100M events as at 1,000.
+"""
+
+import argparse
+import os
+import sqlite3
+import time
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+
+LOG_PATH = 'data/interventions.db'
+
+# Event statuses; the first four are the funnel stages in order
+STATUSES = ['sent', 'opened', 'responded', 'converted', 'dismissed']
+FUNNEL_STAGES = STATUSES[:4]
+
+EVENT_COLUMNS = ['user_id', 'nudge_type', 'status', 'ts']
+
+SECONDS_PER_DAY = 86400
+
+# Page cache per connection (negative = KiB), enough for a month's indexes
+CACHE_KIB = 256 * 1024
+
+# One events table per month, e.g. events_202512
+PARTITION_SCHEMA = """
+CREATE TABLE IF NOT EXISTS {table} (
+    user_id INTEGER NOT NULL,
+    nudge_type TEXT NOT NULL,
+    status INTEGER NOT NULL,   -- index into STATUSES
+    ts INTEGER NOT NULL        -- unix seconds
+);
+CREATE INDEX IF NOT EXISTS {table}_user ON {table} (user_id);
+CREATE INDEX IF NOT EXISTS {table}_type_ts ON {table} (nudge_type, ts);
+CREATE INDEX IF NOT EXISTS {table}_ts ON {table} (ts);
+"""
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS funnel (
+    day INTEGER NOT NULL,      -- unix days
+    nudge_type TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    events INTEGER NOT NULL,
+    PRIMARY KEY (day, nudge_type, status)
+) WITHOUT ROWID;
+"""
+
+# =============================================================================
+# WRITING
+# =============================================================================
+
+def open_log(path=LOG_PATH, readonly=False):
+    """Connect to an intervention log, creating it unless readonly"""
+    if readonly:
+        return sqlite3.connect(f'file:{path}?mode=ro', uri=True, check_same_thread=False)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA cache_size=-{CACHE_KIB}")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def partitions(conn):
+    """Names of the monthly events tables, oldest first"""
+    rows = conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name GLOB 'events_[0-9]*'")
+    return sorted(name for name, in rows)
+
+
+def _partition(conn, month):
+    """Events table for a month, created on first use"""
+    table = 'events_' + str(month).replace('-', '')
+    conn.executescript(PARTITION_SCHEMA.format(table=table))
+    return table
+
+
+def status_codes(status):
+    """STATUSES codes for an array of labels or codes"""
+    status = np.asarray(status)
+    if status.dtype.kind in 'iu':
+        return status.astype(np.int64)
+    codes = pd.Index(STATUSES).get_indexer(status)
+    if (codes < 0).any():
+        raise ValueError(f"Unknown status {status[codes < 0][0]!r}; expected one of {', '.join(STATUSES)}")
+    return codes
+
+
+def append_events(conn, events):
+    """Append a batch of events (columns EVENT_COLUMNS) in one transaction"""
+    user_id = np.asarray(events['user_id'], dtype=np.int64)
+    nudge_type = np.asarray(events['nudge_type'], dtype=object)
+    status = status_codes(events['status'])
+    ts = np.asarray(events['ts'], dtype=np.float64).astype(np.int64)
+    counts = (pd.DataFrame({'day': ts // SECONDS_PER_DAY, 'nudge_type': nudge_type, 'status': status})
+              .value_counts().reset_index())
+
+    # Inserting in user_id order keeps the user index writes close together
+    order = np.argsort(user_id, kind='stable')
+    month = ts[order].astype('datetime64[s]').astype('datetime64[M]')
+    months = np.unique(month)
+    tables = [_partition(conn, value) for value in months]
+    with conn:
+        for value, table in zip(months, tables):
+            rows = order if len(months) == 1 else order[month == value]
+            conn.executemany(f"INSERT INTO {table} VALUES (?, ?, ?, ?)", zip(
+                user_id[rows].tolist(), nudge_type[rows].tolist(), status[rows].tolist(), ts[rows].tolist()
+            ))
+        conn.executemany("""
+            INSERT INTO funnel VALUES (?, ?, ?, ?)
+            ON CONFLICT (day, nudge_type, status) DO UPDATE SET events = events + excluded.events
+        """, counts.itertuples(index=False, name=None))
+    return len(user_id)
+
+
+def log_sink(path=LOG_PATH):
+    """nudge_engine sink that logs each delivered nudge as a 'sent' event"""
+    conn = open_log(path)
+
+    async def sink(nudges):
+        append_events(conn, {
+            'user_id': [nudge['user_id'] for nudge in nudges],
+            'nudge_type': [nudge['nudge_type'] for nudge in nudges],
+            'status': np.zeros(len(nudges), dtype=np.int64),
+            'ts': [nudge['sent_at'] for nudge in nudges],
+        })
+
+    def history(days=30):
+        since = int(time.time()) - days * SECONDS_PER_DAY
+        return _select(conn, "SELECT user_id, nudge_type, ts AS sent_at FROM {table} WHERE status = 0 AND ts >= ?",
+                       (since,), partitions(conn)[-2:])
+
+    sink.close = conn.close
+    sink.history = history
+    return sink
+
+# =============================================================================
+# QUERIES
+# =============================================================================
+
+def _select(conn, query, params, tables):
+    """Run a per-partition query over `tables` and stack the results"""
+    if not tables:
+        tables = ["(SELECT 0 AS user_id, '' AS nudge_type, 0 AS status, 0 AS ts WHERE 0)"]
+    union = " UNION ALL ".join(query.format(table=table) for table in tables)
+    return pd.read_sql_query(union, conn, params=params * len(tables))
+
+
+def _day_range(start, end):
+    lo = -1 if start is None else int(np.datetime64(start, 'D').astype(np.int64))
+    hi = 1 << 40 if end is None else int(np.datetime64(end, 'D').astype(np.int64))
+    return lo, hi
+
+
+def latest_day(conn):
+    """Date of the newest logged event, or None for an empty log"""
+    day = conn.execute("SELECT MAX(day) FROM funnel").fetchone()[0]
+    return None if day is None else np.datetime64(day, 'D')
+
+
+def log_version(conn):
+    """(latest day, total events): changes whenever events are appended"""
+    return tuple(conn.execute("SELECT MAX(day), SUM(events) FROM funnel").fetchone())
+
+
+def conversion_funnel(conn, start=None, end=None):
+    """Events per funnel stage and rates vs sent, per nudge type, between two dates"""
+    counts = pd.read_sql_query("""
+        SELECT nudge_type, status, SUM(events) AS events FROM funnel
+        WHERE day BETWEEN ? AND ? GROUP BY nudge_type, status
+    """, conn, params=_day_range(start, end))
+    table = counts.pivot(index='nudge_type', columns='status', values='events')
+    table = table.reindex(columns=range(len(STATUSES)), fill_value=0).fillna(0).astype(np.int64)
+    table.columns = STATUSES
+    sent = table['sent'].where(table['sent'] > 0)
+    for stage in FUNNEL_STAGES[1:] + ['dismissed']:
+        table[f'{stage}_rate'] = (table[stage] / sent * 100).round(1).fillna(0.0)
+    return table.rename_axis('nudge_type').reset_index()
+
+
+def daily_conversions(conn, start=None, end=None):
+    """Sent and converted events per day and nudge type"""
+    daily = pd.read_sql_query("""
+        SELECT day, nudge_type,
+               SUM(CASE WHEN status = 0 THEN events ELSE 0 END) AS sent,
+               SUM(CASE WHEN status = 3 THEN events ELSE 0 END) AS converted
+        FROM funnel WHERE day BETWEEN ? AND ? GROUP BY day, nudge_type ORDER BY day
+    """, conn, params=_day_range(start, end))
+    daily['day'] = daily['day'].to_numpy().astype('datetime64[D]')
+    return daily
+
+
+def user_events(conn, user_id):
+    """One user's events across all months, oldest first"""
+    events = _select(conn, "SELECT * FROM {table} WHERE user_id = ?", (int(user_id),), partitions(conn))
+    return _labelled(events.sort_values('ts', kind='stable', ignore_index=True))
+
+
+def recent_events(conn, limit=100):
+    """The latest `limit` events, newest first"""
+    frames, found = [], 0
+    for table in reversed(partitions(conn)):
+        frame = pd.read_sql_query(f"SELECT * FROM {table} ORDER BY ts DESC LIMIT ?", conn, params=(limit - found,))
+        frames.append(frame)
+        found += len(frame)
+        if found >= limit:
+            break
+    if not frames:
+        return _labelled(pd.DataFrame({col: pd.Series(dtype=np.int64) for col in EVENT_COLUMNS}))
+    return _labelled(pd.concat(frames, ignore_index=True))
+
+
+def _labelled(events):
+    events['status'] = np.asarray(STATUSES, dtype=object)[events['status'].to_numpy(dtype=np.int64)]
+    events['ts'] = pd.to_datetime(events['ts'], unit='s')
+    return events
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Append nudge events and query conversion funnels")
+    sub = parser.add_subparsers(dest='command', required=True)
+    ingest = sub.add_parser('ingest', help="Append events from a CSV/Parquet file (user_id, nudge_type, status, ts)")
+    ingest.add_argument('events')
+    ingest.add_argument('--batch-rows', type=int, default=100_000)
+    funnel = sub.add_parser('funnel', help="Conversion funnel per nudge type")
+    funnel.add_argument('--start')
+    funnel.add_argument('--end')
+    user = sub.add_parser('user', help="One user's events")
+    user.add_argument('user_id', type=int)
+    parser.add_argument('--log', default=LOG_PATH, help="Intervention log (SQLite)")
+    args = parser.parse_args()
+
+    with closing(open_log(args.log)) as conn:
+        if args.command == 'ingest':
+            if args.events.endswith('.parquet'):
+                events = pd.read_parquet(args.events, columns=EVENT_COLUMNS)
+            else:
+                events = pd.read_csv(args.events, usecols=EVENT_COLUMNS)
+            for start in range(0, len(events), args.batch_rows):
+                append_events(conn, events.iloc[start:start + args.batch_rows])
+            print(f"[OK] Appended {len(events):,} events to {args.log}")
+        elif args.command == 'funnel':
+            print(conversion_funnel(conn, args.start, args.end).to_string(index=False))
+        else:
+            print(user_events(conn, args.user_id).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Churn Intelligence System - Nudge Trigger Engine
+Turns tier transitions from the scorer into nudges (BRD §6.1). A user whose
+tier worsens into Amber or Red gets one nudge of type A, B or C, with an SLA
+deadline set by the new tier. Pending nudges wait in a priority queue,
+earliest deadline first and highest risk score first within a deadline.
+
+An asyncio worker pool delivers them in batches to a sink. The scheduler
+hands batches to the workers through a bounded queue. When the workers fall
+behind, the scheduler waits, and so does submit() once the priority queue
+is full. Backpressure therefore reaches the producer.
+
+A batch the sink rejects is retried up to MAX_ATTEMPTS times, then moved
+to the engine's dead letters.
+
+A sink is an async callable that takes a list of nudge dicts. file_sink
+(JSON lines) and sqlite_sink are local stand-ins for the delivery service.
+intervention_log.log_sink records each nudge as a 'sent' event.
+"""
+
+import argparse
+import asyncio
+import heapq
+import json
+import logging
+import os
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+
+from churn_scoring import OPERATORS, TIERS
+
+# Nudge variants (PRD §8.2); the first rule whose conditions all hold wins
+NUDGE_TYPES = {
+    'A': 'Onboarding Resume',
+    'B': 'Feature Discovery',
+    'C': 'Re-engagement',
+}
+
+NUDGE_RULES = [
+    ('A', [('onboarding_step_reached', '<=', 3)]),
+    ('B', [('features_used_count', '<=', 2), ('days_since_signup', '>=', 14)]),
+    ('C', []),
+]
+
+# Tiers that trigger a nudge, with the hours allowed until delivery
+SLA_HOURS = {
+    'AMBER': 48,
+    'RED': 24,
+}
+
+# Power users are never nudged (FR-005): all thresholds met
+POWER_USER = [
+    ('total_logins_30d', '>=', 25),
+    ('features_used_count', '>=', 6),
+    ('used_collaboration', '==', True),
+]
+
+# Frequency caps: one nudge per user per week (FR-008), and no repeat of
+# the same type within 30 days (FR-007)
+USER_COOLDOWN_DAYS = 7
+TYPE_COOLDOWN_DAYS = 30
+
+USER_COLUMNS = sorted({col for _, conditions in NUDGE_RULES for col, _, _ in conditions}
+                      | {col for col, _, _ in POWER_USER})
+
+# Fields of a delivered nudge, as passed to sinks
+NUDGE_FIELDS = ['user_id', 'nudge_type', 'tier', 'risk_score', 'trigger_reason', 'deadline', 'sent_at']
+
+WORKERS = 8
+BATCH_SIZE = 500
+
+# Batches handed to workers before the scheduler waits
+PENDING_BATCHES = 16
+
+# Nudges held in the priority queue before submit() waits
+QUEUE_CAPACITY = 1_000_000
+
+# Seconds before a batch the sink rejected is retried
+RETRY_DELAY = 1.0
+
+# Deliveries tried per nudge before it goes to the dead letters
+MAX_ATTEMPTS = 5
+
+SECONDS_PER_DAY = 86400
+
+# Rows per chunk when file_sink reads back its recent nudges
+HISTORY_CHUNK_ROWS = 100_000
+
+# Label of the missing previous tier of users new to scoring
+NO_TIER = 'NONE'
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# PLANNING
+# =============================================================================
+
+def _matches(users, conditions, n):
+    mask = np.ones(n, dtype=bool)
+    for col, op, threshold in conditions:
+        mask &= np.asarray(OPERATORS[op](users[col], threshold), dtype=bool)
+    return mask
+
+
+def nudge_types(users):
+    """Nudge type per user from the onboarding/feature/signup columns"""
+    n = len(users[USER_COLUMNS[0]])
+    conditions = [_matches(users, rule, n) for _, rule in NUDGE_RULES]
+    return np.select(conditions, [code for code, _ in NUDGE_RULES], default=NUDGE_RULES[-1][0])
+
+
+def _capped(user_id, types, history, now):
+    """Mask of planned nudges blocked by an earlier nudge in `history`"""
+    if history is None or not len(history):
+        return np.zeros(len(user_id), dtype=bool)
+    sent = pd.DataFrame(history)[['user_id', 'nudge_type', 'sent_at']]
+    sent = sent[sent['sent_at'] > now - TYPE_COOLDOWN_DAYS * SECONDS_PER_DAY]
+    recent_user = sent.loc[sent['sent_at'] > now - USER_COOLDOWN_DAYS * SECONDS_PER_DAY, 'user_id']
+    recent_type = pd.MultiIndex.from_frame(sent[['user_id', 'nudge_type']])
+    return (np.isin(user_id, recent_user.to_numpy())
+            | pd.MultiIndex.from_arrays([user_id, types]).isin(recent_type))
+
+
+def plan_nudges(transitions, users, now=None, history=None):
+    """Nudges for users whose tier worsened into Amber or Red.
+
+    `transitions` is a tier change log: tier_transitions() output (dated)
+    or refresh_store()'s (dated `now`). Users new to scoring (old_tier
+    None or NO_TIER) rank below Green, so a signup scored straight into
+    Amber or Red is nudged. `users` is a user table with
+    USER_COLUMNS. Earlier nudges in `history` (user_id, nudge_type,
+    sent_at) apply the frequency caps. Returns a DataFrame sorted in
+    dispatch order.
+    """
+    now = time.time() if now is None else now
+    rank = {name: i for i, (name, _) in enumerate(TIERS)}
+    score = transitions['risk_score'] if 'risk_score' in transitions else transitions['new_score']
+    if 'date' in transitions:
+        date = np.asarray(transitions['date'], dtype='datetime64[s]').astype(np.int64)
+    else:
+        date = np.full(len(score), int(now), dtype=np.int64)
+    changes = pd.DataFrame({
+        'user_id': np.asarray(transitions['user_id'], dtype=np.int64),
+        'old_tier': pd.Series(np.asarray(transitions['old_tier'], dtype=object)).fillna(NO_TIER).to_numpy(),
+        'new_tier': np.asarray(transitions['new_tier'], dtype=object),
+        'risk_score': np.asarray(score, dtype=np.int16),
+        'date': date,
+    })
+
+    # Worsened into a nudged tier, or new to scoring; latest change per user
+    old_rank = changes['old_tier'].map(rank).fillna(-1)
+    new_rank = changes['new_tier'].map(rank)
+    changes = changes[changes['new_tier'].isin(list(SLA_HOURS)) & (new_rank > old_rank)]
+    changes = changes.sort_values('date', kind='stable').drop_duplicates('user_id', keep='last')
+
+    rows = pd.Index(np.asarray(users['user_id'])).get_indexer(changes['user_id'].to_numpy())
+    changes, rows = changes[rows >= 0], rows[rows >= 0]
+    signals = {col: np.asarray(users[col])[rows] for col in USER_COLUMNS}
+    if 'used_collaboration' in signals and signals['used_collaboration'].dtype != bool:
+        signals['used_collaboration'] = signals['used_collaboration'] == 'yes'
+
+    types = nudge_types(signals)
+    keep = ~_matches(signals, POWER_USER, len(rows))
+    keep &= ~_capped(changes['user_id'].to_numpy(), types, history, now)
+
+    changes = changes[keep]
+    nudges = pd.DataFrame({
+        'user_id': changes['user_id'].to_numpy(),
+        'nudge_type': types[keep],
+        'tier': changes['new_tier'].to_numpy(),
+        'risk_score': changes['risk_score'].to_numpy(),
+        'trigger_reason': ('Tier change ' + changes['old_tier'] + '→' + changes['new_tier']).to_numpy(),
+        'deadline': changes['date'].to_numpy() + changes['new_tier'].map(SLA_HOURS).to_numpy() * 3600,
+    })
+    return nudges.sort_values(['deadline', 'risk_score', 'user_id'], ascending=[True, False, True],
+                              ignore_index=True)
+
+# =============================================================================
+# SCHEDULING
+# =============================================================================
+
+def create_engine(sink, workers=WORKERS, batch_size=BATCH_SIZE, pending_batches=PENDING_BATCHES,
+                  capacity=QUEUE_CAPACITY, clock=time.time):
+    """Scheduler state: the priority queue and dispatch settings"""
+    return {
+        'sink': sink,
+        'heap': [],
+        'workers': workers,
+        'batch_size': batch_size,
+        'pending_batches': pending_batches,
+        'capacity': capacity,
+        'clock': clock,
+        'wakeup': asyncio.Event(),
+        'space': asyncio.Event(),
+        'stats': {'scheduled': 0, 'dispatched': 0, 'late': 0, 'retried': 0, 'failed': 0, 'peak_queued': 0},
+        'dead_letters': [],
+    }
+
+
+def schedule(engine, nudges):
+    """Add planned nudges (plan_nudges output) to the priority queue"""
+    heap = engine['heap']
+    # The last field counts failed deliveries
+    items = list(zip(
+        nudges['deadline'].tolist(), (-nudges['risk_score']).tolist(), nudges['user_id'].tolist(),
+        nudges['nudge_type'].tolist(), nudges['tier'].tolist(), nudges['trigger_reason'].tolist(),
+        [0] * len(nudges),
+    ))
+    if len(items) > len(heap):
+        heap.extend(items)
+        heapq.heapify(heap)
+    else:
+        for item in items:
+            heapq.heappush(heap, item)
+    engine['stats']['scheduled'] += len(items)
+    engine['stats']['peak_queued'] = max(engine['stats']['peak_queued'], len(heap))
+    engine['wakeup'].set()
+
+
+async def submit(engine, nudges):
+    """schedule(), first waiting while the priority queue is at capacity"""
+    while engine['heap'] and len(engine['heap']) + len(nudges) > engine['capacity']:
+        engine['space'].clear()
+        await engine['space'].wait()
+    schedule(engine, nudges)
+
+
+def _nudges(batch, sent_at):
+    """Nudge dicts for queue items"""
+    return [
+        dict(zip(NUDGE_FIELDS, (user_id, nudge_type, tier, -neg_score, reason, deadline, sent_at)))
+        for deadline, neg_score, user_id, nudge_type, tier, reason, _ in batch
+    ]
+
+
+async def _deliver(engine, batch):
+    sent_at = engine['clock']()
+    nudges = _nudges(batch, sent_at)
+    await engine['sink'](nudges)
+    stats = engine['stats']
+    stats['dispatched'] += len(nudges)
+    stats['late'] += sum(1 for item in batch if item[0] < sent_at)
+
+
+async def dispatch(engine, until_idle=True):
+    """Deliver queued nudges in priority order; returns the engine's stats.
+
+    Returns once the queue is drained, or with until_idle=False keeps
+    waiting for schedule() to add more until cancelled. A batch the sink
+    rejects goes back on the queue and is retried after RETRY_DELAY. After
+    MAX_ATTEMPTS failed deliveries its nudges go to engine['dead_letters'].
+    """
+    heap = engine['heap']
+    handoff = asyncio.Queue(maxsize=engine['pending_batches'])
+
+    async def worker():
+        while True:
+            batch = await handoff.get()
+            try:
+                await _deliver(engine, batch)
+            except Exception:
+                retry = [(*item[:-1], item[-1] + 1) for item in batch if item[-1] + 1 < MAX_ATTEMPTS]
+                failed = [item for item in batch if item[-1] + 1 >= MAX_ATTEMPTS]
+                logger.warning("Sink rejected %d nudges: %d to retry, %d moved to dead letters",
+                               len(batch), len(retry), len(failed), exc_info=True)
+                engine['stats']['failed'] += len(failed)
+                engine['dead_letters'].extend(_nudges(failed, None))
+                engine['stats']['retried'] += len(retry)
+                if retry:
+                    await asyncio.sleep(RETRY_DELAY)
+                    for item in retry:
+                        heapq.heappush(heap, item)
+            finally:
+                handoff.task_done()
+
+    workers = [asyncio.create_task(worker()) for _ in range(engine['workers'])]
+    try:
+        while True:
+            while heap:
+                batch = [heapq.heappop(heap) for _ in range(min(engine['batch_size'], len(heap)))]
+                engine['space'].set()
+                await handoff.put(batch)  # waits while every worker is busy
+            await handoff.join()
+            if heap:
+                continue  # retried batches
+            if until_idle:
+                return engine['stats']
+            engine['wakeup'].clear()
+            await engine['wakeup'].wait()
+    finally:
+        for task in workers:
+            task.cancel()
+
+# =============================================================================
+# SINKS
+# =============================================================================
+
+def file_sink(path):
+    """Sink appending nudges to a JSON-lines file"""
+    handle = open(path, 'a', encoding='utf-8')
+
+    async def sink(nudges):
+        handle.write(''.join(json.dumps(nudge) + '\n' for nudge in nudges))
+        handle.flush()
+
+    def history(days=TYPE_COOLDOWN_DAYS):
+        """Nudges sent in the last `days` days; the file is read in chunks"""
+        since = time.time() - days * SECONDS_PER_DAY
+        if not os.path.getsize(path):
+            return pd.DataFrame(columns=NUDGE_FIELDS)
+        with pd.read_json(path, lines=True, dtype={'nudge_type': str}, convert_dates=False,
+                          chunksize=HISTORY_CHUNK_ROWS) as chunks:
+            recent = [chunk[chunk['sent_at'] >= since] for chunk in chunks]
+        return pd.concat(recent, ignore_index=True)
+
+    sink.close = handle.close
+    sink.history = history
+    return sink
+
+
+def sqlite_sink(path):
+    """Sink inserting nudges into a `nudges` table of a SQLite database"""
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS nudges (
+            user_id INTEGER, nudge_type TEXT, tier TEXT, risk_score INTEGER,
+            trigger_reason TEXT, deadline INTEGER, sent_at REAL
+        )""")
+    conn.execute("CREATE INDEX IF NOT EXISTS nudges_user ON nudges (user_id, sent_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS nudges_sent ON nudges (sent_at)")
+    insert = f"INSERT INTO nudges VALUES ({', '.join('?' * len(NUDGE_FIELDS))})"
+
+    async def sink(nudges):
+        with conn:
+            conn.executemany(insert, [tuple(nudge.values()) for nudge in nudges])
+
+    def history(days=TYPE_COOLDOWN_DAYS):
+        """Nudges sent in the last `days` days"""
+        since = time.time() - days * SECONDS_PER_DAY
+        return pd.read_sql_query("SELECT * FROM nudges WHERE sent_at >= ?", conn, params=(since,))
+
+    sink.close = conn.close
+    sink.history = history
+    return sink
+
+
+def open_sink(path):
+    """file_sink for .jsonl paths, the intervention log for .db, sqlite_sink otherwise"""
+    if path.endswith('.jsonl'):
+        return file_sink(path)
+    if path.endswith('.db'):
+        from intervention_log import log_sink
+        return log_sink(path)
+    return sqlite_sink(path)
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+async def run(transitions, users, sink_path, workers=WORKERS):
+    sink = open_sink(sink_path)
+    try:
+        nudges = plan_nudges(transitions, users, history=sink.history())
+        engine = create_engine(sink, workers=workers)
+        schedule(engine, nudges)
+        return nudges, await dispatch(engine)
+    finally:
+        sink.close()
+
+
+def main():
+    from data_store import load_users
+    from score_history import HISTORY_DIR, open_history, tier_transitions
+
+    parser = argparse.ArgumentParser(description="Schedule and send nudges for recent tier transitions")
+    parser.add_argument('--history', default=HISTORY_DIR, help="Score history directory")
+    parser.add_argument('--days', type=int, default=1, help="Transitions in the last N days")
+    parser.add_argument('--snapshot', default='data/churn_intelligence_dataset.csv',
+                        help="User snapshot with the nudge type columns (CSV)")
+    parser.add_argument('--sink', default='data/interventions.db',
+                        help="Output: intervention log (.db), JSON lines (.jsonl) or a SQLite nudges table")
+    parser.add_argument('--workers', type=int, default=WORKERS)
+    args = parser.parse_args()
+
+    transitions = tier_transitions(open_history(args.history), args.days, entries=True)
+    users = load_users(['user_id'] + USER_COLUMNS, args.snapshot, os.path.splitext(args.snapshot)[0] + '.parquet')
+    nudges, stats = asyncio.run(run(transitions, users, args.sink, args.workers))
+    counts = nudges['nudge_type'].value_counts()
+    print(f"[OK] Sent {stats['dispatched']:,} nudges to {args.sink} from {len(transitions):,} transitions "
+          f"({stats['late']:,} past their SLA deadline)")
+    for code, name in NUDGE_TYPES.items():
+        print(f"  Type {code} ({name}): {counts.get(code, 0):,}")
+
+
+if __name__ == '__main__':
+    main()
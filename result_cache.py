@@ -0,0 +1,172 @@
+"""
+Churn Intelligence System - Persistent Result Cache
+Keeps loaded and scored tables on disk as uncompressed Arrow IPC files,
+keyed by a content fingerprint of the dataset file and the scoring-rule
+version. A restarted process memory-maps a cached file instead of parsing
+and scoring again; numeric and string columns stay backed by the mapped
+pages. The cache is bounded in bytes and evicts least recently used files.
+"""
+
+import hashlib
+import json
+import os
+
+import pyarrow as pa
+
+from churn_scoring import ACTIONS, SIGNALS, TIERS
+from data_store import ARROW_SCHEMA, ARROW_TO_PANDAS, DATA_CSV
+
+CACHE_DIR = os.environ.get('CHURN_CACHE_DIR', '.cache/results')
+
+# Total size of cached files before the least recently used are removed
+MAX_CACHE_BYTES = int(os.environ.get('CHURN_CACHE_MAX_BYTES', 4 * 1024 ** 3))
+
+# Content digests per file, reused while the file's size and mtime are unchanged
+FINGERPRINT_FILE = 'fingerprints.json'
+
+HASH_BLOCK_BYTES = 8 * 1024 ** 2
+
+# Digests this process has already read or computed: path -> (size, mtime, digest)
+_known_digests = {}
+
+# =============================================================================
+# KEYS
+# =============================================================================
+
+def _digest(text):
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def rules_version(signals=SIGNALS, tiers=TIERS, actions=ACTIONS):
+    """Digest of the scoring rule table; changes whenever a rule does"""
+    return _digest(json.dumps([signals, tiers, actions], sort_keys=True, default=str))
+
+
+def file_fingerprint(path, cache_dir=CACHE_DIR):
+    """Content digest of a file.
+
+    Hashing a large export takes a while, so the digest is remembered
+    alongside the file's size and mtime and only recomputed when they change.
+    Within a process a repeat call costs one stat.
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    current = (stat.st_size, stat.st_mtime_ns)
+    size, mtime, digest = _known_digests.get(path, (None, None, None))
+    if (size, mtime) == current:
+        return digest
+
+    known_path = os.path.join(cache_dir, FINGERPRINT_FILE)
+    try:
+        with open(known_path) as f:
+            known = json.load(f)
+    except (OSError, ValueError):
+        known = {}
+    size, mtime, digest = known.get(path, (None, None, None))
+    if (size, mtime) == current:
+        _known_digests[path] = (size, mtime, digest)
+        return digest
+
+    hasher = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_BYTES), b''):
+            hasher.update(block)
+    digest = hasher.hexdigest()
+    known[path] = _known_digests[path] = (*current, digest)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        _write_atomic(known_path, lambda tmp: _write_json(tmp, known))
+    except OSError:
+        pass
+    return digest
+
+
+def dataset_fingerprint(csv_path=DATA_CSV, cache_dir=CACHE_DIR):
+    """Fingerprint of the dataset CSV plus the storage schema it is read with.
+
+    Cheap enough to check on every request or dashboard rerun, and used as
+    the version token that cached results are keyed on.
+    """
+    return _digest(file_fingerprint(csv_path, cache_dir) + str(ARROW_SCHEMA))
+
+# =============================================================================
+# STORAGE
+# =============================================================================
+
+def _write_atomic(path, write):
+    tmp = f'{path}.{os.getpid()}.tmp'
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def _write_json(path, value):
+    with open(path, 'w') as f:
+        json.dump(value, f)
+
+
+def _read_frame(path):
+    """Memory-map a cached file as a DataFrame without copying its columns"""
+    with pa.memory_map(path) as source:
+        table = pa.ipc.open_file(source).read_all()
+    # The mapping stays open while the frame's buffers reference it
+    return table.to_pandas(types_mapper=ARROW_TO_PANDAS.get, split_blocks=True)
+
+
+def _write_frame(path, df):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+
+    def write(tmp):
+        with pa.ipc.new_file(tmp, table.schema) as writer:
+            writer.write_table(table)
+    _write_atomic(path, write)
+
+
+def evict(cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES, keep=()):
+    """Remove least recently used cache files until the cache fits in max_bytes"""
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.endswith('.arrow'):
+            stat = os.stat(os.path.join(cache_dir, name))
+            entries.append((stat.st_mtime_ns, stat.st_size, name))
+    total = sum(size for _, size, _ in entries)
+    for _, size, name in sorted(entries):
+        if total <= max_bytes:
+            break
+        if name in keep:
+            continue
+        os.remove(os.path.join(cache_dir, name))
+        total -= size
+
+
+def cached_frame(name, key_parts, compute, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+    """DataFrame for (name, key_parts) from the disk cache, computing it on a miss.
+
+    key_parts are JSON-serializable values that identify the result (for
+    example a dataset fingerprint and rules version). Misses store the
+    result and return it read back from the cache, so cold and warm frames
+    have the same dtypes. If the cache directory is unwritable, the computed
+    frame is returned as is.
+    """
+    key = _digest(json.dumps([name, key_parts], default=str))
+    filename = f'{name}-{key}.arrow'
+    path = os.path.join(cache_dir, filename)
+    if os.path.exists(path):
+        # Reads refresh the mtime, which orders LRU eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return _read_frame(path)
+
+    df = compute()
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        _write_frame(path, df)
+        evict(cache_dir, max_bytes, keep=(filename,))
+    except OSError:
+        return df
+    return _read_frame(path)
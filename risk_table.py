@@ -0,0 +1,115 @@
+"""
+Churn Intelligence System - At-Risk Table Queries
+Filter, rank and paginate the scores table without copying or sorting it
+per request. Each sort column's ranking is computed once per scores table;
+a filter change walks that ranking in growing blocks, keeps rows whose
+tier/plan cell is selected and stops at the end of the requested page.
+Totals come from a per-cell count, and only the page's rows are returned
+for formatting.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Rows per page of the at-risk table
+PAGE_SIZE = 20
+
+# Columns the table can be ranked by (descending)
+SORT_COLUMNS = ('risk_score', 'monthly_revenue', 'days_since_last_login')
+
+# First block of ranked rows scanned per query; later blocks double
+MIN_BLOCK_ROWS = 4096
+
+# =============================================================================
+# BUILD
+# =============================================================================
+
+def _codes(values):
+    """Integer codes and labels (in order of first appearance) for a column"""
+    labels = pd.unique(values)
+    codes = pd.Categorical(values, categories=labels).codes
+    return np.asarray(codes), [str(label) for label in labels]
+
+
+def _descending_order(values):
+    """Row order by value, highest first, ties to the earlier row"""
+    values = np.asarray(values).astype(np.int64)
+    if len(values) == 0:
+        return np.array([], dtype=np.int64)
+    # Flip to ascending; a 16-bit key lets numpy use its stable radix sort
+    flipped = values.max() - values
+    if flipped.max() <= np.iinfo(np.uint16).max:
+        flipped = flipped.astype(np.uint16)
+    return np.argsort(flipped, kind='stable')
+
+
+def build_risk_table(scores_df):
+    """Precompute per-sort-column rankings and tier/plan cell codes"""
+    tier_codes, tier_labels = _codes(scores_df['risk_tier'])
+    plan_codes, plan_labels = _codes(scores_df['plan_type'])
+    # One small code per (tier, plan) pair, so a filter is a single lookup
+    cells = (tier_codes.astype(np.int16) * len(plan_labels) + plan_codes).astype(np.int16)
+
+    orders = {}
+    for col in SORT_COLUMNS:
+        if col in scores_df:
+            order = _descending_order(scores_df[col].to_numpy())
+            orders[col] = (order, cells[order])
+
+    return {
+        'size': len(scores_df),
+        'tier_labels': tier_labels,
+        'plan_labels': plan_labels,
+        'cell_counts': np.bincount(cells, minlength=len(tier_labels) * len(plan_labels)),
+        'orders': orders,
+    }
+
+# =============================================================================
+# QUERIES
+# =============================================================================
+
+def selected_cells(table, tiers, plans):
+    """Lookup table: cell code -> selected?"""
+    tiers, plans = set(tiers), set(plans)
+    return np.array([
+        tier in tiers and plan in plans
+        for tier in table['tier_labels']
+        for plan in table['plan_labels']
+    ], dtype=bool)
+
+
+def count_rows(table, tiers, plans):
+    """Number of rows matching the filters"""
+    return int(table['cell_counts'][selected_cells(table, tiers, plans)].sum())
+
+
+def top_rows(table, tiers, plans, sort_by, start, stop):
+    """Matching rows ranked start..stop (exclusive) by sort_by, descending"""
+    lookup = selected_cells(table, tiers, plans)
+    order, cells = table['orders'][sort_by]
+    found = []
+    have = 0
+    lo = 0
+    block = max(MIN_BLOCK_ROWS, 4 * stop)
+    while have < stop and lo < len(order):
+        hi = min(lo + block, len(order))
+        hits = order[lo:hi][lookup[cells[lo:hi]]]
+        found.append(hits)
+        have += len(hits)
+        lo, block = hi, block * 2
+    ranked = np.concatenate(found) if found else np.array([], dtype=np.int64)
+    return ranked[start:stop]
+
+
+def query_page(table, tiers, plans, sort_by, page=1, page_size=PAGE_SIZE):
+    """One page of the filtered, ranked table; returns rows, total and page count"""
+    total = count_rows(table, tiers, plans)
+    pages = max(1, -(-total // page_size))
+    page = min(max(1, page), pages)
+    start = (page - 1) * page_size
+    return {
+        'rows': top_rows(table, tiers, plans, sort_by, start, start + page_size),
+        'total': total,
+        'page': page,
+        'pages': pages,
+    }
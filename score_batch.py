@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+"""
+Churn Intelligence System - Streaming Batch Scorer
+Scores a user export of any size (CSV or Parquet) in bounded chunks with
+the vectorized churn_scoring rules. Tiered results stream to Parquet or
+CSV while running aggregates (tier counts, MRR at risk, primary-factor
+histogram, per-plan revenue, top-N at-risk users) are kept. Peak memory
+depends on --chunk-rows, not input size. --workers N scores shards of a
+memory-mapped Parquet or Arrow file across a process pool.
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
+
+from churn_scoring import PASSTHROUGH_COLUMNS, evaluate, input_columns, signal_inputs
+from data_store import ARROW_SCHEMA, csv_convert_options
+
+# Configuration
+CHUNK_ROWS = 250_000
+
+# Rough CSV row width, used to turn a row budget into a reader block size
+CSV_BYTES_PER_ROW = 100
+
+# Read buffer for Parquet row groups larger than a chunk (see open_parquet)
+PARQUET_BUFFER_BYTES = 1 << 20
+
+# Tiers counted as "at risk" for the MRR aggregate
+AT_RISK_TIERS = ('AMBER', 'RED')
+
+# Highest-risk users kept for the top-N list
+TOP_N = 100
+
+# Default process count for --workers
+WORKERS = os.cpu_count() or 1
+
+# Summed per-plan aggregates: users, MRR, MRR at risk
+PLAN_FIELDS = ('users', 'mrr', 'mrr_at_risk')
+
+# Columns kept for each user in the top-N list
+TOP_DTYPES = {
+    'user_id': np.int32,
+    'email': object,
+    'plan_type': object,
+    'monthly_revenue': np.int16,
+    'risk_score': np.int16,
+    'tier_code': np.int8,
+}
+
+# =============================================================================
+# INPUT
+# =============================================================================
+
+def read_columns(evaluator=evaluate):
+    """Input columns the scorer needs: passthrough columns plus score inputs"""
+    columns = list(PASSTHROUGH_COLUMNS)
+    columns += [col for col in input_columns(evaluator.signals) if col not in columns]
+    return columns
+
+
+def open_parquet(path, chunk_rows=CHUNK_ROWS, memory_map=False):
+    """Open a Parquet file so reading chunk_rows at a time stays bounded.
+
+    By default a row group's column chunks are read whole before the first
+    batch is decoded, so a file written as one large row group costs memory
+    in proportion to its size. When any row group holds more than
+    chunk_rows rows, pages are read through a PARQUET_BUFFER_BYTES buffer
+    instead.
+    """
+    metadata = pq.read_metadata(path)
+    largest = max((metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)), default=0)
+    if largest <= chunk_rows:
+        return pq.ParquetFile(path, memory_map=memory_map)
+    return pq.ParquetFile(path, memory_map=memory_map, pre_buffer=False, buffer_size=PARQUET_BUFFER_BYTES)
+
+
+def iter_batches(path, chunk_rows=CHUNK_ROWS, columns=None):
+    """Yield Arrow record batches of roughly chunk_rows rows from CSV, Parquet or Arrow"""
+    columns = columns or read_columns()
+    if path.endswith('.parquet'):
+        parquet = open_parquet(path, chunk_rows)
+        yield from parquet.iter_batches(batch_size=chunk_rows, columns=columns)
+        return
+    if path.endswith('.arrow'):
+        # Arrow files keep the batch sizes they were written with
+        yield from _shard_batches(path, None, columns)
+        return
+
+    schema = pa.schema([ARROW_SCHEMA.field(name) for name in columns])
+    convert_options = csv_convert_options(schema)
+    with open(path, 'rb') as f:
+        header = f.readline()
+        column_names = header.decode().strip().split(',')
+        for block in _csv_blocks(f, chunk_rows * CSV_BYTES_PER_ROW):
+            # Each block is parsed on its own; pyarrow's streaming reader reads
+            # ahead far enough on large files to hold most of them in memory
+            table = pv.read_csv(
+                pa.BufferReader(block),
+                read_options=pv.ReadOptions(column_names=column_names),
+                convert_options=convert_options,
+            )
+            yield from table.to_batches()
+
+
+def _csv_blocks(f, block_size):
+    """Yield byte blocks of about block_size that end on a line boundary"""
+    carry = b''
+    while True:
+        data = f.read(block_size)
+        if not data:
+            break
+        data = carry + data
+        cut = data.rfind(b'\n') + 1
+        if cut == 0:
+            carry = data
+            continue
+        carry = data[cut:]
+        yield data[:cut]
+    if carry.strip():
+        yield carry
+
+# =============================================================================
+# SCORING
+# =============================================================================
+
+def score_batch(batch, evaluator=evaluate):
+    """Score one Arrow batch; returns (results batch, (tier codes, factor codes))"""
+    needed = input_columns(evaluator.signals)
+    inputs = signal_inputs({
+        name: batch.column(name).to_numpy(zero_copy_only=False)
+        for name in batch.schema.names
+        if name in needed
+    })
+    active = ~inputs['churned']
+    result = evaluator({col: values[active] for col, values in inputs.items()})
+
+    passthrough = batch.select(PASSTHROUGH_COLUMNS).filter(pa.array(active))
+    tier_code = result['tier_code'].astype(np.int8)
+    factor_code = result['factor_code'].astype(np.int8)
+    tier_labels = pa.array(evaluator.tier_labels, pa.string())
+
+    arrays = list(passthrough.columns) + [
+        pa.array(result['risk_score'].astype(np.int16)),
+        pa.DictionaryArray.from_arrays(tier_code, tier_labels),
+        pa.DictionaryArray.from_arrays(factor_code, pa.array(evaluator.factor_labels, pa.string())),
+        pa.DictionaryArray.from_arrays(tier_code, pa.array(evaluator.action_labels, pa.string())),
+    ]
+    names = PASSTHROUGH_COLUMNS + [
+        'risk_score', 'risk_tier', 'primary_risk_factor', 'recommended_action'
+    ]
+    return pa.RecordBatch.from_arrays(arrays, names=names), (tier_code, factor_code)
+
+# =============================================================================
+# RUNNING AGGREGATES
+# =============================================================================
+
+def new_totals(evaluator=evaluate):
+    """Empty running aggregates for a scoring run"""
+    return {
+        'users_read': 0,
+        'users_scored': 0,
+        'tier_counts': np.zeros(len(evaluator.tier_labels), dtype=np.int64),
+        'tier_mrr': np.zeros(len(evaluator.tier_labels), dtype=np.float64),
+        'factor_counts': np.zeros(len(evaluator.factor_labels), dtype=np.int64),
+        'plans': {},
+        'top': {col: np.array([], dtype=dtype) for col, dtype in TOP_DTYPES.items()},
+    }
+
+
+def update_totals(totals, scored, codes, rows_read, top_n=TOP_N, evaluator=evaluate):
+    """Fold one scored chunk into the running aggregates"""
+    tier_code, factor_code = codes
+    revenue = scored.column('monthly_revenue').to_numpy(zero_copy_only=False)
+    size = len(totals['tier_counts'])
+    totals['users_read'] += rows_read
+    totals['users_scored'] += len(tier_code)
+    totals['tier_counts'] += np.bincount(tier_code, minlength=size)
+    totals['tier_mrr'] += np.bincount(tier_code, weights=revenue, minlength=size)
+    totals['factor_counts'] += np.bincount(factor_code, minlength=len(totals['factor_counts']))
+
+    # Per-plan revenue, grouped on the dictionary codes of plan_type
+    at_risk = np.isin(tier_code, _at_risk_codes(evaluator))
+    plans = scored.column('plan_type')
+    if not pa.types.is_dictionary(plans.type):
+        plans = pc.dictionary_encode(plans)
+    plan_code = plans.indices.to_numpy(zero_copy_only=False)
+    n_plans = len(plans.dictionary)
+    per_plan = np.stack([
+        np.bincount(plan_code, minlength=n_plans),
+        np.bincount(plan_code, weights=revenue, minlength=n_plans),
+        np.bincount(plan_code, weights=revenue * at_risk, minlength=n_plans),
+    ], axis=1)
+    for plan, row in zip(plans.dictionary.to_pylist(), per_plan):
+        totals['plans'][plan] = totals['plans'].get(plan, 0) + row
+
+    # Rank on the numeric columns; only the chunk's top rows are materialized
+    keep = _top_index(
+        scored.column('risk_score').to_numpy(),
+        revenue,
+        scored.column('user_id').to_numpy(),
+        top_n,
+    )
+    picked = scored.take(pa.array(keep))
+    chunk_top = {
+        col: picked.column(col).to_numpy(zero_copy_only=False)
+        for col in ('user_id', 'email', 'monthly_revenue', 'risk_score')
+    }
+    chunk_top['plan_type'] = np.array(picked.column('plan_type').to_pylist(), dtype=object)
+    chunk_top['tier_code'] = tier_code[keep]
+    totals['top'] = _top_rows(_concat_top(totals['top'], chunk_top), top_n)
+    return totals
+
+
+def merge_totals(a, b, top_n=TOP_N):
+    """Combine aggregates from two runs (e.g. two shards)"""
+    merged = {key: a[key] + b[key] for key in a if key not in ('plans', 'top')}
+    merged['plans'] = dict(a['plans'])
+    for plan, row in b['plans'].items():
+        merged['plans'][plan] = merged['plans'].get(plan, 0) + row
+    merged['top'] = _top_rows(_concat_top(a['top'], b['top']), top_n)
+    return merged
+
+
+def _at_risk_codes(evaluator=evaluate):
+    tiers = list(evaluator.tier_labels)
+    return [tiers.index(t) for t in AT_RISK_TIERS if t in tiers]
+
+
+def _concat_top(a, b):
+    return {col: np.concatenate([a[col], b[col]]).astype(dtype) for col, dtype in TOP_DTYPES.items()}
+
+
+def _top_index(risk_score, revenue, user_id, top_n):
+    """Indices of the top_n rows by risk score, then revenue, then lowest user_id"""
+    # One sortable int64: score (7 bits) | revenue (15 bits) | inverted user_id (31 bits)
+    key = (
+        (risk_score.astype(np.int64) << 46)
+        | (revenue.astype(np.int64) << 31)
+        | ((2 ** 31 - 1) - user_id.astype(np.int64))
+    )
+    if len(key) > top_n:
+        keep = np.argpartition(-key, top_n - 1)[:top_n]
+    else:
+        keep = np.arange(len(key))
+    return keep[np.argsort(-key[keep], kind='stable')]
+
+
+def _top_rows(rows, top_n):
+    keep = _top_index(rows['risk_score'], rows['monthly_revenue'], rows['user_id'], top_n)
+    return {col: values[keep] for col, values in rows.items()}
+
+
+def summarize(totals, evaluator=evaluate):
+    """JSON-friendly summary of the running aggregates"""
+    tiers = list(evaluator.tier_labels)
+    at_risk = _at_risk_codes(evaluator)
+    top = totals['top']
+    return {
+        'users_read': int(totals['users_read']),
+        'users_scored': int(totals['users_scored']),
+        'tier_counts': {t: int(c) for t, c in zip(tiers, totals['tier_counts'])},
+        'mrr_by_tier': {t: float(m) for t, m in zip(tiers, totals['tier_mrr'])},
+        'mrr_at_risk': float(totals['tier_mrr'][at_risk].sum()),
+        'primary_factor_counts': {
+            f: int(c) for f, c in zip(evaluator.factor_labels, totals['factor_counts'])
+        },
+        'plans': {
+            plan: {field: float(v) for field, v in zip(PLAN_FIELDS, row)}
+            for plan, row in sorted(totals['plans'].items())
+        },
+        'top_at_risk': [
+            {
+                'user_id': int(top['user_id'][i]),
+                'email': str(top['email'][i]),
+                'plan_type': str(top['plan_type'][i]),
+                'monthly_revenue': int(top['monthly_revenue'][i]),
+                'risk_score': int(top['risk_score'][i]),
+                'risk_tier': str(tiers[top['tier_code'][i]]),
+            }
+            for i in range(len(top['user_id']))
+        ],
+    }
+
+# =============================================================================
+# OUTPUT
+# =============================================================================
+
+def open_writer(path, schema):
+    """Streaming writer for Parquet or CSV, chosen by file extension"""
+    if path.endswith('.parquet'):
+        return pq.ParquetWriter(path, schema, compression='zstd')
+    # CSV has no dictionary type; write the decoded labels
+    plain = pa.schema([
+        pa.field(f.name, f.type.value_type) if pa.types.is_dictionary(f.type) else f
+        for f in schema
+    ])
+    return pv.CSVWriter(path, plain)
+
+
+def write_batch(writer, batch):
+    if isinstance(writer, pv.CSVWriter):
+        batch = pa.RecordBatch.from_arrays(
+            [col.dictionary_decode() if pa.types.is_dictionary(col.type) else col
+             for col in batch.columns],
+            names=batch.schema.names,
+        )
+    writer.write_batch(batch)
+
+
+def score_file(input_path, output_path=None, chunk_rows=CHUNK_ROWS, evaluator=evaluate,
+               top_n=TOP_N):
+    """Stream-score input_path, optionally writing results; returns the totals"""
+    return _score_batches(
+        iter_batches(input_path, chunk_rows, read_columns(evaluator)),
+        output_path, evaluator, top_n,
+    )
+
+
+def _score_batches(batches, output_path=None, evaluator=evaluate, top_n=TOP_N):
+    totals = new_totals(evaluator)
+    writer = None
+    try:
+        for batch in batches:
+            scored, codes = score_batch(batch, evaluator)
+            update_totals(totals, scored, codes, batch.num_rows, top_n, evaluator)
+            if output_path:
+                if writer is None:
+                    writer = open_writer(output_path, scored.schema)
+                write_batch(writer, scored)
+    finally:
+        if writer is not None:
+            writer.close()
+    return totals
+
+# =============================================================================
+# PARALLEL SCORING
+# =============================================================================
+
+def stage_arrow(input_path, arrow_path, chunk_rows=CHUNK_ROWS):
+    """Stream an export into an Arrow IPC file that workers can memory-map"""
+    writer = None
+    try:
+        for batch in iter_batches(input_path, chunk_rows):
+            if writer is None:
+                writer = pa.ipc.new_file(arrow_path, batch.schema)
+            writer.write_batch(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+    return arrow_path
+
+
+def plan_shards(path, workers):
+    """Split a Parquet (by row group) or Arrow file (by batch) into contiguous shards"""
+    if path.endswith('.parquet'):
+        units = pq.ParquetFile(path).num_row_groups
+    else:
+        with pa.memory_map(path) as source:
+            units = pa.ipc.open_file(source).num_record_batches
+    bounds = np.linspace(0, units, min(workers, units) + 1).astype(int)
+    return [list(range(lo, hi)) for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+
+def _shard_batches(path, units, columns):
+    """Record batches of one shard (all of the file if units is None), memory-mapped"""
+    if path.endswith('.parquet'):
+        parquet = open_parquet(path, memory_map=True)
+        yield from parquet.iter_batches(row_groups=units, columns=columns)
+        return
+    with pa.memory_map(path) as source:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches) if units is None else units:
+            yield reader.get_batch(i).select(columns)
+
+
+def score_shard(path, units, part_path=None, top_n=TOP_N):
+    """Worker entry point: score one shard and return its totals"""
+    return _score_batches(_shard_batches(path, units, read_columns()), part_path, top_n=top_n)
+
+
+def score_parallel(input_path, output_dir=None, workers=WORKERS, chunk_rows=CHUNK_ROWS,
+                   top_n=TOP_N, workdir=None):
+    """Score an export across a process pool; returns the merged totals.
+
+    Parquet and Arrow inputs are memory-mapped by every worker, so only shard
+    indices and the (small) totals cross process boundaries. CSV input is
+    first staged to a temporary Arrow file. Results, when requested, are
+    written as one Parquet part per shard under output_dir. Uses the default
+    rule table, since compiled evaluators cannot be sent to workers.
+    """
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        path = input_path
+        if input_path.endswith('.csv'):
+            path = stage_arrow(input_path, os.path.join(tmp, 'users.arrow'), chunk_rows)
+
+        shards = plan_shards(path, workers)
+        parts = [None] * len(shards)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+            parts = [os.path.join(output_dir, f'part-{i:05d}.parquet') for i in range(len(shards))]
+
+        if workers == 1:
+            results = map(score_shard, [path] * len(shards), shards, parts, [top_n] * len(shards))
+            results = list(results)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(
+                    score_shard, [path] * len(shards), shards, parts, [top_n] * len(shards)
+                ))
+
+    totals = new_totals()
+    for shard_totals in results:
+        totals = merge_totals(totals, shard_totals, top_n)
+    return totals
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream-score a user export in bounded chunks")
+    parser.add_argument('input', help="User export (.csv, .parquet or .arrow)")
+    parser.add_argument('-o', '--output',
+                        help="Scored output (.parquet or .csv); a directory of Parquet parts with --workers")
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    parser.add_argument('--workers', type=int, default=0,
+                        help=f"Score shards in N processes (0 = single process; this machine: {WORKERS})")
+    parser.add_argument('--top-n', type=int, default=TOP_N, help="Size of the top at-risk list")
+    parser.add_argument('--summary', help="Write the aggregate summary as JSON to this path")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.workers:
+        print(f"Scoring {args.input} across {args.workers} worker(s)...")
+        totals = score_parallel(args.input, args.output, args.workers, args.chunk_rows, args.top_n)
+    else:
+        print(f"Scoring {args.input} in chunks of {args.chunk_rows:,} rows...")
+        totals = score_file(args.input, args.output, args.chunk_rows, top_n=args.top_n)
+    elapsed = time.perf_counter() - start
+    summary = summarize(totals)
+
+    print(f"\n[OK] Scored {summary['users_scored']:,} active users "
+          f"({summary['users_read']:,} read) in {elapsed:.1f}s")
+    if args.output:
+        print(f"   Results: {args.output}")
+
+    print(f"\nTier Counts:")
+    for tier, count in summary['tier_counts'].items():
+        print(f"   {tier}: {count:,} (${summary['mrr_by_tier'][tier]:,.0f} MRR)")
+    print(f"   MRR at Risk: ${summary['mrr_at_risk']:,.2f}")
+
+    print(f"\nPrimary Risk Factors:")
+    for factor, count in summary['primary_factor_counts'].items():
+        print(f"   {factor}: {count:,}")
+
+    print(f"\nRevenue by Plan:")
+    for plan, row in summary['plans'].items():
+        print(f"   {plan}: {row['users']:,.0f} users, ${row['mrr']:,.0f} MRR "
+              f"(${row['mrr_at_risk']:,.0f} at risk)")
+
+    print(f"\nTop At-Risk Users:")
+    for user in summary['top_at_risk'][:10]:
+        print(f"   #{user['user_id']} {user['email']} ({user['plan_type']}) "
+              f"score {user['risk_score']} - ${user['monthly_revenue']}/mo")
+
+    if args.summary:
+        with open(args.summary, 'w') as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Churn Intelligence System - Score History
+Stores every scoring run as a dated snapshot of user_id, risk score, tier and
+primary factor. A run is saved as a delta: only users whose score, tier or
+factor changed since the previous run, plus the tier they came from. Every
+CHECKPOINT_RUNS runs a full snapshot is written, so reading any date only
+needs the deltas since the last checkpoint.
+
+Each run is one uncompressed Arrow IPC file, sorted by user_id. Readers
+memory-map the files. A user's history is one binary search per run, and
+"tier transitions in the last N days" reads only the last N delta files.
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from churn_scoring import evaluate
+from score_store import NO_SCORE
+
+HISTORY_DIR = 'data/score_history'
+
+# Runs between full snapshots
+CHECKPOINT_RUNS = 30
+
+SNAPSHOT_SCHEMA = pa.schema([
+    ('user_id', pa.int64()),
+    ('risk_score', pa.int16()),
+    ('tier_code', pa.int8()),
+    ('factor_code', pa.int8()),
+    ('prev_tier_code', pa.int8()),  # NO_SCORE for users new to scoring
+])
+
+# Full state of the latest run, diffed against by the next one
+LATEST_FILE = 'latest.arrow'
+
+KIND_FULL = b'full'
+KIND_DELTA = b'delta'
+
+# =============================================================================
+# FILE LAYOUT
+# =============================================================================
+
+def _run_path(path, date):
+    return os.path.join(path, f'{date}.arrow')
+
+
+def list_runs(path=HISTORY_DIR):
+    """Dates of the stored runs, oldest first"""
+    if not os.path.isdir(path):
+        return []
+    names = [name[:-len('.arrow')] for name in os.listdir(path)
+             if name.endswith('.arrow') and name != LATEST_FILE]
+    return sorted(np.datetime64(name, 'D') for name in names)
+
+
+def _write_table(target, table, kind):
+    """Write an Arrow IPC file atomically (tmp file + rename)"""
+    table = table.replace_schema_metadata({'kind': kind})
+    tmp = target + '.tmp'
+    with pa.OSFile(tmp, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp, target)
+
+
+def _read_table(target):
+    """Memory-map an Arrow IPC file"""
+    return pa.ipc.open_file(pa.memory_map(target)).read_all()
+
+
+def _columns(table):
+    """Zero-copy numpy views of a snapshot table's columns"""
+    return {name: table.column(name).to_numpy() for name in SNAPSHOT_SCHEMA.names if name in table.column_names}
+
+# =============================================================================
+# RECORDING
+# =============================================================================
+
+def score_codes(scores, evaluator=evaluate):
+    """Columns of a scores table as sorted code arrays.
+
+    Takes tier_code/factor_code when present (evaluator output), otherwise
+    maps the risk_tier/primary_risk_factor labels of score_users output.
+    """
+    user_id = np.asarray(scores['user_id'], dtype=np.int64)
+    if 'tier_code' in scores:
+        tier_code, factor_code = np.asarray(scores['tier_code']), np.asarray(scores['factor_code'])
+    else:
+        tier_code = pd.Index(evaluator.tier_labels).get_indexer(np.asarray(scores['risk_tier'], dtype=object))
+        factor_code = pd.Index(evaluator.factor_labels).get_indexer(
+            np.asarray(scores['primary_risk_factor'], dtype=object)
+        )
+    columns = {
+        'user_id': user_id,
+        'risk_score': np.asarray(scores['risk_score'], dtype=np.int16),
+        'tier_code': tier_code.astype(np.int8),
+        'factor_code': factor_code.astype(np.int8),
+    }
+    if len(user_id) > 1 and not np.all(user_id[1:] > user_id[:-1]):
+        order = np.argsort(user_id, kind='stable')
+        columns = {col: values[order] for col, values in columns.items()}
+    return columns
+
+
+def _align(prev, new):
+    """Both runs spread over the union of their user ids (NO_SCORE where absent)"""
+    if np.array_equal(prev['user_id'], new['user_id']):
+        return prev['user_id'], prev, new
+
+    ids = np.union1d(prev['user_id'], new['user_id'])
+
+    def spread(run):
+        pos = np.searchsorted(ids, run['user_id'])
+        out = {'risk_score': np.zeros(len(ids), np.int16),
+               'tier_code': np.full(len(ids), NO_SCORE, np.int8),
+               'factor_code': np.full(len(ids), NO_SCORE, np.int8)}
+        for col in out:
+            out[col][pos] = run[col]
+        return out
+
+    return ids, spread(prev), spread(new)
+
+
+def record_run(date, scores, path=HISTORY_DIR, evaluator=evaluate, checkpoint_runs=CHECKPOINT_RUNS):
+    """Store one scoring run; returns {'date', 'kind', 'rows', 'transitions'}.
+
+    Users missing from `scores` (churned or deleted since the last run)
+    are stored with NO_SCORE, so the delta also records their exit.
+    """
+    date = np.datetime64(date, 'D')
+    runs = list_runs(path)
+    if runs and date <= runs[-1]:
+        raise ValueError(f"Run {date} is not after the latest stored run {runs[-1]}")
+    new = score_codes(scores, evaluator)
+    os.makedirs(path, exist_ok=True)
+
+    latest_path = os.path.join(path, LATEST_FILE)
+    prev = _columns(_read_table(latest_path)) if runs else None
+    since_checkpoint = 0
+    for run in reversed(runs):
+        with pa.memory_map(_run_path(path, run)) as source:
+            kind = pa.ipc.open_file(source).schema.metadata[b'kind']
+        if kind == KIND_FULL:
+            break
+        since_checkpoint += 1
+
+    if prev is None:
+        ids, old, cur = new['user_id'], None, new
+        prev_tier = np.full(len(ids), NO_SCORE, np.int8)
+    else:
+        ids, old, cur = _align(prev, new)
+        prev_tier = old['tier_code']
+
+    full = prev is None or since_checkpoint + 1 >= checkpoint_runs
+    if full:
+        rows = slice(None)
+    else:
+        rows = ((old['risk_score'] != cur['risk_score']) | (old['tier_code'] != cur['tier_code'])
+                | (old['factor_code'] != cur['factor_code']))
+    table = pa.table({
+        'user_id': ids[rows],
+        'risk_score': cur['risk_score'][rows],
+        'tier_code': cur['tier_code'][rows],
+        'factor_code': cur['factor_code'][rows],
+        'prev_tier_code': prev_tier[rows],
+    }, schema=SNAPSHOT_SCHEMA)
+    _write_table(_run_path(path, date), table, KIND_FULL if full else KIND_DELTA)
+
+    # The next run diffs against this one; scored users only
+    scored = cur['tier_code'] != NO_SCORE
+    latest = pa.table({col: cur[col][scored] for col in ('risk_score', 'tier_code', 'factor_code')})
+    latest = latest.add_column(0, 'user_id', pa.array(ids[scored]))
+    _write_table(latest_path, latest, KIND_FULL)
+
+    old_tier, new_tier = prev_tier[rows], cur['tier_code'][rows]
+    moved = (old_tier != new_tier) & (old_tier != NO_SCORE) & (new_tier != NO_SCORE)
+    return {
+        'date': date,
+        'kind': 'full' if full else 'delta',
+        'rows': len(table),
+        'transitions': int(np.count_nonzero(moved)),
+    }
+
+# =============================================================================
+# QUERIES
+# =============================================================================
+
+def open_history(path=HISTORY_DIR):
+    """Memory-map every stored run: list of (date, is_full, columns), oldest first"""
+    history = []
+    for date in list_runs(path):
+        table = _read_table(_run_path(path, date))
+        history.append((date, table.schema.metadata[b'kind'] == KIND_FULL, _columns(table)))
+    return history
+
+
+def user_history(history, user_id, evaluator=evaluate):
+    """Score, tier and factor of one user at every run since they were first scored"""
+    dates, scores, tiers, factors = [], [], [], []
+    score, tier, factor = 0, NO_SCORE, NO_SCORE
+    for date, is_full, columns in history:
+        ids = columns['user_id']
+        i = np.searchsorted(ids, user_id)
+        if i < len(ids) and ids[i] == user_id:
+            score, tier, factor = columns['risk_score'][i], columns['tier_code'][i], columns['factor_code'][i]
+        elif is_full:
+            score, tier, factor = 0, NO_SCORE, NO_SCORE
+        if tier != NO_SCORE or dates:
+            dates.append(date)
+            scores.append(score)
+            tiers.append(tier)
+            factors.append(factor)
+
+    tiers, factors = np.asarray(tiers, dtype=np.int64), np.asarray(factors, dtype=np.int64)
+    tier_labels = np.append(evaluator.tier_labels, None)
+    factor_labels = np.append(evaluator.factor_labels, None)
+    return pd.DataFrame({
+        'date': np.asarray(dates, dtype='datetime64[D]'),
+        'risk_score': np.asarray(scores, dtype=np.int16),
+        'risk_tier': tier_labels[tiers],
+        'primary_risk_factor': factor_labels[factors],
+    })
+
+
+def tier_transitions(history, days=7, evaluator=evaluate, entries=False):
+    """Users whose tier changed in runs within the last `days` days (scored both times).
+
+    With entries=True, users scored for the first time are included too,
+    with old_tier None. The first stored run has no previous run, so its
+    users are not counted as entries.
+    """
+    frames = []
+    since = history[-1][0] - days if history else None
+    # NO_SCORE (-1) indexes the appended None
+    tier_labels = np.append(np.asarray(evaluator.tier_labels, dtype=object), None)
+    for i, (date, _, columns) in enumerate(history):
+        if date <= since:
+            continue
+        old, new = columns['prev_tier_code'], columns['tier_code']
+        scored_before = old != NO_SCORE if not entries or i == 0 else True
+        moved = np.flatnonzero((old != new) & scored_before & (new != NO_SCORE))
+        if not len(moved):
+            continue
+        frames.append(pd.DataFrame({
+            'date': np.full(len(moved), date),
+            'user_id': columns['user_id'][moved],
+            'old_tier': tier_labels[old[moved]],
+            'new_tier': tier_labels[new[moved]],
+            'risk_score': columns['risk_score'][moved],
+        }))
+    if not frames:
+        return pd.DataFrame(columns=['date', 'user_id', 'old_tier', 'new_tier', 'risk_score'])
+    return pd.concat(frames, ignore_index=True)
+
+
+def transition_summary(transitions):
+    """Counts per tier change, e.g. GREEN→AMBER, most frequent first"""
+    labels = transitions['old_tier'].astype(str) + '→' + transitions['new_tier'].astype(str)
+    return labels.value_counts().rename_axis('transition').reset_index(name='users')
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Record scoring runs and query the score history")
+    sub = parser.add_subparsers(dest='command', required=True)
+    record = sub.add_parser('record', help="Score a snapshot and store it as a run")
+    record.add_argument('--snapshot', default='data/churn_intelligence_dataset.csv',
+                        help="User snapshot (CSV or Parquet)")
+    record.add_argument('--date', required=True, help="Run date (YYYY-MM-DD)")
+    transitions = sub.add_parser('transitions', help="Tier changes in the last N days")
+    transitions.add_argument('--days', type=int, default=7)
+    user = sub.add_parser('user', help="One user's score history")
+    user.add_argument('user_id', type=int)
+    parser.add_argument('--history', default=HISTORY_DIR, help="Score history directory")
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        from churn_scoring import score_users
+        from data_store import load_users
+
+        if args.snapshot.endswith('.parquet'):
+            users = pd.read_parquet(args.snapshot)
+        else:
+            users = load_users(csv_path=args.snapshot,
+                               parquet_path=os.path.splitext(args.snapshot)[0] + '.parquet')
+        run = record_run(args.date, score_users(users), args.history)
+        print(f"[OK] Stored {run['kind']} run {run['date']}: {run['rows']:,} rows, "
+              f"{run['transitions']:,} tier transitions")
+        return
+
+    history = open_history(args.history)
+    if args.command == 'transitions':
+        print(transition_summary(tier_transitions(history, args.days)).to_string(index=False))
+    else:
+        print(user_history(history, args.user_id).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
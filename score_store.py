@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Churn Intelligence System - Incremental Score Store
+Persists risk scores (and the inputs they were computed from) as one raw,
+memory-mapped binary file per column. A refresh diffs a new user snapshot against the stored
+inputs by user_id, rescores only changed, inserted or deleted users,
+patches the files in place and returns a change log of tier transitions.
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+
+from churn_scoring import evaluate, input_columns, signal_inputs
+
+# Row status in the store; deleted users stay as tombstones until compaction
+STATUS_ACTIVE = 0
+STATUS_CHURNED = 1
+STATUS_DELETED = 2
+
+# Tier/factor code for rows without a score (churned or deleted)
+NO_SCORE = -1
+
+OUTPUT_DTYPES = {
+    'user_id': np.int64,
+    'status': np.int8,
+    'risk_score': np.int16,
+    'tier_code': np.int8,
+    'factor_code': np.int8,
+}
+
+# Rewrite the store without tombstones once they exceed this share of rows
+COMPACT_RATIO = 0.10
+
+META_FILE = 'meta.json'
+
+# =============================================================================
+# FILE LAYOUT
+# =============================================================================
+
+def _column_path(path, col):
+    return os.path.join(path, f'{col}.bin')
+
+
+def _read_meta(path):
+    with open(os.path.join(path, META_FILE)) as f:
+        return json.load(f)
+
+
+def _write_meta(path, rows, dtypes):
+    tmp = os.path.join(path, META_FILE + '.tmp')
+    with open(tmp, 'w') as f:
+        json.dump({'rows': rows, 'columns': dtypes}, f)
+    os.replace(tmp, os.path.join(path, META_FILE))
+
+
+def _write_store(path, columns):
+    """Write every column to disk atomically (tmp file + rename)"""
+    os.makedirs(path, exist_ok=True)
+    for col, values in columns.items():
+        tmp = _column_path(path, col) + '.tmp'
+        values.tofile(tmp)
+        os.replace(tmp, _column_path(path, col))
+    rows = len(columns['user_id'])
+    _write_meta(path, rows, {col: values.dtype.str for col, values in columns.items()})
+
+
+def _append_rows(path, columns):
+    """Append rows to the end of every column file, then bump the row count"""
+    meta = _read_meta(path)
+    for col, dtype in meta['columns'].items():
+        with open(_column_path(path, col), 'ab') as f:
+            np.asarray(columns[col], dtype=dtype).tofile(f)
+    _write_meta(path, meta['rows'] + len(columns['user_id']), meta['columns'])
+
+
+def open_store(path, mode='r+'):
+    """Memory-map every column of a store; mode 'r+' allows in-place patches"""
+    meta = _read_meta(path)
+    # Plain ndarray views over the maps: writes still land in the files (the
+    # kernel writes dirty pages back) without np.memmap's per-slice overhead
+    return {
+        col: np.memmap(
+            _column_path(path, col), dtype=dtype, mode=mode, shape=(meta['rows'],)
+        ).view(np.ndarray)
+        for col, dtype in meta['columns'].items()
+    }
+
+# =============================================================================
+# SCORING
+# =============================================================================
+
+def _score(inputs, evaluator):
+    """Status, score, tier and factor codes for a block of normalized inputs"""
+    result = evaluator(inputs)
+    churned = inputs['churned']
+    return {
+        'status': np.where(churned, STATUS_CHURNED, STATUS_ACTIVE).astype(np.int8),
+        'risk_score': np.where(churned, 0, result['risk_score']).astype(np.int16),
+        'tier_code': np.where(churned, NO_SCORE, result['tier_code']).astype(np.int8),
+        'factor_code': np.where(churned, NO_SCORE, result['factor_code']).astype(np.int8),
+    }
+
+
+def _sorted_snapshot(users):
+    """user_id array and normalized inputs, ordered by user_id"""
+    user_ids = np.asarray(users['user_id'], dtype=np.int64)
+    inputs = signal_inputs(users)
+    if len(user_ids) > 1 and not np.all(user_ids[1:] > user_ids[:-1]):
+        order = np.argsort(user_ids, kind='stable')
+        user_ids = user_ids[order]
+        inputs = {col: values[order] for col, values in inputs.items()}
+    return user_ids, inputs
+
+
+def build_store(path, users, evaluator=evaluate):
+    """Score a full snapshot and write it as a new store"""
+    user_ids, inputs = _sorted_snapshot(users)
+    columns = {'user_id': user_ids}
+    columns.update(_score(inputs, evaluator))
+    columns.update(inputs)
+    columns = {col: np.asarray(values, dtype=OUTPUT_DTYPES.get(col, values.dtype))
+               for col, values in columns.items()}
+    _write_store(path, columns)
+    return len(user_ids)
+
+# =============================================================================
+# INCREMENTAL REFRESH
+# =============================================================================
+
+def refresh_store(path, users, evaluator=evaluate):
+    """Rescore only users whose inputs changed; returns the tier change log"""
+    store = open_store(path, mode='r+')
+    stored_ids = store['user_id']
+    new_ids, new_inputs = _sorted_snapshot(users)
+    inputs = input_columns(evaluator.signals)
+
+    # Align the snapshot with stored rows. Same ids in the same order is the
+    # common case and skips the binary search entirely.
+    identity = len(new_ids) == len(stored_ids) and np.array_equal(new_ids, stored_ids)
+    if identity:
+        found = np.ones(len(new_ids), dtype=bool)
+        stored_pos = np.arange(len(new_ids), dtype=np.int32)
+    else:
+        found, stored_pos = _align(stored_ids, new_ids)
+
+    seen = np.zeros(len(stored_ids), dtype=bool)
+    seen[stored_pos] = True
+
+    # Both sides are sorted by user_id, so compressing each with its match
+    # mask lines the matched rows up (and streams faster than a gather)
+    def stored(col):
+        return store[col] if identity else store[col][seen]
+
+    def incoming(col):
+        return new_inputs[col] if identity else new_inputs[col][found]
+
+    # Matched rows whose inputs differ, plus tombstones that came back
+    changed = stored('status') == STATUS_DELETED
+    for col in inputs:
+        changed |= stored(col) != incoming(col)
+    changed_pos = stored_pos[changed]
+    changed_new = np.flatnonzero(found)[changed]
+
+    deleted_pos = np.flatnonzero(~seen & (store['status'] != STATUS_DELETED))
+    inserted_new = np.flatnonzero(~found)
+
+    old_tier = np.concatenate([store['tier_code'][changed_pos], store['tier_code'][deleted_pos]])
+    old_score = np.concatenate([store['risk_score'][changed_pos], store['risk_score'][deleted_pos]])
+
+    # Patch changed rows in place
+    changed_inputs = {col: new_inputs[col][changed_new] for col in inputs}
+    changed_scores = _score(changed_inputs, evaluator)
+    for col, values in {**changed_scores, **changed_inputs}.items():
+        store[col][changed_pos] = values
+
+    # Tombstone deleted rows in place
+    store['status'][deleted_pos] = STATUS_DELETED
+    store['risk_score'][deleted_pos] = 0
+    store['tier_code'][deleted_pos] = NO_SCORE
+    store['factor_code'][deleted_pos] = NO_SCORE
+
+    # New signups usually have the highest ids and are appended; anything
+    # else (or too many tombstones) rewrites the files in sorted order
+    inserted_ids = new_ids[inserted_new]
+    inserted_inputs = {col: new_inputs[col][inserted_new] for col in inputs}
+    inserted_scores = _score(inserted_inputs, evaluator)
+    appendable = not len(stored_ids) or not len(inserted_ids) or inserted_ids[0] > stored_ids[-1]
+    if _needs_compaction(store) or not appendable:
+        _merge_rows(path, store, inserted_ids, inserted_scores, inserted_inputs)
+    elif len(inserted_ids):
+        _append_rows(path, {'user_id': inserted_ids, **inserted_scores, **inserted_inputs})
+
+    log_user_ids = np.concatenate([
+        stored_ids[changed_pos], stored_ids[deleted_pos], new_ids[inserted_new]
+    ])
+    log_old_tier = np.concatenate([old_tier, np.full(len(inserted_new), NO_SCORE, np.int8)])
+    log_new_tier = np.concatenate([
+        changed_scores['tier_code'],
+        np.full(len(deleted_pos), NO_SCORE, np.int8),
+        inserted_scores['tier_code'],
+    ])
+    log_old_score = np.concatenate([old_score, np.zeros(len(inserted_new), np.int16)])
+    log_new_score = np.concatenate([
+        changed_scores['risk_score'], np.zeros(len(deleted_pos), np.int16), inserted_scores['risk_score']
+    ])
+
+    moved = log_old_tier != log_new_tier
+    del store
+    tier_labels = np.append(evaluator.tier_labels, None)  # code -1 -> None
+    return {
+        'rescored': len(changed_pos) + len(inserted_new),
+        'inserted': len(inserted_new),
+        'deleted': len(deleted_pos),
+        'user_id': log_user_ids[moved],
+        'old_tier': tier_labels[log_old_tier[moved]],
+        'new_tier': tier_labels[log_new_tier[moved]],
+        'old_score': log_old_score[moved],
+        'new_score': log_new_score[moved],
+    }
+
+
+def _align(stored_ids, new_ids):
+    """For each new id: whether it is stored, and the stored row of matches"""
+    if not len(stored_ids) or not len(new_ids):
+        return np.zeros(len(new_ids), dtype=bool), np.zeros(0, dtype=np.int64)
+
+    # Dense ids (the usual auto-increment case) use a direct-address table,
+    # which is O(n) instead of a binary search per user
+    max_id = max(int(stored_ids[-1]), int(new_ids[-1]))
+    if int(min(stored_ids[0], new_ids[0])) >= 0 and max_id < 4 * (len(stored_ids) + len(new_ids)):
+        row_of = np.full(max_id + 1, -1, dtype=np.int32)
+        row_of[stored_ids] = np.arange(len(stored_ids), dtype=np.int32)
+        pos = row_of[new_ids]
+        found = pos >= 0
+        return found, pos[found]
+
+    pos = np.minimum(np.searchsorted(stored_ids, new_ids), len(stored_ids) - 1)
+    found = stored_ids[pos] == new_ids
+    return found, pos[found]
+
+
+def _needs_compaction(store):
+    n = len(store['status'])
+    return n > 0 and np.count_nonzero(store['status'] == STATUS_DELETED) > COMPACT_RATIO * n
+
+
+def _merge_rows(path, store, user_ids, scores, inputs):
+    """Append inserted rows (re-sorting only if needed) and drop tombstones"""
+    keep = store['status'] != STATUS_DELETED if _needs_compaction(store) else slice(None)
+    added = {'user_id': user_ids, **scores, **inputs}
+    columns = {col: np.concatenate([store[col][keep], added[col]]) for col in store}
+
+    ids = columns['user_id']
+    if len(ids) > 1 and not np.all(ids[1:] > ids[:-1]):
+        order = np.argsort(ids, kind='stable')
+        columns = {col: values[order] for col, values in columns.items()}
+
+    _write_store(path, columns)
+
+
+def transition_counts(changes):
+    """Count tier transitions in a change log, e.g. {'AMBER→RED': 12}"""
+    counts = {}
+    for old, new in zip(changes['old_tier'], changes['new_tier']):
+        key = f"{old or 'NONE'}→{new or 'NONE'}"
+        counts[key] = counts.get(key, 0) + 1
+    return dict(sorted(counts.items(), key=lambda item: -item[1]))
+
+
+def read_scores(path, evaluator=evaluate):
+    """Active users' scores from a store, with tier and factor labels"""
+    store = open_store(path, mode='r')
+    active = store['status'] == STATUS_ACTIVE
+    tier_code = store['tier_code'][active]
+    factor_code = store['factor_code'][active]
+    return {
+        'user_id': store['user_id'][active],
+        'risk_score': store['risk_score'][active],
+        'risk_tier': evaluator.tier_labels[tier_code],
+        'primary_risk_factor': evaluator.factor_labels[factor_code],
+    }
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or incrementally refresh the score store")
+    parser.add_argument('command', choices=['build', 'refresh'])
+    parser.add_argument('--snapshot', default='data/churn_intelligence_dataset.csv',
+                        help="User snapshot (CSV or Parquet)")
+    parser.add_argument('--store', default='data/scores', help="Score store directory")
+    args = parser.parse_args()
+
+    import pandas as pd
+    from data_store import load_users
+
+    columns = ['user_id'] + input_columns()
+    if args.snapshot.endswith('.parquet'):
+        users = pd.read_parquet(args.snapshot, columns=columns)
+    else:
+        users = load_users(columns, csv_path=args.snapshot,
+                           parquet_path=os.path.splitext(args.snapshot)[0] + '.parquet')
+
+    if args.command == 'build' or not os.path.exists(os.path.join(args.store, META_FILE)):
+        count = build_store(args.store, users)
+        print(f"[OK] Built score store for {count:,} users: {args.store}")
+        return
+
+    changes = refresh_store(args.store, users)
+    print(f"[OK] Rescored {changes['rescored']:,} users "
+          f"({changes['inserted']:,} inserted, {changes['deleted']:,} deleted)")
+    for transition, count in transition_counts(changes).items():
+        print(f"   {transition}: {count:,}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Churn Intelligence System - Scoring API
+Async HTTP service (aiohttp) that serves the dashboard's risk scores and
+scores new inputs with the same rule table.
+
+    GET  /health
+    GET  /users/{user_id}                       stored score of one user
+    GET  /users?email=...                       same, looked up by email
+    GET  /tiers/{tier}?plan=&sort=&page=        ranked users in a tier, one page
+    POST /score          {signal values}        score one user
+    POST /score/batch    {"users": [...]}       score up to MAX_BATCH_USERS users
+
+Stored scores come from the result cache the app uses, and the lookups are
+answered from in-memory indexes. Single-user /score requests are
+micro-batched. They queue up while the scorer is busy, and each
+evaluator call then scores every waiting request as one vectorized batch.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+
+import numpy as np
+from aiohttp import web
+
+from churn_scoring import FLAG_COLUMNS, SIGNALS, evaluate, input_columns, score_users
+from data_store import DATA_CSV, DATA_PARQUET, load_users
+from result_cache import cached_frame, dataset_fingerprint, rules_version
+from risk_table import PAGE_SIZE, SORT_COLUMNS, build_risk_table, query_page
+from user_index import build_user_index, find_by_email, find_by_id
+
+HOST = '127.0.0.1'
+PORT = 8080
+
+# Largest /score/batch request
+MAX_BATCH_USERS = 10_000
+
+# Request body limit, room for a full batch (aiohttp's default is 1 MB)
+MAX_BODY_BYTES = 16 * 1024 ** 2
+
+# Most single-user requests scored by one evaluator call
+MICRO_BATCH_SIZE = 512
+
+# Queued single-user requests before new ones wait (backpressure)
+QUEUE_SIZE = 10_000
+
+# Columns loaded for the stored scores (scoring inputs plus what responses show)
+API_COLUMNS = ['user_id', 'email', 'plan_type', 'monthly_revenue'] + input_columns()
+
+# Input columns accepted by /score, with the rule default for missing values
+SIGNAL_DEFAULTS = {'churned': False, **{rule['column']: rule['default'] for rule in SIGNALS}}
+
+# Fields of a stored user in responses
+USER_FIELDS = [
+    'user_id', 'email', 'plan_type', 'monthly_revenue', 'risk_score', 'risk_tier',
+    'primary_risk_factor', 'recommended_action',
+] + [rule['column'] for rule in SIGNALS]
+
+SCORE_FIELDS = ['risk_score', 'risk_tier', 'primary_risk_factor', 'recommended_action']
+
+# =============================================================================
+# DATA
+# =============================================================================
+
+def load_scores(csv_path=DATA_CSV, parquet_path=DATA_PARQUET):
+    """Active users' scores, through the same disk cache as the dashboard"""
+    key = dataset_fingerprint(csv_path)
+    df = cached_frame('users', [key, API_COLUMNS], lambda: load_users(API_COLUMNS, csv_path, parquet_path))
+    return cached_frame('scores', [key, rules_version(), list(df.columns)], lambda: score_users(df))
+
+
+def parse_users(users):
+    """Input columns for a list of user objects; raises ValueError on bad input"""
+    if not isinstance(users, list) or not all(isinstance(user, dict) for user in users):
+        raise ValueError("Expected a list of user objects")
+    columns = {}
+    for col, default in SIGNAL_DEFAULTS.items():
+        values = [user.get(col, default) for user in users]
+        if col in FLAG_COLUMNS:
+            # JSON booleans or the CSV's "yes"/"no"; null is unset (False)
+            if not all(value is None or isinstance(value, bool) or value in ('yes', 'no') for value in values):
+                raise ValueError(f"{col} must be a boolean")
+            columns[col] = np.array([value is True or value == 'yes' for value in values], dtype=bool)
+        else:
+            # null is a missing value (NaN, like an empty CSV cell); strings
+            # and booleans are rejected rather than coerced
+            if not all(value is None or (isinstance(value, (int, float)) and not isinstance(value, bool))
+                       for value in values):
+                raise ValueError(f"{col} must be a number")
+            columns[col] = np.array(values, dtype=np.float64)
+    return columns
+
+
+def score_rows(result, rows):
+    """JSON-ready score objects for rows of an evaluator result"""
+    fields = {field: result[field][rows].tolist() for field in SCORE_FIELDS}
+    return [dict(zip(SCORE_FIELDS, values)) for values in zip(*fields.values())]
+
+# =============================================================================
+# MICRO-BATCHING
+# =============================================================================
+
+async def micro_batcher(queue, evaluator=evaluate, max_size=MICRO_BATCH_SIZE):
+    """Score queued single-user requests, everything waiting at once per call.
+
+    No timer is involved. While one batch is being scored, new requests
+    accumulate in the queue, so batches grow with load and a lone request
+    is scored right away.
+    """
+    while True:
+        batch = [await queue.get()]
+        await asyncio.sleep(0)  # let requests that are already parsed enqueue
+        while len(batch) < max_size and not queue.empty():
+            batch.append(queue.get_nowait())
+
+        columns = {col: np.concatenate([item[0][col] for item in batch]) for col in SIGNAL_DEFAULTS}
+        try:
+            scores = score_rows(evaluator(columns), slice(None))
+        except Exception as error:  # hand the failure to every waiting request
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            continue
+        for (_, future), score in zip(batch, scores):
+            if not future.done():
+                future.set_result(score)
+
+# =============================================================================
+# HANDLERS
+# =============================================================================
+
+def _error(status, message):
+    return web.json_response({'error': message}, status=status)
+
+
+def _user_json(app, row):
+    columns = app['columns']
+    return {field: columns[field][row].item() if hasattr(columns[field][row], 'item') else columns[field][row]
+            for field in USER_FIELDS if field in columns}
+
+
+async def _read_json(request):
+    try:
+        return await request.json()
+    except json.JSONDecodeError:
+        raise web.HTTPBadRequest(text=json.dumps({'error': "Body must be JSON"}),
+                                 content_type='application/json') from None
+
+
+async def handle_health(request):
+    return web.json_response({'status': 'ok', 'users': len(request.app['scores'])})
+
+
+async def handle_user(request):
+    try:
+        user_id = int(request.match_info['user_id'])
+    except ValueError:
+        return _error(400, "user_id must be an integer")
+    row = find_by_id(request.app['index'], user_id)
+    if row is None:
+        return _error(404, f"No scored user {user_id}")
+    return web.json_response(_user_json(request.app, row))
+
+
+async def handle_user_by_email(request):
+    email = request.query.get('email')
+    if not email:
+        return _error(400, "Pass ?email=")
+    row = find_by_email(request.app['index'], email)
+    if row is None:
+        return _error(404, f"No scored user {email}")
+    return web.json_response(_user_json(request.app, row))
+
+
+async def handle_tier(request):
+    app = request.app
+    tier = request.match_info['tier'].upper()
+    table = app['risk_table']
+    if tier not in set(table['tier_labels']):
+        return _error(404, f"Unknown tier {tier}")
+    plans = request.query.getall('plan', list(table['plan_labels']))
+    sort_by = request.query.get('sort', 'risk_score')
+    if sort_by not in SORT_COLUMNS:
+        return _error(400, f"sort must be one of {', '.join(SORT_COLUMNS)}")
+    try:
+        page = int(request.query.get('page', 1))
+    except ValueError:
+        return _error(400, "page must be an integer")
+    result = query_page(table, [tier], plans, sort_by, page, PAGE_SIZE)
+    return web.json_response({
+        'tier': tier,
+        'total': result['total'],
+        'page': result['page'],
+        'pages': result['pages'],
+        'users': [_user_json(app, row) for row in result['rows']],
+    })
+
+
+async def handle_score(request):
+    user = await _read_json(request)
+    try:
+        columns = parse_users([user])
+    except ValueError as error:
+        return _error(400, str(error))
+    future = asyncio.get_running_loop().create_future()
+    await request.app['queue'].put((columns, future))
+    return web.json_response(await future)
+
+
+async def handle_score_batch(request):
+    body = await _read_json(request)
+    users = body.get('users') if isinstance(body, dict) else None
+    if not isinstance(users, list):
+        return _error(400, 'Expected {"users": [...]}')
+    if len(users) > MAX_BATCH_USERS:
+        return _error(413, f"At most {MAX_BATCH_USERS:,} users per request")
+    try:
+        columns = parse_users(users)
+    except ValueError as error:
+        return _error(400, str(error))
+    return web.json_response({'results': score_rows(request.app['evaluator'](columns), slice(None))})
+
+# =============================================================================
+# APP
+# =============================================================================
+
+def create_app(scores, evaluator=evaluate, micro_batch_size=MICRO_BATCH_SIZE):
+    """aiohttp application serving a scores table (score_users output)"""
+    app = web.Application(client_max_size=MAX_BODY_BYTES)
+    app['scores'] = scores
+    app['evaluator'] = evaluator
+    app['columns'] = {col: scores[col].to_numpy() for col in scores.columns}
+    app['index'] = build_user_index(scores['user_id'], scores['email'])
+    app['risk_table'] = build_risk_table(scores)
+
+    async def start_batcher(app):
+        app['queue'] = asyncio.Queue(maxsize=QUEUE_SIZE)
+        app['batcher'] = asyncio.create_task(micro_batcher(app['queue'], evaluator, micro_batch_size))
+
+    async def stop_batcher(app):
+        app['batcher'].cancel()
+
+    app.on_startup.append(start_batcher)
+    app.on_cleanup.append(stop_batcher)
+    app.add_routes([
+        web.get('/health', handle_health),
+        web.get('/users/{user_id}', handle_user),
+        web.get('/users', handle_user_by_email),
+        web.get('/tiers/{tier}', handle_tier),
+        web.post('/score', handle_score),
+        web.post('/score/batch', handle_score_batch),
+    ])
+    return app
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve churn risk scores over HTTP")
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--snapshot', default=DATA_CSV, help="User export to serve (CSV)")
+    parser.add_argument('--micro-batch', type=int, default=MICRO_BATCH_SIZE,
+                        help="Most /score requests per evaluator call (1 disables micro-batching)")
+    args = parser.parse_args()
+
+    parquet_path = DATA_PARQUET if args.snapshot == DATA_CSV else os.path.splitext(args.snapshot)[0] + '.parquet'
+    scores = load_scores(args.snapshot, parquet_path)
+    print(f"[OK] Serving {len(scores):,} scored users on http://{args.host}:{args.port}")
+    web.run_app(create_app(scores, micro_batch_size=args.micro_batch), host=args.host, port=args.port,
+                print=None)
+
+
+if __name__ == '__main__':
+    main()
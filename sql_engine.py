@@ -0,0 +1,122 @@
+"""
+Churn Intelligence System - Embedded SQL Engine
+Runs the analysis queries in sql/ with an in-process DuckDB connection,
+directly over the Parquet (or CSV) user table. A `users` view presents the
+typed columns the way the queries were written against the CSV: yes/no
+flags as 'yes'/'no' strings and a missing churn date as NULL. MySQL-only
+syntax in the query file is rewritten for DuckDB on load.
+"""
+
+import os
+import re
+
+import pyarrow as pa
+
+from data_store import ARROW_SCHEMA, DATA_CSV, DATA_PARQUET, FLAG_COLUMNS, ensure_parquet
+
+SQL_FILE = 'sql/01_onboarding_funnel_analysis.sql'
+
+# Names for the queries in SQL_FILE, in file order
+QUERY_NAMES = [
+    'onboarding_funnel',
+    'feature_depth',
+    'collaboration_impact',
+    'monthly_churn',
+    'at_risk_users',
+    'revenue_at_risk',
+]
+
+# DuckDB type per Arrow type, for reading the CSV with the storage schema
+SQL_TYPES = {
+    pa.int8(): 'TINYINT',
+    pa.int16(): 'SMALLINT',
+    pa.int32(): 'INTEGER',
+    pa.string(): 'VARCHAR',
+    pa.date32(): 'DATE',
+    pa.bool_(): 'VARCHAR',
+}
+
+# =============================================================================
+# QUERY FILE
+# =============================================================================
+
+def to_duckdb(statement):
+    """Rewrite the MySQL constructs the query file uses into DuckDB SQL"""
+    statement = re.sub(r'\bDATE_FORMAT\(', 'strftime(', statement)
+    # Dates are typed, so the CSV's empty churn_date is NULL rather than ''
+    statement = re.sub(r"(\w+)\s*!=\s*''", r'\1 IS NOT NULL', statement)
+    # MySQL filters on select aliases with HAVING and no GROUP BY; DuckDB
+    # resolves aliases in WHERE instead
+    if 'GROUP BY' not in statement.upper():
+        keyword = 'AND' if re.search(r'\bWHERE\b', statement, re.I) else 'WHERE'
+        statement = re.sub(r'\bHAVING\b', keyword, statement, flags=re.I)
+    return statement
+
+
+def load_queries(path=SQL_FILE):
+    """DuckDB-ready SELECT statements from a query file, keyed by QUERY_NAMES"""
+    with open(path, encoding='utf-8') as f:
+        # Comments go first: they hold semicolons and example output
+        text = '\n'.join(line.split('--', 1)[0] for line in f)
+    statements = [s.strip() for s in text.split(';')]
+    statements = [to_duckdb(s) for s in statements if s.upper().startswith('SELECT')]
+    if len(statements) != len(QUERY_NAMES):
+        raise ValueError(f"Expected {len(QUERY_NAMES)} queries in {path}, found {len(statements)}")
+    return dict(zip(QUERY_NAMES, statements))
+
+# =============================================================================
+# CONNECTION
+# =============================================================================
+
+def _source_sql(source, con):
+    """FROM-clause expression for a Parquet/CSV path or an in-memory table"""
+    if not isinstance(source, str):
+        con.register('users_source', source)
+        return 'users_source'
+    quoted = "'" + source.replace("'", "''") + "'"
+    if source.endswith('.parquet'):
+        return f'read_parquet({quoted})'
+    types = ', '.join(f"'{field.name}': '{SQL_TYPES[field.type]}'"
+                      for field in ARROW_SCHEMA if field.type in SQL_TYPES)
+    # Plan names are read as plain strings
+    return f"read_csv({quoted}, header=true, types={{{types}, 'plan_type': 'VARCHAR'}})"
+
+
+def connect(source=None, csv_path=DATA_CSV, parquet_path=DATA_PARQUET):
+    """DuckDB connection with a `users` view over the user table.
+
+    source is a Parquet or CSV path, or an Arrow table / DataFrame. By
+    default the typed Parquet copy of the dataset is used, falling back to
+    the CSV when the copy cannot be written.
+    """
+    import duckdb
+
+    if source is None:
+        source = ensure_parquet(csv_path, parquet_path) or csv_path
+        if not os.path.exists(source):
+            raise FileNotFoundError(source)
+
+    con = duckdb.connect()
+    relation = _source_sql(source, con)
+    columns = con.execute(f'DESCRIBE SELECT * FROM {relation}').fetchall()
+    flags = [name for name, sql_type, *_ in columns if name in FLAG_COLUMNS and sql_type == 'BOOLEAN']
+    replace = ', '.join(f"CASE WHEN {name} THEN 'yes' ELSE 'no' END AS {name}" for name in flags)
+    select = f'* REPLACE ({replace})' if replace else '*'
+    con.execute(f'CREATE VIEW users AS SELECT {select} FROM {relation}')
+    return con
+
+
+def run_query(con, name, queries=None):
+    """Result of one named query as a DataFrame"""
+    queries = queries or load_queries()
+    return con.execute(queries[name]).df()
+
+
+def run_queries(source=None, names=QUERY_NAMES, path=SQL_FILE):
+    """Run the named queries from a query file; returns {name: DataFrame}"""
+    queries = load_queries(path)
+    con = connect(source)
+    try:
+        return {name: run_query(con, name, queries) for name in names}
+    finally:
+        con.close()
@@ -0,0 +1,302 @@
+"""
+Churn Intelligence System - User Lookup Index
+Exact user_id and email lookups through hash indexes, a sorted email prefix
+index for type-ahead and a trigram index for fuzzy email autocomplete.
+Built once per scores table; each lookup is a hash probe, a binary search
+or a few posting-list reads instead of a scan over every row. New users go
+to a small delta that is folded into the main index once it grows.
+"""
+
+import bisect
+import math
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Most prefix matches returned for type-ahead
+SUGGESTION_LIMIT = 10
+
+# Sorts after every character, so prefix + HIGH_CHAR bounds a prefix range
+HIGH_CHAR = chr(0x10FFFF)
+
+# Leading bytes of each email's local part (before '@') indexed as trigrams
+GRAM_WIDTH = 32
+
+# Trigram codes are three bytes; GRAM_CODES marks a missing trigram
+GRAM_CODES = 1 << 24
+
+# Rows per vectorized trigram extraction pass (bounds the temporary matrices)
+GRAM_CHUNK_ROWS = 250_000
+
+# Fuzzy matches must share at least this share of the query's trigrams
+MIN_GRAM_OVERLAP = 0.5
+
+# Rebuild the main index once added users exceed this share of it
+DELTA_RATIO = 0.05
+
+# =============================================================================
+# BUILD
+# =============================================================================
+
+def normalize_email(email):
+    """Emails are matched case-insensitively and without surrounding spaces"""
+    return email.strip().lower()
+
+
+def build_user_index(user_ids, emails):
+    """Build the lookup index for parallel user_id / email columns"""
+    emails = pd.Series(emails).astype('string[pyarrow]').str.strip().str.lower()
+    emails = emails.fillna('').to_numpy(dtype=object)
+    email_array = pa.array(emails, pa.string())
+    # Arrow's string sort is several times faster than numpy's on objects
+    order = pc.sort_indices(email_array).to_numpy()
+
+    index = {
+        'ids': pd.Index(np.asarray(user_ids)),
+        'emails': pd.Index(emails),
+        'sorted_emails': emails[order],
+        'sorted_rows': order,
+        **_build_postings(email_array),
+        'size': len(emails),
+    }
+    index.update(_empty_delta())
+    # Build the hash tables now rather than on the first search
+    if len(emails):
+        _first_loc(index['ids'], index['ids'][0])
+        _first_loc(index['emails'], emails[0])
+    return index
+
+
+def add_users(index, user_ids, emails):
+    """Index users appended after the current last row; returns the index.
+
+    The new rows go to a delta (dicts, a sorted list and a few trigram
+    postings). Once the delta passes DELTA_RATIO of the main index, the
+    whole index is rebuilt.
+    """
+    emails = [normalize_email(e) for e in emails]
+    start = index['size']
+    for i, (user_id, email) in enumerate(zip(user_ids, emails)):
+        row = start + i
+        index['delta_ids'].append(int(user_id))
+        index['delta_emails'].append(email)
+        index['delta_id_rows'].setdefault(int(user_id), row)
+        index['delta_email_rows'].setdefault(email, row)
+        bisect.insort(index['delta_sorted'], (email, row))
+    new_keys = email_trigrams(pa.array(emails, pa.string()), first_row=start)
+    index['delta_keys'] = np.sort(np.concatenate([index['delta_keys'], new_keys]))
+    index['size'] += len(emails)
+
+    if len(index['delta_ids']) > DELTA_RATIO * len(index['ids']):
+        return build_user_index(
+            np.concatenate([index['ids'].to_numpy(), index['delta_ids']]),
+            np.concatenate([index['emails'].to_numpy(), np.array(index['delta_emails'], dtype=object)]),
+        )
+    return index
+
+
+def _empty_delta():
+    return {
+        'delta_ids': [],
+        'delta_emails': [],
+        'delta_id_rows': {},
+        'delta_email_rows': {},
+        'delta_sorted': [],
+        'delta_keys': np.array([], dtype=np.uint64),
+    }
+
+
+def _first_loc(index, key):
+    """Position of the first entry equal to key, or None"""
+    try:
+        loc = index.get_loc(key)
+    except KeyError:
+        return None
+    if isinstance(loc, slice):
+        return loc.start
+    if isinstance(loc, np.ndarray):
+        return int(loc.argmax())
+    return loc
+
+# =============================================================================
+# TRIGRAMS
+# =============================================================================
+
+def email_trigrams(emails, first_row=0):
+    """(trigram code << 32 | row) keys for the local part of every email"""
+    keys = [
+        (codes.astype(np.uint64) << np.uint64(32)) | rows.astype(np.uint64)
+        for codes, rows in _trigram_chunks(emails, first_row)
+    ]
+    return np.concatenate(keys) if keys else np.array([], dtype=np.uint64)
+
+
+def _trigram_chunks(emails, first_row=0):
+    """Yield (codes, rows) per chunk of emails, each trigram once per email, rows ascending"""
+    emails = emails.combine_chunks() if isinstance(emails, pa.ChunkedArray) else emails
+    n = len(emails)
+    if n == 0:
+        return
+
+    offsets = np.frombuffer(emails.buffers()[1], dtype=np.int32)[emails.offset:emails.offset + n + 1]
+    data = np.frombuffer(emails.buffers()[2], dtype=np.uint8)
+    at = pc.find_substring(emails, '@').to_numpy(zero_copy_only=False)
+    lengths = np.diff(offsets)
+    lengths = np.minimum(np.where(at >= 0, at, lengths), GRAM_WIDTH)
+
+    for lo in range(0, n, GRAM_CHUNK_ROWS):
+        hi = min(lo + GRAM_CHUNK_ROWS, n)
+        width = int(lengths[lo:hi].max())
+        if width < 3:
+            continue
+        cols = np.arange(width, dtype=np.int32)
+        valid = cols < lengths[lo:hi, None]
+        pos = np.minimum(offsets[lo:hi, None] + cols, len(data) - 1)
+        chars = np.where(valid, data[pos], 0).astype(np.uint32)
+        codes = (chars[:, :-2] << 16) | (chars[:, 1:-1] << 8) | chars[:, 2:]
+        # Missing trigrams sort last; repeats inside one email become adjacent
+        codes[~valid[:, 2:]] = GRAM_CODES
+        codes.sort(axis=1)
+        keep = codes < GRAM_CODES
+        keep[:, 1:] &= codes[:, 1:] != codes[:, :-1]
+        rows = np.broadcast_to(np.arange(first_row + lo, first_row + hi, dtype=np.uint32)[:, None], codes.shape)
+        yield codes[keep], rows[keep]
+
+
+def _build_postings(emails):
+    """Posting lists per trigram, stored as offsets into one row array.
+
+    Only trigrams that occur get an entry: gram_keys holds their codes in
+    order and gram_offsets[i]:gram_offsets[i + 1] their rows. Two passes
+    (count, then place) over the emails instead of sorting every
+    (trigram, row) pair, so memory peaks near the final row array.
+    """
+    seen = [np.unique(codes, return_counts=True) for codes, _ in _trigram_chunks(emails)]
+    codes = np.concatenate([c for c, _ in seen]) if seen else np.array([], dtype=np.uint32)
+    counts = np.concatenate([n for _, n in seen]) if seen else np.array([], dtype=np.int64)
+    gram_keys, slots = np.unique(codes, return_inverse=True)
+    gram_offsets = np.zeros(len(gram_keys) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(slots, weights=counts, minlength=len(gram_keys)).astype(np.int64),
+              out=gram_offsets[1:])
+
+    gram_rows = np.empty(gram_offsets[-1], dtype=np.uint32)
+    cursor = gram_offsets[:-1].copy()
+    for codes, rows in _trigram_chunks(emails):
+        # Sort by trigram, then row: one uint64 sort beats a stable argsort
+        keys = (codes.astype(np.uint64) << np.uint64(32)) | rows
+        keys.sort()
+        slots = np.searchsorted(gram_keys, (keys >> np.uint64(32)).astype(np.uint32))
+        rows = (keys & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+        first = np.flatnonzero(np.concatenate([[True], slots[1:] != slots[:-1]]))
+        size = np.diff(np.append(first, len(slots)))
+        rank = np.arange(len(slots)) - np.repeat(first, size)
+        gram_rows[cursor[slots] + rank] = rows
+        cursor[slots[first]] += size
+    return {'gram_keys': gram_keys, 'gram_offsets': gram_offsets, 'gram_rows': gram_rows}
+
+
+def _gram_rows(index, code):
+    """Rows whose email contains a trigram, from the main index and the delta"""
+    keys = index['gram_keys']
+    slot = np.searchsorted(keys, code)
+    if slot < len(keys) and keys[slot] == code:
+        rows = index['gram_rows'][index['gram_offsets'][slot]:index['gram_offsets'][slot + 1]]
+    else:
+        rows = np.array([], dtype=np.uint32)
+    delta = index['delta_keys']
+    if len(delta):
+        lo, hi = np.searchsorted(delta, [np.uint64(code) << np.uint64(32), np.uint64(code + 1) << np.uint64(32)])
+        if hi > lo:
+            rows = np.concatenate([rows, (delta[lo:hi] & np.uint64(0xFFFFFFFF)).astype(np.uint32)])
+    return rows
+
+# =============================================================================
+# LOOKUP
+# =============================================================================
+
+def find_by_id(index, user_id):
+    """Row of the user with this id, or None"""
+    row = _first_loc(index['ids'], user_id)
+    return row if row is not None else index['delta_id_rows'].get(user_id)
+
+
+def find_by_email(index, email):
+    """Row of the user with this email (case-insensitive), or None"""
+    email = normalize_email(email)
+    row = _first_loc(index['emails'], email)
+    return row if row is not None else index['delta_email_rows'].get(email)
+
+
+def find_user(index, query):
+    """Row matching a search box entry: an exact user_id or an exact email"""
+    query = query.strip()
+    if query.isdigit():
+        row = find_by_id(index, int(query))
+        if row is not None:
+            return row
+    return find_by_email(index, query)
+
+
+def suggest_emails(index, prefix, limit=SUGGESTION_LIMIT):
+    """Rows whose email starts with prefix, in email order"""
+    prefix = normalize_email(prefix)
+    if not prefix:
+        return np.array([], dtype=np.int64)
+    sorted_emails = index['sorted_emails']
+    lo = np.searchsorted(sorted_emails, prefix, side='left')
+    hi = np.searchsorted(sorted_emails, prefix + HIGH_CHAR, side='left')
+    rows = index['sorted_rows'][lo:min(hi, lo + limit)]
+
+    delta = index['delta_sorted']
+    if delta:
+        start = bisect.bisect_left(delta, (prefix,))
+        end = bisect.bisect_left(delta, (prefix + HIGH_CHAR,), start)
+        matches = list(zip(sorted_emails[lo:min(hi, lo + limit)], rows)) + delta[start:min(end, start + limit)]
+        rows = np.array([row for _, row in sorted(matches)[:limit]], dtype=np.int64)
+    return rows
+
+
+def search_emails(index, query, limit=SUGGESTION_LIMIT):
+    """Ranked autocomplete rows for a partial email such as 'priya.sh'.
+
+    Emails that start with the query come first. The rest are ranked by the
+    number of the query's trigrams their local part contains, so typos and
+    mid-email fragments still match. Ties go to the earlier row.
+    """
+    query = normalize_email(query)
+    prefix_rows = suggest_emails(index, query, limit)
+    codes = np.unique(email_trigrams(pa.array([query.split('@')[0]], pa.string())) >> np.uint64(32))
+    if len(prefix_rows) >= limit or len(codes) == 0:
+        return prefix_rows
+
+    postings = sorted((_gram_rows(index, int(code)) for code in codes), key=len)
+    take = limit - len(prefix_rows)
+    candidates, counts = _fuzzy_candidates(postings, prefix_rows, index['size'])
+
+    # Highest count first, then lowest row: one sortable int64 key
+    rank = (counts.astype(np.int64) << 32) - candidates.astype(np.int64)
+    if len(candidates) > take:
+        top = np.argpartition(-rank, take - 1)[:take]
+    else:
+        top = np.arange(len(candidates))
+    fuzzy_rows = candidates[top[np.argsort(-rank[top], kind='stable')]]
+    return np.concatenate([prefix_rows, fuzzy_rows]).astype(np.int64)
+
+
+def _fuzzy_candidates(postings, exclude, size):
+    """Rows (not in exclude) holding at least MIN_GRAM_OVERLAP of the trigrams, with counts"""
+    full = len(postings)
+    need = max(1, math.ceil(full * MIN_GRAM_OVERLAP))
+    # np.zeros pages in lazily, so this costs about one write per posting
+    counts = np.zeros(size, dtype=np.uint8)
+    for rows in postings:
+        counts[rows] += 1
+    counts[exclude] = 0
+
+    # A row holding `need` trigrams is in one of the full - need + 1 shortest lists
+    seeds = np.concatenate(postings[:full - need + 1])
+    seeds = np.unique(seeds[counts[seeds] >= need])
+    return seeds, counts[seeds]
+